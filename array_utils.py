@@ -0,0 +1,167 @@
+"""
+Array helpers shared by the vectorized pattern engines
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def run_lengths(mask: np.ndarray) -> np.ndarray:
+    """
+    Length of the run of True values ending at each position
+
+    Args:
+        mask: Boolean array (e.g. "candle is green")
+
+    Returns:
+        int64 array, 0 where mask is False
+    """
+    mask = np.asarray(mask, dtype=bool)
+    positions = np.arange(len(mask))
+    # Index of the most recent False at or before each position
+    last_break = np.where(mask, -1, positions)
+    np.maximum.accumulate(last_break, out=last_break)
+    return positions - last_break
+
+
+def forward_run_lengths(mask: np.ndarray) -> np.ndarray:
+    """
+    Length of the run of True values starting at each position
+
+    Args:
+        mask: Boolean array
+
+    Returns:
+        int64 array, 0 where mask is False
+    """
+    mask = np.asarray(mask, dtype=bool)
+    return run_lengths(mask[::-1])[::-1]
+
+
+def trailing_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Mean of the `window` values before each position (excluding it)
+
+    Matches Series.iloc[i - window:i].mean() bit for bit, including
+    skipping NaN.
+
+    Args:
+        values: 1-D float array
+        window: Number of previous values to average
+
+    Returns:
+        Float array, NaN for the first `window` positions
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.full(len(values), np.nan)
+    if window <= 0 or len(values) <= window:
+        return result
+
+    missing = np.isnan(values)
+    # Windows [i - window, i) for i = window..n-1
+    sums = sliding_window_view(np.where(missing, 0.0, values), window)[:-1].sum(axis=1)
+    counts = window - sliding_window_view(missing, window)[:-1].sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result[window:] = np.where(counts > 0, sums / counts, np.nan)
+    return result
+
+
+def trailing_quantile(values: np.ndarray, window: int, q: float,
+                      chunk_size: int = 4096) -> np.ndarray:
+    """
+    Quantile of the `window` values before each position (excluding it)
+
+    Matches Series.iloc[i - window:i].quantile(q) bit for bit (linear
+    interpolation, NaN skipped). Windows are evaluated in vectorized
+    chunks to bound memory on long series.
+
+    Args:
+        values: 1-D float array
+        window: Number of previous values
+        q: Quantile in [0, 1]
+        chunk_size: Windows evaluated per batch
+
+    Returns:
+        Float array, NaN for the first `window` positions
+    """
+    values = np.asarray(values, dtype=float)
+    result = np.full(len(values), np.nan)
+    if window <= 0 or len(values) <= window:
+        return result
+
+    # Windows [i - window, i) for i = window..n-1
+    windows = sliding_window_view(values, window)[:-1]
+    has_nan = np.isnan(windows).any(axis=1)
+    thresholds = result[window:]
+
+    complete = np.flatnonzero(~has_nan)
+    for start in range(0, len(complete), chunk_size):
+        rows = complete[start:start + chunk_size]
+        thresholds[rows] = np.percentile(windows[rows], q * 100, axis=1)
+
+    # Windows with gaps (e.g. indicator warm-up) drop NaN first, like pandas.
+    # Sorting moves NaN to the end, so windows with the same number of
+    # observed values form a complete block of leading columns.
+    gaps = np.flatnonzero(has_nan)
+    for start in range(0, len(gaps), chunk_size):
+        rows = gaps[start:start + chunk_size]
+        ordered = np.sort(windows[rows], axis=1)
+        observed = window - np.isnan(ordered).sum(axis=1)
+        for count in np.unique(observed[observed > 0]):
+            same = observed == count
+            thresholds[rows[same]] = np.percentile(ordered[same, :count], q * 100, axis=1)
+
+    return result
+
+
+def _window_reduce(ufunc, values: np.ndarray, starts: np.ndarray,
+                   stops: np.ndarray) -> np.ndarray:
+    """Reduce values[start:stop] for every (start, stop) pair, NaN if empty"""
+    values = np.asarray(values, dtype=float)
+    starts = np.asarray(starts, dtype=np.int64)
+    stops = np.asarray(stops, dtype=np.int64)
+
+    if len(starts) == 0:
+        return np.empty(0, dtype=float)
+
+    # Sentinel keeps stop == len(values) a legal reduceat index
+    padded = np.append(values, np.nan)
+    bounds = np.empty(2 * len(starts), dtype=np.int64)
+    bounds[0::2] = starts
+    bounds[1::2] = stops
+
+    result = ufunc.reduceat(padded, bounds)[0::2]
+    result[stops <= starts] = np.nan
+    return result
+
+
+def window_max(values: np.ndarray, starts: np.ndarray,
+               stops: np.ndarray) -> np.ndarray:
+    """
+    Maximum of values[start:stop] for each window, skipping NaN like pandas
+
+    Args:
+        values: 1-D float array
+        starts: Window start indices (inclusive)
+        stops: Window stop indices (exclusive)
+
+    Returns:
+        Array of window maxima (NaN for empty or all-NaN windows)
+    """
+    return _window_reduce(np.fmax, values, starts, stops)
+
+
+def window_min(values: np.ndarray, starts: np.ndarray,
+               stops: np.ndarray) -> np.ndarray:
+    """
+    Minimum of values[start:stop] for each window, skipping NaN like pandas
+
+    Args:
+        values: 1-D float array
+        starts: Window start indices (inclusive)
+        stops: Window stop indices (exclusive)
+
+    Returns:
+        Array of window minima (NaN for empty or all-NaN windows)
+    """
+    return _window_reduce(np.fmin, values, starts, stops)
@@ -18,9 +18,7 @@ import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 
 # Import our scanners
-from ici_scanner import ICIScanner
-from pattern_scanners import MomentumScanner, WMScanner, HarmonicScanner
-from fous_scanners import ForceScanner, SurvivalScanner, RevivalScanner, GoldScanner
+from live_scanner import LiveScanner
 
 # Import interactive charts
 from interactive_charts import draw_interactive_chart
@@ -58,6 +56,9 @@ class AutoScannerBot:
         self.risk_per_trade = 0.02  # 2% per trade
         self.max_positions = 10
 
+        # Live scanners per (symbol, timeframe), fed only bars not seen yet
+        self.live_scanners = {}
+
         # Storage
         self.signals_file = 'trade_signals.json'
         self.charts_dir = 'static/charts'
@@ -197,58 +198,51 @@ class AutoScannerBot:
             print(f"Error drawing chart: {e}")
             return ''
 
+    def get_scan_data(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """Download recent bars with a Date column"""
+        period = '1y' if timeframe == '1d' else '60d'
+        df = yf.download(symbol, period=period, interval=timeframe, progress=False)
+
+        if df.empty:
+            return df
+
+        # Handle MultiIndex columns from yfinance
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.droplevel(1)
+
+        df = df.reset_index()
+        if 'Datetime' in df.columns:
+            df = df.rename(columns={'Datetime': 'Date'})
+        return df
+
     def scan_market(self, symbol: str, timeframe: str) -> List[Dict]:
-        """Scan one market/timeframe for all patterns"""
+        """Scan the new bars of one market/timeframe for all patterns"""
         setups = []
 
         try:
             print(f"  Scanning {symbol} {timeframe}...")
 
-            # ICI Scanner
-            scanner = ICIScanner(symbol, timeframe)
-            ici_setups = scanner.find_all_setups()
-            for setup in ici_setups:
-                if setup.valid:
-                    setups.append({
-                        'pattern_type': 'ICI',
-                        'entry': setup.entry,
-                        'stop': setup.stop,
-                        'target': setup.target,
-                        'risk_reward': setup.risk_reward
-                    })
-
-            # Momentum Scanner
-            mom_scanner = MomentumScanner(symbol, timeframe)
-            mom_setups = mom_scanner.find_all_setups()
-            for setup in mom_setups:
-                if setup.valid:
-                    setups.append({
-                        'pattern_type': 'Momentum',
-                        'entry': setup.entry,
-                        'stop': setup.stop,
-                        'target': setup.target,
-                        'risk_reward': setup.risk_reward
-                    })
-
-            # FOUS Scanners
-            force_scanner = ForceScanner(symbol, timeframe)
-            force_setups = force_scanner.find_all_setups()
-            for setup in force_setups:
-                if setup.valid:
-                    setups.append({
-                        'pattern_type': 'Force',
-                        'entry': setup.entry,
-                        'stop': setup.stop,
-                        'target': setup.target,
-                        'risk_reward': setup.risk_reward
-                    })
-
-            revival_scanner = RevivalScanner(symbol, timeframe)
-            revival_setups = revival_scanner.find_all_setups()
-            for setup in revival_setups:
-                if setup.valid:
+            df = self.get_scan_data(symbol, timeframe)
+            if df.empty:
+                return setups
+
+            # The last row is the bar still forming; only closed bars are scanned
+            closed = df.iloc[:-1]
+
+            key = (symbol, timeframe)
+            if key not in self.live_scanners:
+                # History only warms the scanner up; signals come from bars closing later
+                scanner = LiveScanner(['ICI', 'Momentum', 'Force', 'Revival'], timeframe=timeframe)
+                scanner.warm_up(closed)
+                self.live_scanners[key] = scanner
+                return setups
+
+            scanner = self.live_scanners[key]
+            for _, bar in closed[closed['Date'] > scanner.last_date].iterrows():
+                scanner.on_bar(bar)
+                for setup in scanner.scan_latest().valid_setups():
                     setups.append({
-                        'pattern_type': 'Revival',
+                        'pattern_type': setup.pattern_type,
                         'entry': setup.entry,
                         'stop': setup.stop,
                         'target': setup.target,
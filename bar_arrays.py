@@ -0,0 +1,189 @@
+"""
+BarArrays - OHLCV bars as contiguous NumPy arrays
+"""
+from typing import List, Optional, Union
+import numpy as np
+import pandas as pd
+from indicator_cache import IndicatorCache
+
+
+class BarArrays:
+    """
+    OHLCV bars as float64 arrays plus int64 nanosecond timestamps
+
+    Built once from a DataFrame; float64 columns are taken as views, not
+    copied. Scanners and validators read these arrays directly instead of
+    indexing pandas rows, and only turn dates into Timestamps for the bars
+    that become setups.
+
+    Indicators computed from the bars are cached on them (see
+    indicators); after editing prices in place, call modified().
+    """
+
+    COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+    def __init__(self, open: np.ndarray, high: np.ndarray, low: np.ndarray,
+                 close: np.ndarray, volume: Optional[np.ndarray] = None,
+                 timestamps: Optional[np.ndarray] = None, tz=None,
+                 labels: Optional[np.ndarray] = None):
+        """
+        Wrap bar arrays
+
+        Args:
+            open, high, low, close: Prices (converted to float64 if needed)
+            volume: Volumes (NaN if not given)
+            timestamps: int64 nanoseconds since the epoch (UTC if tz is set)
+            tz: Time zone of the timestamps
+            labels: Dates that are not datetimes (e.g. a RangeIndex); used
+                when timestamps is None
+        """
+        def prices(values) -> np.ndarray:
+            return np.ascontiguousarray(values, dtype=np.float64)
+
+        self.open = prices(open)
+        self.high = prices(high)
+        self.low = prices(low)
+        self.close = prices(close)
+        n = len(self.close)
+        self.volume = prices(volume) if volume is not None else np.full(n, np.nan)
+
+        if timestamps is not None:
+            timestamps = np.ascontiguousarray(timestamps, dtype=np.int64)
+        self.timestamps = timestamps
+        self.tz = tz
+        self.labels = labels if timestamps is None else None
+        self._dates = None
+        self.version = 0
+        self._indicators = None
+
+        lengths = {len(a) for a in (self.open, self.high, self.low, self.close, self.volume)}
+        if timestamps is not None:
+            lengths.add(len(timestamps))
+        elif labels is not None:
+            lengths.add(len(labels))
+        if len(lengths) > 1:
+            raise ValueError("All bar arrays must have the same length")
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'BarArrays':
+        """
+        Arrays of a DataFrame's bars
+
+        Args:
+            df: DataFrame with Open, High, Low, Close (Volume optional) and
+                Date as a column or index
+
+        Returns:
+            BarArrays sharing memory with df's float64 columns
+        """
+        dates = df['Date'] if 'Date' in df.columns else df.index
+
+        timestamps = tz = labels = None
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            index = pd.DatetimeIndex(dates)
+            tz = index.tz
+            timestamps = index.as_unit('ns').asi8
+        else:
+            labels = np.asarray(dates, dtype=object)
+
+        def column(name: str) -> np.ndarray:
+            return df[name].to_numpy(dtype=np.float64)
+
+        volume = column('Volume') if 'Volume' in df.columns else None
+        return cls(column('Open'), column('High'), column('Low'), column('Close'),
+                   volume, timestamps, tz, labels)
+
+    @classmethod
+    def concat(cls, parts: List['BarArrays']) -> 'BarArrays':
+        """
+        Bars of consecutive series joined in order
+
+        Args:
+            parts: BarArrays with the same kind of dates (and time zone)
+
+        Returns:
+            New BarArrays holding copies of all bars
+        """
+        if not parts:
+            raise ValueError("Nothing to concatenate")
+        first = parts[0]
+        for part in parts[1:]:
+            if ((part.timestamps is None) != (first.timestamps is None) or
+                    str(part.tz) != str(first.tz)):
+                raise ValueError("Cannot concatenate bars with different kinds of dates")
+
+        def joined(name: str) -> Optional[np.ndarray]:
+            arrays = [getattr(part, name) for part in parts]
+            if arrays[0] is None:
+                return None
+            return np.concatenate(arrays)
+
+        return cls(joined('open'), joined('high'), joined('low'), joined('close'),
+                   joined('volume'), joined('timestamps'), first.tz, joined('labels'))
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def __getitem__(self, key: slice) -> 'BarArrays':
+        """Bars in a positional slice (views, not copies)"""
+        if not isinstance(key, slice):
+            raise TypeError("BarArrays only supports slicing; read columns as attributes")
+        return BarArrays(
+            self.open[key], self.high[key], self.low[key], self.close[key],
+            self.volume[key],
+            self.timestamps[key] if self.timestamps is not None else None,
+            self.tz,
+            self.labels[key] if self.labels is not None else None,
+        )
+
+    @property
+    def dates(self) -> pd.Index:
+        """Dates as a pandas Index (DatetimeIndex when timestamps are set)"""
+        if self._dates is None:
+            if self.timestamps is not None:
+                dates = pd.DatetimeIndex(self.timestamps.view('datetime64[ns]'))
+                if self.tz is not None:
+                    dates = dates.tz_localize('UTC').tz_convert(self.tz)
+                self._dates = dates
+            elif self.labels is not None:
+                self._dates = pd.Index(self.labels, dtype=object)
+            else:
+                self._dates = pd.RangeIndex(len(self))
+        return self._dates
+
+    @property
+    def indicators(self) -> IndicatorCache:
+        """Indicators cached for these bars (emptied when the bars change)"""
+        if self._indicators is None:
+            self._indicators = IndicatorCache()
+        self._indicators.sync(len(self), self.version)
+        return self._indicators
+
+    def modified(self) -> None:
+        """Mark prices as edited in place, dropping the cached indicators"""
+        self.version += 1
+
+    def date(self, idx: int):
+        """Date of one bar (as stored on setups)"""
+        return self.dates[idx]
+
+    def series(self, name: str) -> pd.Series:
+        """One column as a Series over the same memory"""
+        return pd.Series(getattr(self, name.lower()), copy=False)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Bars as a DataFrame with a Date column"""
+        frame = pd.DataFrame({name: getattr(self, name.lower()) for name in self.COLUMNS})
+        frame.insert(0, 'Date', self.dates)
+        return frame
+
+
+# Anything the scanners and validators accept as bars
+BarData = Union[pd.DataFrame, BarArrays]
+
+
+def as_bars(data: BarData) -> BarArrays:
+    """BarArrays of a DataFrame, or the BarArrays itself"""
+    if isinstance(data, BarArrays):
+        return data
+    return BarArrays.from_frame(data)
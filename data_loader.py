@@ -3,7 +3,7 @@ Data loading module - supports yfinance and CSV
 """
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Iterator, Optional
 
 
 class DataLoader:
@@ -88,6 +88,43 @@ class DataLoader:
 
         return df
 
+    @staticmethod
+    def iter_csv_chunks(filepath: str, chunk_size: int = 100_000,
+                        date_column: str = 'Date',
+                        parse_dates: bool = True) -> Iterator[pd.DataFrame]:
+        """
+        Read a CSV file in fixed-size chunks
+
+        Only one chunk is held in memory at a time, so files larger than
+        RAM can be processed. Each chunk looks like load_from_csv output
+        for its rows.
+
+        Args:
+            filepath: Path to CSV file
+            chunk_size: Rows per chunk
+            date_column: Name of date column
+            parse_dates: Whether to parse dates
+
+        Yields:
+            DataFrame with OHLCV data per chunk, in file order
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+
+        reader = pd.read_csv(filepath, chunksize=chunk_size,
+                             parse_dates=[date_column] if parse_dates else None)
+        with reader:
+            for df in reader:
+                # Standardize column names
+                df.columns = [col.strip() for col in df.columns]
+
+                required_cols = ['Open', 'High', 'Low', 'Close']
+                missing_cols = [col for col in required_cols if col not in df.columns]
+                if missing_cols:
+                    raise ValueError(f"CSV missing required columns: {missing_cols}")
+
+                yield df
+
     @staticmethod
     def resample_to_timeframe(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
         """
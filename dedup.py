@@ -0,0 +1,129 @@
+"""
+Vectorized setup deduplication - best setup per group for any pattern family
+"""
+from typing import Dict, List, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+
+
+# (field, higher_is_better): valid setups first, then the highest R:R
+DEFAULT_RANKING = (('valid', True), ('risk_reward', True))
+
+
+def time_keys(dates: pd.Series, by: Union[str, pd.Timedelta] = 'day') -> pd.Series:
+    """
+    Time bucket of each setup date
+
+    Args:
+        dates: Setup dates
+        by: 'day' (calendar day), 'bar' (the exact bar), or a fixed
+            window such as '4h' or pd.Timedelta(days=5); on 1h bars '4h'
+            groups setups in 4-bar windows
+
+    Returns:
+        Series of bucket keys aligned with dates
+    """
+    dates = pd.Series(dates).reset_index(drop=True)
+    if by == 'bar':
+        return dates
+
+    is_datetime = pd.api.types.is_datetime64_any_dtype(dates)
+    if by == 'day':
+        if is_datetime:
+            return dates.dt.normalize()
+        return dates.map(lambda date: date.date() if hasattr(date, 'date') else date)
+
+    if not is_datetime:
+        dates = pd.to_datetime(dates)
+    return dates.dt.floor(pd.Timedelta(by))
+
+
+def best_per_group(groups: np.ndarray, ranks: Sequence[np.ndarray]) -> np.ndarray:
+    """
+    Position of the best row in every group
+
+    Args:
+        groups: Group code per row, numbered in order of first appearance
+        ranks: Rank arrays, most important first; lower rank is better
+
+    Returns:
+        Row positions, one per group in group-code order; ties go to the
+        earliest row
+    """
+    groups = np.asarray(groups)
+    if len(groups) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    order = np.lexsort([np.arange(len(groups))] + [np.asarray(r) for r in reversed(ranks)]
+                       + [groups])
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = groups[order[1:]] != groups[order[:-1]]
+    return order[first]
+
+
+def best_rows(columns: Dict[str, Sequence], by: Union[str, pd.Timedelta] = 'day',
+              per: Sequence[str] = (),
+              ranking: Sequence[Tuple[str, bool]] = DEFAULT_RANKING) -> np.ndarray:
+    """
+    Rows kept by deduplication
+
+    Args:
+        columns: Array per field; needs 'date', the `per` fields and the
+            ranking fields
+        by: Time bucket (see time_keys)
+        per: Extra fields that split groups, e.g. ('symbol', 'pattern_type',
+            'direction')
+        ranking: (field, higher_is_better) pairs, most important first;
+            missing values rank last
+
+    Returns:
+        Row positions of the best setup per group, groups in order of
+        first appearance
+    """
+    keys = pd.DataFrame({'time': time_keys(columns['date'], by)})
+    for name in per:
+        keys[name] = pd.Series(columns[name]).reset_index(drop=True)
+    groups = keys.groupby(list(keys.columns), sort=False, dropna=False).ngroup().to_numpy()
+
+    ranks = [pd.Series(columns[name]).reset_index(drop=True)
+             .rank(method='dense', ascending=not higher, na_option='bottom').to_numpy()
+             for name, higher in ranking]
+    return best_per_group(groups, ranks)
+
+
+def setup_columns(setups: List, names: Sequence[str]) -> Dict[str, list]:
+    """Field values of setup objects, one list per field"""
+    columns = {}
+    for name in names:
+        if name == 'direction':
+            columns[name] = ['LONG' if getattr(s, 'is_bullish', True) else 'SHORT'
+                             for s in setups]
+        else:
+            columns[name] = [getattr(s, name) for s in setups]
+    return columns
+
+
+def deduplicate_setups(setups: List, by: Union[str, pd.Timedelta] = 'day',
+                       per: Sequence[str] = (),
+                       ranking: Sequence[Tuple[str, bool]] = DEFAULT_RANKING) -> List:
+    """
+    Keep the best setup per time bucket (and per `per` fields)
+
+    Works for ICISetup and FOUSSetup alike. 'direction' may be used in
+    `per` (FOUS setups count as long).
+
+    Args:
+        setups: Setups in scan order
+        by: 'day', 'bar' or a fixed window (see time_keys)
+        per: Fields that split groups (e.g. 'pattern_type', 'direction')
+        ranking: (field, higher_is_better) pairs, most important first
+
+    Returns:
+        Deduplicated list of the original setup objects
+    """
+    if not setups:
+        return []
+
+    names = ['date'] + list(per) + [name for name, _ in ranking]
+    rows = best_rows(setup_columns(setups, dict.fromkeys(names)), by, per, ranking)
+    return [setups[row] for row in rows]
@@ -6,6 +6,7 @@ import pandas as pd
 from datetime import datetime
 from data_loader import DataLoader
 from ici_scanner import ICIScanner
+from parallel_scanner import ParallelScanExecutor, ScanJob
 from typing import List, Dict
 import warnings
 warnings.filterwarnings('ignore')
@@ -201,6 +202,15 @@ def main():
     results = {}
     stats_list = []
 
+    # All timeframes scan in parallel; results come back in timeframe order
+    available = [tf for tf in ['1d', '4h', '1h', '15m'] if data[tf] is not None]
+    jobs = [ScanJob('SPY', tf, 'ICI', scanners[tf]) for tf in available]
+    try:
+        scanned = ParallelScanExecutor().run({('SPY', tf): data[tf] for tf in available}, jobs)
+    except Exception as e:
+        print(f"   ✗ Parallel scan failed ({e}), scanning sequentially")
+        scanned = {}
+
     for tf in ['1d', '4h', '1h', '15m']:
         print(f"\n{'─' * 100}")
         print(f"🔍 Scanning {tf.upper()} timeframe...")
@@ -213,7 +223,9 @@ def main():
 
         try:
             print(f"   Processing {len(data[tf])} bars...")
-            setups = scanners[tf].scan(data[tf], tf)
+            setups = scanned.get(('SPY', tf, 'ICI'))
+            if setups is None:
+                setups = scanners[tf].scan(data[tf], tf)
             setups = scanners[tf].deduplicate_setups(setups)
             results[tf] = setups
 
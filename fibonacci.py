@@ -1,9 +1,20 @@
 """
 Fibonacci calculation module for pattern scanning
 """
+import numpy as np
+
 
 class FibonacciCalculator:
-    """Calculate Fibonacci retracements and extensions"""
+    """
+    Calculate Fibonacci retracements and extensions
+
+    The scalar methods take one impulse. The plural methods take NumPy
+    arrays of impulses and broadcast their arguments, so the levels of
+    every bar come from one call, e.g. all retracement levels per bar:
+
+        FibonacciCalculator.retracements(highs[:, None], lows[:, None],
+                                         [0.382, 0.5, 0.618, 0.786])
+    """
 
     # Standard Fibonacci levels
     RETRACEMENT_LEVELS = {
@@ -108,3 +119,95 @@ class FibonacciCalculator:
             Target price
         """
         return cls.calculate_extension(impulse_high, impulse_low, extension_level)
+
+    # Array versions: same arithmetic as above, broadcast over impulses
+
+    @staticmethod
+    def retracements(highs, lows, levels) -> np.ndarray:
+        """
+        calculate_retracement for arrays of impulses and/or levels
+
+        Args:
+            highs: Impulse high points
+            lows: Impulse low points
+            levels: Fibonacci levels (broadcast with highs and lows)
+
+        Returns:
+            Prices at the retracement levels
+        """
+        highs = np.asarray(highs, dtype=float)
+        impulse_range = highs - np.asarray(lows, dtype=float)
+        return highs - (impulse_range * np.asarray(levels, dtype=float))
+
+    @staticmethod
+    def extensions(highs, lows, levels) -> np.ndarray:
+        """
+        calculate_extension for arrays of impulses and/or levels
+
+        Args:
+            highs: Impulse high points
+            lows: Impulse low points
+            levels: Fibonacci extension levels (sign ignored)
+
+        Returns:
+            Prices at the extension levels
+        """
+        highs = np.asarray(highs, dtype=float)
+        impulse_range = highs - np.asarray(lows, dtype=float)
+        return highs + (impulse_range * np.abs(np.asarray(levels, dtype=float)))
+
+    @staticmethod
+    def retracement_pcts(impulse_highs, impulse_lows, correction_levels) -> np.ndarray:
+        """
+        get_retracement_pct for arrays of impulses
+
+        Args:
+            impulse_highs: Highs of impulse moves
+            impulse_lows: Lows of impulse moves
+            correction_levels: Correction price levels
+
+        Returns:
+            Fractions retraced, 0.0 for zero-range impulses
+        """
+        impulse_highs = np.asarray(impulse_highs, dtype=float)
+        impulse_range = impulse_highs - np.asarray(impulse_lows, dtype=float)
+        retracement = impulse_highs - np.asarray(correction_levels, dtype=float)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(impulse_range != 0, retracement / impulse_range, 0.0)
+
+    @classmethod
+    def valid_correction_mask(cls, impulse_highs, impulse_lows, correction_lows,
+                              min_level: float = 0.382,
+                              max_level: float = 0.786) -> np.ndarray:
+        """
+        is_valid_correction for arrays of impulses
+
+        Args:
+            impulse_highs: Highs of bullish impulses
+            impulse_lows: Lows of bullish impulses
+            correction_lows: Lows of the corrections
+            min_level: Minimum acceptable retracement (default 0.382)
+            max_level: Maximum acceptable retracement (default 0.786)
+
+        Returns:
+            Boolean array: correction is within the range
+        """
+        retracement_pct = cls.retracement_pcts(impulse_highs, impulse_lows, correction_lows)
+        return (min_level <= retracement_pct) & (retracement_pct <= max_level)
+
+    @classmethod
+    def targets(cls, impulse_highs, impulse_lows,
+                extension_level: float = -0.272) -> np.ndarray:
+        """
+        calculate_target for arrays of impulses
+
+        Args:
+            impulse_highs: Highs of impulses
+            impulse_lows: Lows of impulses
+            extension_level: Extension level (default -0.272)
+
+        Returns:
+            Target prices
+        """
+        return cls.extensions(impulse_highs, impulse_lows, extension_level)
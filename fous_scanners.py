@@ -3,9 +3,12 @@ FOUS Pattern Scanners: Force, Survival, Revival, Gold
 """
 from dataclasses import dataclass
 from datetime import datetime
+import numpy as np
 import pandas as pd
 from typing import List, Optional
-from fous_validators import FOUSValidator
+from bar_arrays import BarData, as_bars
+from fous_validators import FOUSValidator, FOUSFeatures
+from stage_counter import StageCounter
 
 
 @dataclass
@@ -44,6 +47,51 @@ class FOUSSetup:
         }
 
 
+def _build_fous_setups(df: BarData, candidate: dict, pattern_type: str,
+                       timeframe: str) -> List[FOUSSetup]:
+    """
+    Create setups for the bars returned by a FOUS _evaluate_* kernel
+
+    Args:
+        df: DataFrame or BarArrays the kernel ran on
+        candidate: Dict of arrays for the qualifying bars
+        pattern_type: Pattern name
+        timeframe: Timeframe being scanned
+
+    Returns:
+        List of FOUSSetup objects in bar order
+    """
+    dates = as_bars(df).dates
+    setups = []
+    for row, idx in enumerate(candidate['index']):
+        setups.append(FOUSSetup(
+            date=dates[int(idx)],
+            pattern_type=pattern_type,
+            timeframe=timeframe,
+            entry=candidate['entry'][row],
+            stop=candidate['stop'][row],
+            target=candidate['target'][row],
+            risk_reward=candidate['risk_reward'][row],
+            volume_spike=bool(candidate['volume_spike'][row]),
+            rsi=candidate['rsi'][row],
+            ema_aligned=bool(candidate['ema_aligned'][row]),
+            vwap_bullish=bool(candidate['vwap_bullish'][row]),
+            valid=bool(candidate['valid'][row]),
+            notes=candidate['notes'][row]
+        ))
+    return setups
+
+
+def _risk_reward(entry: np.ndarray, stop: np.ndarray,
+                 reward_multiple: float) -> tuple:
+    """Target at reward_multiple x risk above entry, and its R:R (0 if no risk)"""
+    risk = np.abs(entry - stop)
+    target = entry + (risk * reward_multiple)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        risk_reward = np.where(risk > 0, (target - entry) / risk, 0.0)
+    return target, risk_reward
+
+
 class ForceScanner:
     """
     FORCE Pattern Scanner
@@ -55,94 +103,116 @@ class ForceScanner:
     - Pivot point: recent 5-candle lows not broken
     """
 
+    pattern_type = 'Force'
+
+    # Trailing bars the scan loop leaves out
+    bars_ahead = 0
+
     def __init__(self, min_candles: int = 3, min_risk_reward: float = 1.5):
         self.min_candles = min_candles
         self.min_risk_reward = min_risk_reward
         self.validator = FOUSValidator()
+        self.stage_counts = StageCounter()  # Bars removed per filter stage
 
-    def scan(self, df: pd.DataFrame, timeframe: str = '1h') -> List[FOUSSetup]:
+    def scan(self, df: BarData, timeframe: str = '1h',
+             features: Optional[FOUSFeatures] = None) -> List[FOUSSetup]:
         """Scan for Force patterns"""
-        setups = []
+        self.stage_counts.reset()
 
         if len(df) < 50:
-            return setups
+            return []
 
-        for i in range(50, len(df)):
-            setup = self._find_force_at_index(df, i, timeframe)
-            if setup:
-                setups.append(setup)
+        bars = as_bars(df)
+        if features is None:
+            features = FOUSFeatures(bars)
 
-        return setups
+        indices = np.arange(50, len(bars) - self.bars_ahead)
+        return self._scan_indices(bars, indices, timeframe, features)
 
-    def _find_force_at_index(self, df: pd.DataFrame, idx: int,
-                            timeframe: str) -> Optional[FOUSSetup]:
-        """Find Force pattern at index"""
+    def _scan_indices(self, df: BarData, indices: np.ndarray,
+                      timeframe: str, features: FOUSFeatures) -> List[FOUSSetup]:
+        """Evaluate Force at the given bar indices"""
+        candidate = self._evaluate_force(features, indices)
+        return _build_fous_setups(df, candidate, self.pattern_type, timeframe)
+
+    def _evaluate_force(self, features: FOUSFeatures, indices: np.ndarray) -> dict:
+        """
+        Run the Force rules over many bars at once
+
+        Args:
+            features: Features of the scanned DataFrame
+            indices: Bar indices to evaluate
+
+        Returns:
+            Dict of arrays for the bars that qualify
+        """
+        f = features
+        idx = np.asarray(indices, dtype=np.int64)
+        counts = self.stage_counts
+        counts.start(len(idx))
+
+        # Phase 1: structural prefilter
+        # Green candles are counted from 10 bars back
+        idx = counts.apply('history', f.position[idx] >= 10, idx)
 
         # 1. Count consecutive green candles
-        green_count = self.validator.count_consecutive_green(df, idx - 10, 10)
-        if green_count < self.min_candles:
-            return None
+        green_count = f.consecutive_counts(f.green_run, idx - 10, 10)
+        idx, green_count = counts.apply('green_candles', green_count >= self.min_candles,
+                                        idx, green_count)
 
+        # Phase 2: validation on the surviving bars
         # 2. Check volume increasing
         start_idx = idx - green_count + 1
-        if not self.validator.is_volume_increasing(df, start_idx, green_count):
-            return None
+        idx, green_count = counts.apply('volume_increasing',
+                                        f.volume_increasing(start_idx, green_count),
+                                        idx, green_count)
 
         # 3. Check EMA alignment: EMA(9) < EMA(21) < Close
-        is_aligned, ema9, ema21 = self.validator.check_ema_alignment(df, idx, 9, 21)
-        if not is_aligned:
-            return None
+        idx, green_count = counts.apply('ema_alignment', f.ema_alignment_mask(idx),
+                                        idx, green_count)
 
         # 4. Check pivot point (recent lows not broken)
-        pivot_holds = self.validator.check_pivot_point(df, idx, 5)
-        if not pivot_holds:
-            return None
+        idx, green_count = counts.apply('pivot_point', f.pivot_point_mask(idx, 5),
+                                        idx, green_count)
 
         # Calculate entry, stop, target
-        entry = df.iloc[idx]['Close']
+        entry = f.close[idx]
 
         # Stop: below recent pivot low
-        recent_low = df.iloc[max(0, idx - 5):idx]['Low'].min()
+        recent_low = f.min_lows(idx - 5, idx)
         stop = recent_low * 0.99  # 1% buffer
 
         # Target: 2x risk based on momentum
-        risk = abs(entry - stop)
-        target = entry + (risk * 2.0)
-
-        risk_reward = (target - entry) / risk if risk > 0 else 0
-
-        if risk_reward < self.min_risk_reward:
-            return None
+        target, risk_reward = _risk_reward(entry, stop, 2.0)
+        idx, green_count, entry, stop, target, risk_reward = counts.apply(
+            'risk_reward', ~(risk_reward < self.min_risk_reward),
+            idx, green_count, entry, stop, target, risk_reward)
 
-        # Calculate RSI
-        rsi_series = self.validator.calculate_rsi(df['Close'])
-        rsi = rsi_series.iloc[idx] if idx < len(rsi_series) else None
-
-        # Check VWAP
-        vwap = self.validator.calculate_vwap(df)
-        vwap_bullish = entry > vwap.iloc[idx] if idx < len(vwap) else False
-
-        # Volume spike check
-        volume_spike = self.validator.is_volume_spike(df, idx, 1.5, 20)
+        return {
+            'index': idx,
+            'entry': entry,
+            'stop': stop,
+            'target': target,
+            'risk_reward': risk_reward,
+            'volume_spike': f.volume_spike(1.5, 20)[idx],
+            'rsi': f.rsi[idx],
+            'ema_aligned': np.ones(len(idx), dtype=bool),
+            'vwap_bullish': entry > f.vwap[idx],
+            'valid': risk_reward >= self.min_risk_reward,
+            'notes': [f"{count} green candles, increasing volume"
+                      for count in green_count],
+        }
 
-        # Validity
-        valid = is_aligned and pivot_holds and risk_reward >= self.min_risk_reward
+    def _find_force_at_index(self, df: BarData, idx: int,
+                            timeframe: str,
+                            features: FOUSFeatures) -> Optional[FOUSSetup]:
+        """Find Force pattern at index"""
+        setups = self._scan_indices(df, np.array([idx]), timeframe, features)
+        return setups[0] if setups else None
 
-        return FOUSSetup(
-            date=df.iloc[idx]['Date'] if 'Date' in df.columns else df.index[idx],
-            pattern_type='Force',
-            timeframe=timeframe,
-            entry=entry,
-            stop=stop,
-            target=target,
-            risk_reward=risk_reward,
-            volume_spike=volume_spike,
-            rsi=rsi,
-            ema_aligned=is_aligned,
-            vwap_bullish=vwap_bullish,
-            valid=valid,
-            notes=f"{green_count} green candles, increasing volume"
-        )
+    # Common names used by ScanPipeline, LiveScanner and PanelScanner
+    _evaluate = _evaluate_force
+    _find_at_index = _find_force_at_index
 
 
 class SurvivalScanner:
@@ -157,110 +227,123 @@ class SurvivalScanner:
     - RSI < 30, rises to 30-45
     """
 
+    pattern_type = 'Survival'
+
+    # Trailing bars the scan loop leaves out (needs 2 candles after the signal)
+    bars_ahead = 2
+
     def __init__(self, min_red_candles: int = 5, min_risk_reward: float = 1.5):
         self.min_red_candles = min_red_candles
         self.min_risk_reward = min_risk_reward
         self.validator = FOUSValidator()
+        self.stage_counts = StageCounter()  # Bars removed per filter stage
 
-    def scan(self, df: pd.DataFrame, timeframe: str = '1h') -> List[FOUSSetup]:
+    def scan(self, df: BarData, timeframe: str = '1h',
+             features: Optional[FOUSFeatures] = None) -> List[FOUSSetup]:
         """Scan for Survival patterns"""
-        setups = []
+        self.stage_counts.reset()
 
         if len(df) < 50:
-            return setups
-
-        for i in range(50, len(df)):
-            setup = self._find_survival_at_index(df, i, timeframe)
-            if setup:
-                setups.append(setup)
-
-        return setups
-
-    def _find_survival_at_index(self, df: pd.DataFrame, idx: int,
-                                timeframe: str) -> Optional[FOUSSetup]:
-        """Find Survival pattern at index"""
-
+            return []
+
+        bars = as_bars(df)
+        if features is None:
+            features = FOUSFeatures(bars)
+
+        indices = np.arange(50, len(bars) - self.bars_ahead)
+        return self._scan_indices(bars, indices, timeframe, features)
+
+    def _scan_indices(self, df: BarData, indices: np.ndarray,
+                      timeframe: str, features: FOUSFeatures) -> List[FOUSSetup]:
+        """Evaluate Survival at the given bar indices"""
+        candidate = self._evaluate_survival(features, indices)
+        return _build_fous_setups(df, candidate, self.pattern_type, timeframe)
+
+    def _evaluate_survival(self, features: FOUSFeatures, indices: np.ndarray) -> dict:
+        """
+        Run the Survival rules over many bars at once
+
+        Args:
+            features: Features of the scanned DataFrame
+            indices: Bar indices to evaluate
+
+        Returns:
+            Dict of arrays for the bars that qualify
+        """
+        f = features
+        idx = np.asarray(indices, dtype=np.int64)
+        counts = self.stage_counts
+        counts.start(len(idx))
+
+        # Phase 1: structural prefilter
+        idx = counts.apply('history', f.position[idx] >= 50, idx)
         # Need at least 3 candles after downtrend for Wyckoff
-        if idx < 50 or idx + 3 > len(df):
-            return None
+        idx = counts.apply('lookahead', idx + 3 <= f.series_end(idx), idx)
 
         # 1. Check for previous downtrend (5+ red candles)
-        red_count = self.validator.count_consecutive_red(df, idx - 10, 10)
-        if red_count < self.min_red_candles:
-            return None
+        red_count = f.consecutive_counts(f.red_run, idx - 10, 10)
+        idx, red_count = counts.apply('red_candles', red_count >= self.min_red_candles,
+                                      idx, red_count)
 
+        # Phase 2: validation on the surviving bars
         # 2. Check Wyckoff logic (3 candles: opens lower, closes higher)
         wyckoff_idx = idx - red_count + 1
-        if not self.validator.has_wickoff_logic(df, wyckoff_idx, 3):
-            return None
+        idx, red_count, wyckoff_idx = counts.apply('wyckoff', f.wickoff_mask(wyckoff_idx, 3),
+                                                   idx, red_count, wyckoff_idx)
 
         # 3. Check EMA crossover (9 crosses above 21)
-        ema_cross = self.validator.check_ema_crossover(df, idx, 9, 21)
-        if not ema_cross:
-            return None
+        idx, red_count, wyckoff_idx = counts.apply('ema_crossover', f.ema_crossover_mask(idx),
+                                                   idx, red_count, wyckoff_idx)
 
-        # 4. Check RSI
-        rsi_series = self.validator.calculate_rsi(df['Close'])
-        if idx >= len(rsi_series):
-            return None
-
-        rsi = rsi_series.iloc[idx]
-
-        # RSI should be recovering from oversold
+        # 4. RSI should be recovering from oversold
         # Look for RSI that was < 30 recently and now 30-45
-        rsi_was_oversold = False
-        for j in range(max(0, idx - 5), idx):
-            if rsi_series.iloc[j] < 30:
-                rsi_was_oversold = True
-                break
-
-        if not (rsi_was_oversold and 30 <= rsi <= 45):
-            return None
+        rsi = f.rsi[idx]
+        rsi_was_oversold = f.rsi_below_count(30, idx - 5, idx) > 0
+        idx, red_count, wyckoff_idx, rsi = counts.apply(
+            'rsi', rsi_was_oversold & (30 <= rsi) & (rsi <= 45),
+            idx, red_count, wyckoff_idx, rsi)
 
         # 5. Volume spike check (at bottom)
-        volume_spike = self.validator.is_volume_spike(df, idx, 2.0, 20)
+        volume_spike = f.volume_spike(2.0, 20)[idx]
 
         # Calculate entry, stop, target
-        entry = df.iloc[idx]['Close']
+        entry = f.close[idx]
 
         # Stop: below Wyckoff bottom
-        wyckoff_low = df.iloc[wyckoff_idx:wyckoff_idx + 3]['Low'].min()
+        wyckoff_low = f.min_lows(wyckoff_idx, wyckoff_idx + 3)
         stop = wyckoff_low * 0.98
 
-        # Target: 2x risk (recovery trade)
-        risk = abs(entry - stop)
-        target = entry + (risk * 2.5)
-
-        risk_reward = (target - entry) / risk if risk > 0 else 0
-
-        if risk_reward < self.min_risk_reward:
-            return None
+        # Target: 2.5x risk (recovery trade)
+        target, risk_reward = _risk_reward(entry, stop, 2.5)
+        idx, red_count, rsi, volume_spike, entry, stop, target, risk_reward = counts.apply(
+            'risk_reward', ~(risk_reward < self.min_risk_reward),
+            idx, red_count, rsi, volume_spike, entry, stop, target, risk_reward)
 
-        # VWAP check
-        vwap = self.validator.calculate_vwap(df)
-        vwap_bullish = entry > vwap.iloc[idx] if idx < len(vwap) else False
-
-        # EMA alignment check
-        is_aligned, _, _ = self.validator.check_ema_alignment(df, idx, 9, 21)
+        return {
+            'index': idx,
+            'entry': entry,
+            'stop': stop,
+            'target': target,
+            'risk_reward': risk_reward,
+            'volume_spike': volume_spike,
+            'rsi': rsi,
+            'ema_aligned': f.ema_alignment_mask(idx),
+            'vwap_bullish': entry > f.vwap[idx],
+            'valid': volume_spike & (risk_reward >= self.min_risk_reward),
+            'notes': [f"Recovery from {count} red candles, RSI {value:.1f}"
+                      for count, value in zip(red_count, rsi)],
+        }
 
-        # Validity
-        valid = ema_cross and volume_spike and risk_reward >= self.min_risk_reward
+    def _find_survival_at_index(self, df: BarData, idx: int,
+                                timeframe: str,
+                                features: FOUSFeatures) -> Optional[FOUSSetup]:
+        """Find Survival pattern at index"""
+        setups = self._scan_indices(df, np.array([idx]), timeframe, features)
+        return setups[0] if setups else None
 
-        return FOUSSetup(
-            date=df.iloc[idx]['Date'] if 'Date' in df.columns else df.index[idx],
-            pattern_type='Survival',
-            timeframe=timeframe,
-            entry=entry,
-            stop=stop,
-            target=target,
-            risk_reward=risk_reward,
-            volume_spike=volume_spike,
-            rsi=rsi,
-            ema_aligned=is_aligned,
-            vwap_bullish=vwap_bullish,
-            valid=valid,
-            notes=f"Recovery from {red_count} red candles, RSI {rsi:.1f}"
-        )
+    # Common names used by ScanPipeline, LiveScanner and PanelScanner
+    _evaluate = _evaluate_survival
+    _find_at_index = _find_survival_at_index
 
 
 class RevivalScanner:
@@ -275,113 +358,118 @@ class RevivalScanner:
     - Price breaks above 20-EMA
     """
 
+    pattern_type = 'Revival'
+
+    # Trailing bars the scan loop leaves out (pattern looks 2 candles ahead)
+    bars_ahead = 2
+
     def __init__(self, min_risk_reward: float = 1.5):
         self.min_risk_reward = min_risk_reward
         self.validator = FOUSValidator()
+        self.stage_counts = StageCounter()  # Bars removed per filter stage
 
-    def scan(self, df: pd.DataFrame, timeframe: str = '1h') -> List[FOUSSetup]:
+    def scan(self, df: BarData, timeframe: str = '1h',
+             features: Optional[FOUSFeatures] = None) -> List[FOUSSetup]:
         """Scan for Revival patterns"""
-        setups = []
+        self.stage_counts.reset()
 
         if len(df) < 50:
-            return setups
-
-        for i in range(50, len(df) - 2):  # Need 2 candles ahead
-            setup = self._find_revival_at_index(df, i, timeframe)
-            if setup:
-                setups.append(setup)
-
-        return setups
-
-    def _find_revival_at_index(self, df: pd.DataFrame, idx: int,
-                               timeframe: str) -> Optional[FOUSSetup]:
-        """Find Revival pattern at index"""
-
+            return []
+
+        bars = as_bars(df)
+        if features is None:
+            features = FOUSFeatures(bars)
+
+        indices = np.arange(50, len(bars) - self.bars_ahead)  # Need 2 candles ahead
+        return self._scan_indices(bars, indices, timeframe, features)
+
+    def _scan_indices(self, df: BarData, indices: np.ndarray,
+                      timeframe: str, features: FOUSFeatures) -> List[FOUSSetup]:
+        """Evaluate Revival at the given bar indices"""
+        candidate = self._evaluate_revival(features, indices)
+        return _build_fous_setups(df, candidate, self.pattern_type, timeframe)
+
+    def _evaluate_revival(self, features: FOUSFeatures, indices: np.ndarray) -> dict:
+        """
+        Run the Revival rules over many bars at once
+
+        Args:
+            features: Features of the scanned DataFrame
+            indices: Bar indices to evaluate
+
+        Returns:
+            Dict of arrays for the bars that qualify
+        """
+        f = features
+        idx = np.asarray(indices, dtype=np.int64)
+        counts = self.stage_counts
+        counts.start(len(idx))
+
+        # Phase 1: structural prefilter
         # 1. Check 2-3 candle bottom (each closes higher)
         pattern_length = 3
-        if idx < pattern_length:
-            return None
-
-        closes_higher = True
-        for i in range(idx - pattern_length + 1, idx):
-            if df.iloc[i + 1]['Close'] <= df.iloc[i]['Close']:
-                closes_higher = False
-                break
-
-        if not closes_higher:
-            return None
+        idx = counts.apply('history', f.position[idx] >= pattern_length, idx)
+        idx = counts.apply('closes_higher', f.closes_higher_mask(idx, pattern_length), idx)
 
         # 2. Volume spike
-        volume_spike = self.validator.is_volume_spike(df, idx, 1.5, 20)
-        if not volume_spike:
-            return None
+        idx = counts.apply('volume_spike', f.volume_spike(1.5, 20)[idx], idx)
 
         # 3. Next candles have 40% higher volume
-        if idx + 2 >= len(df):
-            return None
+        idx = counts.apply('lookahead', idx + 2 < f.series_end(idx), idx)
 
-        avg_recent_vol = df.iloc[idx - 10:idx]['Volume'].mean()
-        next_candles_vol = df.iloc[idx + 1:idx + 3]['Volume'].mean()
+        # Phase 2: validation on the surviving bars
+        avg_recent_vol = f.mean_volumes(idx - 10, idx)
+        next_candles_vol = f.mean_volumes(idx + 1, idx + 3)
 
         high_volume_continues = next_candles_vol >= (avg_recent_vol * 1.4)
 
         # 4. VWAP turns bullish
-        vwap = self.validator.calculate_vwap(df)
-        if idx >= len(vwap):
-            return None
-
         # Check if price crossed above VWAP recently
-        vwap_bullish = df.iloc[idx]['Close'] > vwap.iloc[idx]
+        vwap_bullish = f.close[idx] > f.vwap[idx]
 
         # 5. Price breaks above 20-EMA
-        ema20 = df['Close'].ewm(span=20, adjust=False).mean()
-        if idx >= len(ema20):
-            return None
-
-        breaks_ema = df.iloc[idx]['Close'] > ema20.iloc[idx]
+        breaks_ema = f.close[idx] > f.ema20[idx]
 
         # Calculate entry, stop, target
-        entry = df.iloc[idx]['Close']
+        entry = f.close[idx]
 
         # Stop: below pattern low
-        pattern_low = df.iloc[idx - pattern_length:idx + 1]['Low'].min()
+        pattern_low = f.min_lows(idx - pattern_length, idx + 1)
         stop = pattern_low * 0.99
 
         # Target: 2.5x risk (breakout trade)
-        risk = abs(entry - stop)
-        target = entry + (risk * 2.5)
-
-        risk_reward = (target - entry) / risk if risk > 0 else 0
+        target, risk_reward = _risk_reward(entry, stop, 2.5)
+        (idx, high_volume_continues, vwap_bullish, breaks_ema,
+         entry, stop, target, risk_reward) = counts.apply(
+            'risk_reward', ~(risk_reward < self.min_risk_reward),
+            idx, high_volume_continues, vwap_bullish, breaks_ema,
+            entry, stop, target, risk_reward)
 
-        if risk_reward < self.min_risk_reward:
-            return None
+        return {
+            'index': idx,
+            'entry': entry,
+            'stop': stop,
+            'target': target,
+            'risk_reward': risk_reward,
+            'volume_spike': np.ones(len(idx), dtype=bool),
+            'rsi': f.rsi[idx],
+            'ema_aligned': f.ema_alignment_mask(idx),
+            'vwap_bullish': vwap_bullish,
+            'valid': (vwap_bullish & breaks_ema & high_volume_continues &
+                      (risk_reward >= self.min_risk_reward)),
+            'notes': [f"{pattern_length}-candle bottom, volume spike, VWAP bullish"] * len(idx),
+        }
 
-        # RSI
-        rsi_series = self.validator.calculate_rsi(df['Close'])
-        rsi = rsi_series.iloc[idx] if idx < len(rsi_series) else None
+    def _find_revival_at_index(self, df: BarData, idx: int,
+                               timeframe: str,
+                               features: FOUSFeatures) -> Optional[FOUSSetup]:
+        """Find Revival pattern at index"""
+        setups = self._scan_indices(df, np.array([idx]), timeframe, features)
+        return setups[0] if setups else None
 
-        # EMA alignment
-        is_aligned, _, _ = self.validator.check_ema_alignment(df, idx, 9, 21)
-
-        # Validity
-        valid = (volume_spike and vwap_bullish and breaks_ema and
-                high_volume_continues and risk_reward >= self.min_risk_reward)
-
-        return FOUSSetup(
-            date=df.iloc[idx]['Date'] if 'Date' in df.columns else df.index[idx],
-            pattern_type='Revival',
-            timeframe=timeframe,
-            entry=entry,
-            stop=stop,
-            target=target,
-            risk_reward=risk_reward,
-            volume_spike=volume_spike,
-            rsi=rsi,
-            ema_aligned=is_aligned,
-            vwap_bullish=vwap_bullish,
-            valid=valid,
-            notes=f"{pattern_length}-candle bottom, volume spike, VWAP bullish"
-        )
+    # Common names used by ScanPipeline, LiveScanner and PanelScanner
+    _evaluate = _evaluate_revival
+    _find_at_index = _find_revival_at_index
 
 
 class GoldScanner:
@@ -402,71 +490,108 @@ class GoldScanner:
         self.force_scanner = ForceScanner()
         self.survival_scanner = SurvivalScanner()
         self.revival_scanner = RevivalScanner()
+        self.stage_counts = StageCounter()  # Candidate pairs removed per filter stage
 
-    def scan(self, df: pd.DataFrame, timeframe: str = '5m',
-            df_15m: pd.DataFrame = None) -> List[FOUSSetup]:
+    def scan(self, df: BarData, timeframe: str = '5m',
+            df_15m: pd.DataFrame = None,
+            features: Optional[FOUSFeatures] = None) -> List[FOUSSetup]:
         """Scan for Gold patterns"""
+        self.stage_counts.reset()
         setups = []
 
         if len(df) < 100:
             return setups
 
+        # Bars and features are built once and shared by all three component scans
+        bars = as_bars(df)
+        if features is None:
+            features = FOUSFeatures(bars)
+
         # Scan component patterns
-        force_setups = self.force_scanner.scan(df, timeframe)
-        survival_setups = self.survival_scanner.scan(df, timeframe)
-        revival_setups = self.revival_scanner.scan(df, timeframe)
+        force_setups = self.force_scanner.scan(bars, timeframe, features)
+        survival_setups = self.survival_scanner.scan(bars, timeframe, features)
+        revival_setups = self.revival_scanner.scan(bars, timeframe, features)
+
+        return self.combine(force_setups, survival_setups, revival_setups,
+                            timeframe, features)
+
+    def combine(self, force_setups: List[FOUSSetup],
+                survival_setups: List[FOUSSetup],
+                revival_setups: List[FOUSSetup], timeframe: str,
+                features: FOUSFeatures,
+                rows: Optional[slice] = None) -> List[FOUSSetup]:
+        """
+        Build Gold setups from already-scanned component patterns
+
+        Args:
+            force_setups: Force setups from force_scanner
+            survival_setups: Survival setups from survival_scanner
+            revival_setups: Revival setups from revival_scanner
+            timeframe: Timeframe being scanned
+            features: Features of the scanned DataFrame
+            rows: Rows of features the setups were found in (default: all;
+                a panel passes one symbol's rows)
+
+        Returns:
+            List of Gold FOUSSetup objects
+        """
+        setups = []
+        counts = self.stage_counts
+        counts.start(len(force_setups) + len(survival_setups))
 
         # Create date lookup for quick matching
         revival_dates = {s.date: s for s in revival_setups}
 
-        # Look for Force + Revival
-        for force in force_setups:
-            if force.date in revival_dates:
-                gold = self._create_gold_setup(force, revival_dates[force.date],
-                                              'Force+Revival', df, timeframe)
-                if gold:
-                    setups.append(gold)
-
-        # Look for Survival + Revival (RSI > 40)
-        for survival in survival_setups:
-            if survival.date in revival_dates and survival.rsi and survival.rsi > 40:
-                gold = self._create_gold_setup(survival, revival_dates[survival.date],
-                                              'Survival+Revival', df, timeframe)
-                if gold:
-                    setups.append(gold)
-
-        return setups
-
-    def _create_gold_setup(self, pattern1: FOUSSetup, pattern2: FOUSSetup,
-                          combination: str, df: pd.DataFrame,
-                          timeframe: str) -> Optional[FOUSSetup]:
-        """Create Gold setup from component patterns"""
+        # Collect every candidate pair: Force + Revival, then Survival + Revival (RSI > 40)
+        candidates = [(force, revival_dates[force.date], 'Force+Revival')
+                      for force in force_setups if force.date in revival_dates]
+        candidates += [(survival, revival_dates[survival.date], 'Survival+Revival')
+                       for survival in survival_setups
+                       if survival.date in revival_dates and survival.rsi and survival.rsi > 40]
+        counts.record('pair', len(force_setups) + len(survival_setups) - len(candidates))
 
-        # Find index for this date
-        idx = None
-        for i, row in df.iterrows():
-            date_val = row['Date'] if 'Date' in df.columns else df.index[i]
-            if date_val == pattern1.date:
-                idx = i
-                break
-
-        if idx is None:
-            return None
-
-        # Check volume 3x average
-        volume_spike = self.validator.is_volume_spike(df, idx, 3.0, 20)
-        if not volume_spike:
-            return None
-
-        # Check low volatility
-        low_vol = self.validator.is_low_volatility(df, idx, 100, 0.2)
+        if not candidates:
+            return setups
 
-        # Use better R:R of the two patterns
-        risk_reward = max(pattern1.risk_reward, pattern2.risk_reward)
+        # Evaluate the bar-level filters for all candidates at once
+        positions = features.rows_for_dates((pattern1.date for pattern1, _, _ in candidates),
+                                            rows)
+        found = positions >= 0
+        volume_spike = np.zeros(len(positions), dtype=bool)
+        volume_spike[found] = features.volume_spike(3.0, 20)[positions[found]]
+        low_vol = np.zeros(len(positions), dtype=bool)
+        low_vol[found] = features.low_volatility(100, 0.2)[positions[found]]
+
+        best_rr = np.array([max(pattern1.risk_reward, pattern2.risk_reward)
+                            for pattern1, pattern2, _ in candidates], dtype=float)
+        keep, best_rr = counts.apply('volume_spike', volume_spike,
+                                     np.arange(len(candidates)), best_rr)
+        keep = counts.apply('risk_reward', ~(best_rr < self.min_risk_reward), keep)
+
+        for i in keep:
+            pattern1, pattern2, combination = candidates[i]
+            setups.append(self._create_gold_setup(pattern1, pattern2, combination, timeframe,
+                                                  bool(volume_spike[i]), bool(low_vol[i])))
 
-        if risk_reward < self.min_risk_reward:
-            return None
+        return setups
 
+    def _create_gold_setup(self, pattern1: FOUSSetup, pattern2: FOUSSetup,
+                          combination: str, timeframe: str,
+                          volume_spike: bool, low_vol: bool) -> FOUSSetup:
+        """
+        Create Gold setup from component patterns
+
+        Args:
+            pattern1: Force or Survival setup
+            pattern2: Revival setup on the same bar
+            combination: 'Force+Revival' or 'Survival+Revival'
+            timeframe: Timeframe being scanned
+            volume_spike: 3x volume spike on the bar
+            low_vol: Volatility near historical low on the bar
+
+        Returns:
+            FOUSSetup with pattern_type 'Gold'
+        """
         # Take entry/stop/target from Revival (it's the breakout)
         entry = pattern2.entry
         stop = pattern2.stop
@@ -3,6 +3,41 @@ FOUS Pattern Validators - Volume, RSI, VWAP, Volatility
 """
 import pandas as pd
 import numpy as np
+from functools import cached_property
+from typing import Optional
+from array_utils import forward_run_lengths, trailing_mean, trailing_quantile, window_min
+from bar_arrays import BarArrays, BarData, as_bars
+from streaming_indicators import SessionVWAPState
+from validators import EntryValidator
+
+
+def _mean_skipna(values: np.ndarray) -> float:
+    """Mean ignoring NaN (NaN if nothing is left), like pandas Series.mean"""
+    missing = np.isnan(values)
+    count = len(values) - missing.sum()
+    if count == 0:
+        return np.nan
+    return np.where(missing, 0.0, values).sum() / count
+
+
+def _close_emas(df: BarData, fast: int, slow: int) -> tuple:
+    """
+    Close prices and fast/slow EMAs as arrays
+
+    BarArrays read the EMAs from their indicator cache; a DataFrame is
+    computed directly, as it has no cache to share.
+    """
+    if isinstance(df, BarArrays):
+        return (df.close, EntryValidator.cached_ema(df, fast),
+                EntryValidator.cached_ema(df, slow))
+    close = df['Close']
+    return (close.to_numpy(), EntryValidator.calculate_ema(close, fast).to_numpy(),
+            EntryValidator.calculate_ema(close, slow).to_numpy())
+
+
+def _min_skipna(values: np.ndarray) -> float:
+    """Minimum ignoring NaN (NaN if nothing is left), like pandas Series.min"""
+    return np.fmin.reduce(values) if len(values) else np.nan
 
 
 class FOUSValidator:
@@ -29,121 +64,161 @@ class FOUSValidator:
         return rsi
 
     @staticmethod
-    def calculate_vwap(df: pd.DataFrame) -> pd.Series:
+    def cached_rsi(bars: BarArrays, period: int = 14) -> np.ndarray:
+        """calculate_rsi of the bars' close prices, from the bars' indicator cache"""
+        return bars.indicators.get('rsi', (period,), lambda: FOUSValidator.calculate_rsi(
+            bars.series('Close'), period).to_numpy())
+
+    @staticmethod
+    def calculate_vwap(df: BarData) -> pd.Series:
         """
         Calculate VWAP (Volume Weighted Average Price)
 
         Args:
-            df: DataFrame with High, Low, Close, Volume
+            df: DataFrame (or BarArrays) with High, Low, Close, Volume
 
         Returns:
             VWAP values
         """
+        if isinstance(df, BarArrays):
+            df = {name: df.series(name) for name in ('High', 'Low', 'Close', 'Volume')}
+
         typical_price = (df['High'] + df['Low'] + df['Close']) / 3
         vwap = (typical_price * df['Volume']).cumsum() / df['Volume'].cumsum()
         return vwap
 
     @staticmethod
-    def is_volume_increasing(df: pd.DataFrame, start_idx: int, count: int) -> bool:
+    def calculate_session_vwap(df: BarData, tz: Optional[str] = 'UTC',
+                               session_start: str = '00:00') -> pd.Series:
+        """
+        Calculate VWAP anchored to the start of each trading session
+
+        Unlike calculate_vwap, the value at a bar only depends on that
+        session's bars, not on how much history was loaded. All sessions
+        are computed in one grouped cumulative pass; SessionVWAPState
+        carries the same values on as new bars arrive.
+
+        Args:
+            df: DataFrame (or BarArrays) with datetime dates and High,
+                Low, Close, Volume
+            tz: Time zone sessions are counted in (UTC days for crypto)
+            session_start: Local time each session opens (HH:MM, e.g.
+                '09:30' with tz='America/New_York')
+
+        Returns:
+            VWAP values (calculate_vwap of each session's bars)
+        """
+        bars = as_bars(df)
+        if bars.timestamps is None:
+            raise ValueError("Session VWAP needs bars with datetime dates")
+
+        vwap = SessionVWAPState(tz, session_start).advance(
+            bars.dates, bars.high, bars.low, bars.close, bars.volume)
+        index = df.index if isinstance(df, pd.DataFrame) else None
+        return pd.Series(vwap, index=index)
+
+    @staticmethod
+    def is_volume_increasing(df: BarData, start_idx: int, count: int) -> bool:
         """
         Check if volume is increasing for consecutive candles
 
         Args:
-            df: DataFrame with Volume
+            df: DataFrame or BarArrays with Volume
             start_idx: Starting index
             count: Number of candles to check
 
         Returns:
             True if volume increases each candle
         """
-        if start_idx + count > len(df):
+        volume = as_bars(df).volume
+        if start_idx + count > len(volume):
             return False
 
         for i in range(start_idx, start_idx + count - 1):
-            if df.iloc[i + 1]['Volume'] <= df.iloc[i]['Volume']:
+            if volume[i + 1] <= volume[i]:
                 return False
         return True
 
     @staticmethod
-    def count_consecutive_green(df: pd.DataFrame, start_idx: int, max_count: int = 10) -> int:
+    def count_consecutive_green(df: BarData, start_idx: int, max_count: int = 10) -> int:
         """
         Count consecutive green (bullish) candles
 
         Args:
-            df: DataFrame with Open, Close
+            df: DataFrame or BarArrays with Open, Close
             start_idx: Starting index
             max_count: Maximum to count
 
         Returns:
             Number of consecutive green candles
         """
+        bars = as_bars(df)
         count = 0
-        for i in range(start_idx, min(start_idx + max_count, len(df))):
-            if df.iloc[i]['Close'] > df.iloc[i]['Open']:
+        for i in range(start_idx, min(start_idx + max_count, len(bars))):
+            if bars.close[i] > bars.open[i]:
                 count += 1
             else:
                 break
         return count
 
     @staticmethod
-    def count_consecutive_red(df: pd.DataFrame, start_idx: int, max_count: int = 10) -> int:
+    def count_consecutive_red(df: BarData, start_idx: int, max_count: int = 10) -> int:
         """
         Count consecutive red (bearish) candles
 
         Args:
-            df: DataFrame with Open, Close
+            df: DataFrame or BarArrays with Open, Close
             start_idx: Starting index
             max_count: Maximum to count
 
         Returns:
             Number of consecutive red candles
         """
+        bars = as_bars(df)
         count = 0
-        for i in range(start_idx, min(start_idx + max_count, len(df))):
-            if df.iloc[i]['Close'] < df.iloc[i]['Open']:
+        for i in range(start_idx, min(start_idx + max_count, len(bars))):
+            if bars.close[i] < bars.open[i]:
                 count += 1
             else:
                 break
         return count
 
     @staticmethod
-    def has_wickoff_logic(df: pd.DataFrame, idx: int, count: int = 3) -> bool:
+    def has_wickoff_logic(df: BarData, idx: int, count: int = 3) -> bool:
         """
         Check Wyckoff logic: Opens lower, closes higher for N candles
 
         Args:
-            df: DataFrame with Open, Close
+            df: DataFrame or BarArrays with Open, Close
             idx: Starting index
             count: Number of candles (default 3)
 
         Returns:
             True if pattern matches
         """
-        if idx + count > len(df):
+        bars = as_bars(df)
+        if idx + count > len(bars):
             return False
 
         for i in range(idx, idx + count - 1):
-            current = df.iloc[i]
-            next_candle = df.iloc[i + 1]
-
             # Opens lower than previous close
-            if next_candle['Open'] >= current['Close']:
+            if bars.open[i + 1] >= bars.close[i]:
                 return False
 
             # Closes higher than open (green candle)
-            if next_candle['Close'] <= next_candle['Open']:
+            if bars.close[i + 1] <= bars.open[i + 1]:
                 return False
 
         return True
 
     @staticmethod
-    def is_volume_spike(df: pd.DataFrame, idx: int, multiplier: float = 3.0,
+    def is_volume_spike(df: BarData, idx: int, multiplier: float = 3.0,
                        lookback: int = 20) -> bool:
         """
         Check if current volume is a spike (N times average)
 
         Args:
-            df: DataFrame with Volume
+            df: DataFrame or BarArrays with Volume
             idx: Current index
             multiplier: Volume multiplier (default 3x)
             lookback: Lookback period for average
@@ -154,8 +229,9 @@ class FOUSValidator:
         if idx < lookback:
             return False
 
-        avg_volume = df.iloc[idx - lookback:idx]['Volume'].mean()
-        current_volume = df.iloc[idx]['Volume']
+        volume = as_bars(df).volume
+        avg_volume = _mean_skipna(volume[idx - lookback:idx])
+        current_volume = volume[idx]
 
         return current_volume >= (avg_volume * multiplier)
 
@@ -176,13 +252,43 @@ class FOUSValidator:
         return volatility
 
     @staticmethod
-    def is_low_volatility(df: pd.DataFrame, idx: int, period: int = 100,
+    def cached_volatility(bars: BarArrays, period: int = 20) -> np.ndarray:
+        """calculate_volatility of the bars' close prices, from the bars' indicator cache"""
+        return bars.indicators.get('volatility', (period,), lambda: (
+            FOUSValidator.calculate_volatility(bars.series('Close'), period).to_numpy()))
+
+    @staticmethod
+    def calculate_low_volatility(prices: pd.Series, period: int = 100,
+                                 percentile: float = 0.2) -> pd.Series:
+        """
+        Low-volatility regime flag for every bar
+
+        One rolling-quantile pass over the volatility series; entry i is
+        what is_low_volatility(df, i, period, percentile) returns.
+
+        Args:
+            prices: Close prices
+            period: Historical period to compare
+            percentile: Percentile threshold (0.2 = bottom 20%)
+
+        Returns:
+            Boolean Series
+        """
+        volatility = FOUSValidator.calculate_volatility(prices).to_numpy()
+        threshold = trailing_quantile(volatility, period, percentile)
+
+        # NaN volatility or threshold compares False, as in the per-bar check
+        low_vol = volatility <= threshold
+        return pd.Series(low_vol, index=prices.index)
+
+    @staticmethod
+    def is_low_volatility(df: BarData, idx: int, period: int = 100,
                          percentile: float = 0.2) -> bool:
         """
         Check if current volatility is near historical low
 
         Args:
-            df: DataFrame with Close
+            df: DataFrame or BarArrays with Close
             idx: Current index
             period: Historical period to compare
             percentile: Percentile threshold (0.2 = bottom 20%)
@@ -193,7 +299,7 @@ class FOUSValidator:
         if idx < period:
             return False
 
-        volatility = FOUSValidator.calculate_volatility(df['Close'])
+        volatility = FOUSValidator.calculate_volatility(as_bars(df).series('Close'))
 
         if pd.isna(volatility.iloc[idx]):
             return False
@@ -204,13 +310,13 @@ class FOUSValidator:
         return volatility.iloc[idx] <= threshold
 
     @staticmethod
-    def check_ema_alignment(df: pd.DataFrame, idx: int,
+    def check_ema_alignment(df: BarData, idx: int,
                            fast: int = 9, slow: int = 21) -> tuple:
         """
         Check EMA alignment: EMA(9) vs EMA(21) vs Close
 
         Args:
-            df: DataFrame with Close
+            df: DataFrame or BarArrays with Close
             idx: Current index
             fast: Fast EMA period
             slow: Slow EMA period
@@ -218,15 +324,14 @@ class FOUSValidator:
         Returns:
             (is_bullish, ema_fast, ema_slow) tuple
         """
-        ema_fast = df['Close'].ewm(span=fast, adjust=False).mean()
-        ema_slow = df['Close'].ewm(span=slow, adjust=False).mean()
+        close, ema_fast, ema_slow = _close_emas(df, fast, slow)
 
         if idx >= len(ema_fast) or idx >= len(ema_slow):
             return (False, None, None)
 
-        close = df.iloc[idx]['Close']
-        fast_val = ema_fast.iloc[idx]
-        slow_val = ema_slow.iloc[idx]
+        close = close[idx]
+        fast_val = ema_fast[idx]
+        slow_val = ema_slow[idx]
 
         # Bullish: EMA(9) < EMA(21) < Close
         is_bullish = fast_val < slow_val < close
@@ -234,13 +339,13 @@ class FOUSValidator:
         return (is_bullish, fast_val, slow_val)
 
     @staticmethod
-    def check_ema_crossover(df: pd.DataFrame, idx: int,
+    def check_ema_crossover(df: BarData, idx: int,
                            fast: int = 9, slow: int = 21) -> bool:
         """
         Check if EMA(9) just crossed above EMA(21)
 
         Args:
-            df: DataFrame with Close
+            df: DataFrame or BarArrays with Close
             idx: Current index
             fast: Fast EMA
             slow: Slow EMA
@@ -251,23 +356,22 @@ class FOUSValidator:
         if idx < 1:
             return False
 
-        ema_fast = df['Close'].ewm(span=fast, adjust=False).mean()
-        ema_slow = df['Close'].ewm(span=slow, adjust=False).mean()
+        _, ema_fast, ema_slow = _close_emas(df, fast, slow)
 
         # Previous: fast <= slow
         # Current: fast > slow
-        prev_cross = ema_fast.iloc[idx - 1] <= ema_slow.iloc[idx - 1]
-        curr_cross = ema_fast.iloc[idx] > ema_slow.iloc[idx]
+        prev_cross = ema_fast[idx - 1] <= ema_slow[idx - 1]
+        curr_cross = ema_fast[idx] > ema_slow[idx]
 
         return prev_cross and curr_cross
 
     @staticmethod
-    def check_pivot_point(df: pd.DataFrame, idx: int, lookback: int = 5) -> bool:
+    def check_pivot_point(df: BarData, idx: int, lookback: int = 5) -> bool:
         """
         Check if recent lows have not been broken
 
         Args:
-            df: DataFrame with Low
+            df: DataFrame or BarArrays with Low
             idx: Current index
             lookback: Lookback period
 
@@ -277,9 +381,529 @@ class FOUSValidator:
         if idx < lookback:
             return False
 
-        recent_lows = df.iloc[idx - lookback:idx]['Low']
-        min_low = recent_lows.min()
-        current_low = df.iloc[idx]['Low']
+        low = as_bars(df).low
+        min_low = _min_skipna(low[idx - lookback:idx])
+        current_low = low[idx]
 
         # Pivot holds if current low is above min of recent lows
         return current_low >= min_low
+
+    # Batch versions: arrays of candidate bars in, arrays out (same rules as
+    # above), evaluated on FOUSFeatures of the bars
+
+    @staticmethod
+    def volume_increasing_mask(df: BarData, starts: np.ndarray, count) -> np.ndarray:
+        """
+        is_volume_increasing for many start bars
+
+        Args:
+            df: DataFrame or BarArrays with Volume
+            starts: Starting indices
+            count: Number of candles to check (scalar or one per start)
+
+        Returns:
+            Boolean array, one entry per start
+        """
+        return FOUSFeatures(df).volume_increasing(starts, count)
+
+    @staticmethod
+    def consecutive_green_counts(df: BarData, starts: np.ndarray,
+                                 max_count: int = 10) -> np.ndarray:
+        """count_consecutive_green for many start bars (int64 array)"""
+        return EntryValidator.consecutive_candle_counts(df, starts, True, max_count)
+
+    @staticmethod
+    def consecutive_red_counts(df: BarData, starts: np.ndarray,
+                               max_count: int = 10) -> np.ndarray:
+        """count_consecutive_red for many start bars (int64 array)"""
+        return EntryValidator.consecutive_candle_counts(df, starts, False, max_count)
+
+    @staticmethod
+    def wickoff_mask(df: BarData, starts: np.ndarray, count: int = 3) -> np.ndarray:
+        """
+        has_wickoff_logic for many start bars
+
+        Args:
+            df: DataFrame or BarArrays with Open, Close
+            starts: Starting indices
+            count: Number of candles (default 3)
+
+        Returns:
+            Boolean array, one entry per start
+        """
+        return FOUSFeatures(df).wickoff_mask(starts, count)
+
+    @staticmethod
+    def volume_spike_mask(df: BarData, indices: np.ndarray, multiplier: float = 3.0,
+                          lookback: int = 20) -> np.ndarray:
+        """
+        is_volume_spike for many bars
+
+        Args:
+            df: DataFrame or BarArrays with Volume
+            indices: Bars to check
+            multiplier: Volume multiplier (default 3x)
+            lookback: Lookback period for average
+
+        Returns:
+            Boolean array, one entry per index
+        """
+        return FOUSFeatures(df).volume_spike(multiplier, lookback)[indices]
+
+    @staticmethod
+    def low_volatility_mask(df: BarData, indices: np.ndarray, period: int = 100,
+                            percentile: float = 0.2) -> np.ndarray:
+        """
+        is_low_volatility for many bars
+
+        Args:
+            df: DataFrame or BarArrays with Close
+            indices: Bars to check
+            period: Historical period to compare
+            percentile: Percentile threshold (0.2 = bottom 20%)
+
+        Returns:
+            Boolean array, one entry per index
+        """
+        return FOUSFeatures(df).low_volatility(period, percentile)[indices]
+
+    @staticmethod
+    def ema_alignment_mask(df: BarData, indices: np.ndarray,
+                           fast: int = 9, slow: int = 21) -> np.ndarray:
+        """
+        First element of check_ema_alignment for many bars
+
+        Args:
+            df: DataFrame or BarArrays with Close
+            indices: Bars to check (bars past the end are False)
+            fast: Fast EMA period
+            slow: Slow EMA period
+
+        Returns:
+            Boolean array: EMA(fast) < EMA(slow) < Close at each index
+        """
+        features = FOUSFeatures(df)
+        indices = np.asarray(indices, dtype=np.int64)
+        inside = indices < len(features)
+
+        aligned = np.zeros(len(indices), dtype=bool)
+        aligned[inside] = features.ema_alignment_mask(indices[inside], fast, slow)
+        return aligned
+
+    @staticmethod
+    def ema_crossover_mask(df: BarData, indices: np.ndarray,
+                           fast: int = 9, slow: int = 21) -> np.ndarray:
+        """
+        check_ema_crossover for many bars
+
+        Args:
+            df: DataFrame or BarArrays with Close
+            indices: Bars to check
+            fast: Fast EMA
+            slow: Slow EMA
+
+        Returns:
+            Boolean array, one entry per index
+        """
+        return FOUSFeatures(df).ema_crossover_mask(indices, fast, slow)
+
+    @staticmethod
+    def pivot_point_mask(df: BarData, indices: np.ndarray, lookback: int = 5) -> np.ndarray:
+        """
+        check_pivot_point for many bars
+
+        Args:
+            df: DataFrame or BarArrays with Low
+            indices: Bars to check
+            lookback: Lookback period
+
+        Returns:
+            Boolean array, one entry per index
+        """
+        return FOUSFeatures(df).pivot_point_mask(indices, lookback)
+
+
+class FOUSFeatures:
+    """
+    Feature frame shared by the FOUS scanners
+
+    Every indicator the Force/Survival/Revival/Gold rules look at is
+    computed once over the whole DataFrame and then read by bar index,
+    instead of being recomputed for every bar. Values are identical to
+    the per-bar FOUSValidator calls.
+
+    Indicators and derived arrays are computed on first use, so a caller
+    reading one mask only pays for the arrays that mask needs.
+    """
+
+    VOLUME_LOOKBACK = 20
+
+    def __init__(self, df: BarData, indicators: Optional[dict] = None):
+        """
+        Build features for a DataFrame
+
+        Args:
+            df: DataFrame (or BarArrays) with Open, High, Low, Close, Volume
+            indicators: Optional precomputed 'vwap', 'ema9', 'ema20', 'ema21'
+                arrays (e.g. from streaming state) used instead of computing
+                them from df
+        """
+        bars = as_bars(df)
+        self.open = bars.open
+        self.high = bars.high
+        self.low = bars.low
+        self.close = bars.close
+        self.volume = bars.volume
+        self.dates = bars.dates
+        self._date_rows = None
+        self._bars = bars
+        self._indicators = indicators or {}
+
+        # Bar number within its series, and the row after the series' last bar
+        self.position = np.arange(len(bars))
+        self._series_end = np.full(len(bars), len(bars), dtype=np.int64)
+        self._init_caches()
+
+    @classmethod
+    def from_panel(cls, panel) -> 'FOUSFeatures':
+        """
+        Build features for many symbols at once
+
+        Indicators are computed column-wise over the panel's 2-D
+        (bar x symbol) frames and flattened symbol by symbol, so row
+        panel.flat_index(symbol, i) holds the same values FOUSFeatures(df)
+        has at row i of that symbol's DataFrame.
+
+        Args:
+            panel: Panel of OHLCV data (see panel_scanner.Panel)
+
+        Returns:
+            FOUSFeatures over panel.frame
+        """
+        self = cls.__new__(cls)
+        columns = {name: panel.matrix(name) for name in
+                   ('Open', 'High', 'Low', 'Close', 'Volume')}
+
+        def flat(values) -> np.ndarray:
+            return np.array(values, dtype=float).T.ravel()
+
+        self.open = flat(columns['Open'])
+        self.high = flat(columns['High'])
+        self.low = flat(columns['Low'])
+        self.close = flat(columns['Close'])
+        self.volume = flat(columns['Volume'])
+        self.dates = pd.Index(panel.frame['Date'])
+        self._date_rows = None
+        self._bars = None
+        self._indicators = {}
+
+        self.position = panel.positions()
+        self._series_end = panel.series_ends()
+
+        close = columns['Close']
+        rsi = flat(FOUSValidator.calculate_rsi(close))
+        # The padding before a symbol reads as flat prices; RSI needs 14 real changes
+        rsi[self.position < 13] = np.nan
+        self.rsi = rsi
+        self.vwap = flat(FOUSValidator.calculate_vwap(columns))
+        self.ema9 = flat(close.ewm(span=9, adjust=False).mean())
+        self.ema20 = flat(close.ewm(span=20, adjust=False).mean())
+        self.ema21 = flat(close.ewm(span=21, adjust=False).mean())
+        self.volatility = flat(FOUSValidator.calculate_volatility(close))
+
+        self._init_caches()
+        return self
+
+    def _init_caches(self) -> None:
+        """Empty caches of the parameterized flags"""
+        self._avg_volume = {}
+        self._volume_spike = {}
+        self._low_volatility = {}
+
+    def _indicator(self, name: str, compute) -> np.ndarray:
+        """Precomputed indicator passed to __init__, else compute()"""
+        if name in self._indicators:
+            return np.asarray(self._indicators[name], dtype=float)
+        return compute()
+
+    @cached_property
+    def rsi(self) -> np.ndarray:
+        """RSI(14) of the close prices"""
+        return FOUSValidator.cached_rsi(self._bars)
+
+    @cached_property
+    def vwap(self) -> np.ndarray:
+        """VWAP of the bars"""
+        return self._indicator('vwap', lambda: FOUSValidator.calculate_vwap(self._bars).to_numpy())
+
+    @cached_property
+    def ema9(self) -> np.ndarray:
+        """EMA(9) of the close prices"""
+        return self._indicator('ema9', lambda: EntryValidator.cached_ema(self._bars, 9))
+
+    @cached_property
+    def ema20(self) -> np.ndarray:
+        """EMA(20) of the close prices"""
+        return self._indicator('ema20', lambda: EntryValidator.cached_ema(self._bars, 20))
+
+    @cached_property
+    def ema21(self) -> np.ndarray:
+        """EMA(21) of the close prices"""
+        return self._indicator('ema21', lambda: EntryValidator.cached_ema(self._bars, 21))
+
+    @cached_property
+    def volatility(self) -> np.ndarray:
+        """Annualized volatility of the close prices"""
+        return FOUSValidator.cached_volatility(self._bars)
+
+    @cached_property
+    def green(self) -> np.ndarray:
+        """Bars closing above their open"""
+        return self.close > self.open
+
+    @cached_property
+    def red(self) -> np.ndarray:
+        """Bars closing below their open"""
+        return self.close < self.open
+
+    @cached_property
+    def green_run(self) -> np.ndarray:
+        """Green candles in a row from each bar"""
+        return forward_run_lengths(self.green)
+
+    @cached_property
+    def red_run(self) -> np.ndarray:
+        """Red candles in a row from each bar"""
+        return forward_run_lengths(self.red)
+
+    @cached_property
+    def avg_volume(self) -> np.ndarray:
+        """Mean volume of the VOLUME_LOOKBACK bars before each bar"""
+        return self.average_volume(self.VOLUME_LOOKBACK)
+
+    def _events_before(self, event: np.ndarray) -> np.ndarray:
+        """Cumulative count of per-bar events (index i = events before bar i)"""
+        counts = np.zeros(len(self) + 1, dtype=np.int64)
+        np.cumsum(event, out=counts[2:])
+        return counts
+
+    @cached_property
+    def _volume_drops(self) -> np.ndarray:
+        """Bars whose volume is not above the bar before, counted"""
+        return self._events_before(self.volume[1:] <= self.volume[:-1])
+
+    @cached_property
+    def _close_falls(self) -> np.ndarray:
+        """Bars whose close is not above the close before, counted"""
+        return self._events_before(self.close[1:] <= self.close[:-1])
+
+    @cached_property
+    def _wickoff_failures(self) -> np.ndarray:
+        """Bars breaking the wickoff rule, counted"""
+        return self._events_before((self.open[1:] >= self.close[:-1]) |
+                                   (self.close[1:] <= self.open[1:]))
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def rows_for_dates(self, dates, rows: Optional[slice] = None) -> np.ndarray:
+        """
+        Row of the first bar with each date
+
+        Args:
+            dates: Iterable of dates (as stored on setups)
+            rows: Only search these rows (default: all)
+
+        Returns:
+            int64 array of row positions, -1 where a date is not in the frame
+        """
+        if rows is not None:
+            start = rows.indices(len(self))[0]
+            searched = self.dates[rows]
+            first = ~searched.duplicated()
+            date_rows = (searched[first], np.flatnonzero(first) + start)
+        else:
+            if self._date_rows is None:
+                first = ~self.dates.duplicated()
+                self._date_rows = (self.dates[first], np.flatnonzero(first))
+            date_rows = self._date_rows
+
+        unique_dates, rows = date_rows
+        positions = unique_dates.get_indexer(pd.Index(list(dates)))
+        found = positions >= 0
+
+        result = np.full(len(positions), -1, dtype=np.int64)
+        result[found] = rows[positions[found]]
+        return result
+
+    def low_volatility(self, period: int = 100,
+                       percentile: float = 0.2) -> np.ndarray:
+        """
+        Low-volatility regime flag for every bar
+
+        Args:
+            period: Historical period to compare
+            percentile: Percentile threshold (0.2 = bottom 20%)
+
+        Returns:
+            Boolean array (same rule as FOUSValidator.is_low_volatility)
+        """
+        key = (period, percentile)
+        if key not in self._low_volatility:
+            threshold = trailing_quantile(self.volatility, period, percentile)
+            self._low_volatility[key] = ((self.volatility <= threshold) &
+                                         (self.position >= period))
+        return self._low_volatility[key]
+
+    def average_volume(self, lookback: int) -> np.ndarray:
+        """Mean volume of the `lookback` bars before each bar"""
+        if lookback not in self._avg_volume:
+            average = trailing_mean(self.volume, lookback)
+            average[self.position < lookback] = np.nan
+            self._avg_volume[lookback] = average
+        return self._avg_volume[lookback]
+
+    def volume_spike(self, multiplier: float = 3.0,
+                     lookback: int = VOLUME_LOOKBACK) -> np.ndarray:
+        """
+        Volume spike flag for every bar
+
+        Args:
+            multiplier: Volume multiplier
+            lookback: Lookback period for average
+
+        Returns:
+            Boolean array (same rule as FOUSValidator.is_volume_spike)
+        """
+        key = (multiplier, lookback)
+        if key not in self._volume_spike:
+            spike = self.volume >= self.average_volume(lookback) * multiplier
+            spike[self.position < lookback] = False
+            self._volume_spike[key] = spike
+        return self._volume_spike[key]
+
+    def series_end(self, indices: np.ndarray) -> np.ndarray:
+        """Row after the last bar of the series each index belongs to"""
+        indices = np.clip(np.asarray(indices, dtype=np.int64), 0, len(self) - 1)
+        return self._series_end[indices]
+
+    def consecutive_counts(self, runs: np.ndarray, starts: np.ndarray,
+                           max_count: int = 10) -> np.ndarray:
+        """Precomputed run length at each start, capped at max_count and the series end"""
+        starts = np.asarray(starts, dtype=np.int64)
+        return np.minimum(np.minimum(runs[starts], max_count),
+                          self.series_end(starts) - starts)
+
+    def volume_increasing(self, starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """is_volume_increasing for many (start, count) windows"""
+        starts = np.asarray(starts, dtype=np.int64)
+        stops = starts + np.asarray(counts, dtype=np.int64)
+        inside = stops <= self.series_end(starts)
+        drops = self._count_between(self._volume_drops, starts + 1,
+                                    np.where(inside, stops, starts + 1))
+        return inside & (drops == 0)
+
+    def wickoff_mask(self, starts: np.ndarray, count: int = 3) -> np.ndarray:
+        """has_wickoff_logic for many start indices"""
+        starts = np.asarray(starts, dtype=np.int64)
+        stops = starts + count
+        inside = stops <= self.series_end(starts)
+        failures = self._count_between(self._wickoff_failures, starts + 1,
+                                       np.where(inside, stops, starts + 1))
+        return inside & (failures == 0)
+
+    def pivot_point_mask(self, indices: np.ndarray, lookback: int = 5) -> np.ndarray:
+        """FOUSValidator.check_pivot_point for many bars"""
+        indices = np.asarray(indices, dtype=np.int64)
+        holds = self.low[indices] >= self.min_lows(indices - lookback, indices)
+        return (self.position[indices] >= lookback) & holds
+
+    def closes_higher_mask(self, indices: np.ndarray, length: int = 3) -> np.ndarray:
+        """Each of the last `length` closes up to each bar is above the one before"""
+        indices = np.asarray(indices, dtype=np.int64)
+        falls = self._count_between(self._close_falls, indices - length + 2, indices + 1)
+        return falls == 0
+
+    def rsi_below_count(self, threshold: float, starts: np.ndarray,
+                        stops: np.ndarray) -> np.ndarray:
+        """Bars with RSI below threshold over each [start, stop) window"""
+        below = np.concatenate(([0], np.cumsum(self.rsi < threshold)))
+        starts = np.clip(starts, 0, len(self))
+        stops = np.clip(stops, starts, len(self))
+        return below[stops] - below[starts]
+
+    def min_lows(self, starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+        """Lowest low over many [start, stop) windows, skipping NaN like pandas"""
+        starts = np.clip(np.asarray(starts, dtype=np.int64), 0, len(self))
+        stops = np.clip(np.asarray(stops, dtype=np.int64), 0, len(self))
+        return window_min(self.low, starts, stops)
+
+    def mean_volumes(self, starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+        """
+        Mean volume over many [start, stop) windows of equal width,
+        skipping NaN like pandas
+
+        Windows reaching outside the array give undefined values; callers
+        mask those bars out.
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        if len(starts) == 0:
+            return np.empty(0, dtype=float)
+        width = int(np.max(np.asarray(stops) - starts))
+        rows = np.clip(starts[:, None] + np.arange(width), 0, len(self) - 1)
+
+        window = self.volume[rows]
+        missing = np.isnan(window)
+        count = width - missing.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(count > 0, np.where(missing, 0.0, window).sum(axis=1) / count,
+                            np.nan)
+
+    def ema(self, span: int) -> np.ndarray:
+        """EMA of the close prices (EMA 9, 20 and 21 are precomputed)"""
+        if span in (9, 20, 21):
+            return getattr(self, f'ema{span}')
+        if self._bars is None:
+            raise ValueError(f"Panel features have no EMA({span}); only 9, 20 and 21")
+        return EntryValidator.cached_ema(self._bars, span)
+
+    def ema_alignment_mask(self, indices: np.ndarray, fast: int = 9,
+                           slow: int = 21) -> np.ndarray:
+        """EMA(fast) < EMA(slow) < Close for many bars"""
+        slow_values = self.ema(slow)[indices]
+        return (self.ema(fast)[indices] < slow_values) & (slow_values < self.close[indices])
+
+    def ema_crossover_mask(self, indices: np.ndarray, fast: int = 9,
+                           slow: int = 21) -> np.ndarray:
+        """EMA(fast) crossed above EMA(slow) on each bar"""
+        indices = np.asarray(indices, dtype=np.int64)
+        previous = np.maximum(indices - 1, 0)
+        ema_fast, ema_slow = self.ema(fast), self.ema(slow)
+        return ((self.position[indices] >= 1) &
+                (ema_fast[previous] <= ema_slow[previous]) &
+                (ema_fast[indices] > ema_slow[indices]))
+
+    @staticmethod
+    def _count_between(counts: np.ndarray, starts: np.ndarray,
+                       stops: np.ndarray) -> np.ndarray:
+        """Events in [start, stop) from a cumulative count (counts[i] = events before i)"""
+        return counts[stops] - counts[np.minimum(starts, stops)]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Features as a DataFrame (one row per bar)"""
+        frame = pd.DataFrame({
+            'RSI': self.rsi,
+            'VWAP': self.vwap,
+            'EMA9': self.ema9,
+            'EMA20': self.ema20,
+            'EMA21': self.ema21,
+            'Volatility': self.volatility,
+            'Avg_Volume': self.avg_volume,
+        })
+        # Flags used by the scanners (Revival/Force 1.5x, Survival 2x, Gold 3x)
+        for multiplier in (1.5, 2.0, 3.0):
+            self.volume_spike(multiplier)
+        for (multiplier, lookback), spike in self._volume_spike.items():
+            if lookback == self.VOLUME_LOOKBACK:
+                frame[f'Volume_Spike_{multiplier:g}x'] = spike
+        return frame
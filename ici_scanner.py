@@ -3,9 +3,14 @@ ICI (Impulse-Correction-Impulse) Pattern Scanner
 """
 from dataclasses import dataclass
 from datetime import datetime
-import pandas as pd
-from typing import List, Optional
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+from array_utils import run_lengths, window_max, window_min
+from bar_arrays import BarData, as_bars
+from dedup import DEFAULT_RANKING, deduplicate_setups
 from fibonacci import FibonacciCalculator
+from indicators import IndicatorContext
+from stage_counter import StageCounter
 from validators import EntryValidator
 
 
@@ -27,6 +32,7 @@ class ICISetup:
     ema_aligned: bool
     macd_aligned: bool
     valid: bool  # Overall validation status
+    entry_confirmed: Optional[bool] = None  # Lower-timeframe entry check (None if not run)
 
     def to_dict(self):
         """Convert to dictionary for CSV export"""
@@ -81,199 +87,305 @@ class ICIScanner:
         self.min_risk_reward = min_risk_reward
         self.fib_calc = FibonacciCalculator()
         self.validator = EntryValidator()
+        self.stage_counts = StageCounter()  # Bars removed per filter stage
 
-    def scan(self, df: pd.DataFrame, timeframe: str = 'daily') -> List[ICISetup]:
+    def scan(self, df: BarData, timeframe: str = 'daily',
+             context: Optional[IndicatorContext] = None) -> List[ICISetup]:
         """
         Scan DataFrame for ICI patterns
 
         Args:
             df: DataFrame with OHLC data (columns: Open, High, Low, Close, Date)
+                or BarArrays
             timeframe: Timeframe being scanned
+            context: Precomputed EMA/MACD for df (built here if not given)
 
         Returns:
             List of ICISetup objects
         """
-        setups = []
+        self.stage_counts.reset()
 
         # Need enough data for pattern + indicators
         if len(df) < 50:
-            return setups
+            return []
 
-        # Scan through dataframe
-        for i in range(50, len(df) - 1):  # Leave room for entry validation
-            # Try to find bullish ICI
-            bullish_setup = self._find_ici_at_index(df, i, True, timeframe)
-            if bullish_setup:
-                setups.append(bullish_setup)
+        # Leave room for entry validation on the last bar
+        indices = np.arange(50, len(df) - 1)
+        return self._scan_indices(as_bars(df), indices, timeframe, context)
 
-            # Try to find bearish ICI
-            bearish_setup = self._find_ici_at_index(df, i, False, timeframe)
-            if bearish_setup:
-                setups.append(bearish_setup)
+    def _scan_indices(self, df: BarData, indices: np.ndarray,
+                      timeframe: str,
+                      context: Optional[IndicatorContext] = None) -> List[ICISetup]:
+        """
+        Evaluate bullish and bearish ICI at the given bar indices
 
-        return setups
+        Args:
+            df: DataFrame or BarArrays with OHLC data
+            indices: Bar indices to evaluate
+            timeframe: Current timeframe
+            context: Precomputed EMA/MACD for df (built here if not given)
 
-    def _find_ici_at_index(self, df: pd.DataFrame, idx: int,
-                          bullish: bool, timeframe: str) -> Optional[ICISetup]:
+        Returns:
+            ICISetup objects ordered by bar, bullish before bearish
         """
-        Try to find ICI pattern ending at given index
+        bars = as_bars(df)
+        _, rows = self._ordered_candidates(bars, indices)
+
+        if rows and context is None:
+            context = IndicatorContext.from_frame(bars)
+
+        return [self._build_setup(bars, candidate, row, timeframe, context)
+                for candidate, row in rows]
+
+    def _ordered_candidates(self, df: BarData, indices: np.ndarray) -> tuple:
+        """
+        Evaluate both directions and order the qualifying bars
 
         Args:
-            df: DataFrame with OHLC data
-            idx: Current index to check
-            bullish: True for bullish pattern
-            timeframe: Current timeframe
+            df: DataFrame or BarArrays with OHLC data
+            indices: Bar indices to evaluate
 
         Returns:
-            ICISetup if valid pattern found, None otherwise
+            (bar_index, rows) - bar of each qualifying candidate and its
+            (candidate, row) position, ordered by bar, bullish before bearish
         """
-        # Step 1: Find impulse move (working backwards from idx)
-        impulse_end_idx = idx - self.min_correction_candles
-        if impulse_end_idx < self.min_impulse_candles:
-            return None
+        arrays = self._pattern_arrays(df)
+        candidates = [self._evaluate_ici(df, indices, True, arrays),
+                      self._evaluate_ici(df, indices, False, arrays)]
 
-        # Count impulse candles backwards
-        impulse_candles = 0
-        impulse_start_idx = impulse_end_idx
+        bar_index = np.concatenate([c['index'] for c in candidates])
+        direction = np.concatenate([np.full(len(c['index']), n)
+                                    for n, c in enumerate(candidates)])
+        order = np.lexsort((direction, bar_index))
 
-        for i in range(impulse_end_idx, max(0, impulse_end_idx - 20), -1):
-            if self.validator.is_same_color_candle(df.iloc[i], bullish):
-                impulse_candles += 1
-                impulse_start_idx = i
-            else:
-                break
+        rows = []
+        for k in order:
+            candidate = candidates[direction[k]]
+            row = k if direction[k] == 0 else k - len(candidates[0]['index'])
+            rows.append((candidate, row))
 
-        if impulse_candles < self.min_impulse_candles:
-            return None
+        return bar_index[order], rows
 
-        # Step 2: Get impulse high/low
-        impulse_data = df.iloc[impulse_start_idx:impulse_end_idx + 1]
-        if bullish:
-            impulse_high = impulse_data['High'].max()
-            impulse_low = impulse_data['Low'].min()
-        else:
-            impulse_high = impulse_data['High'].max()
-            impulse_low = impulse_data['Low'].min()
+    @staticmethod
+    def _pattern_arrays(df: BarData) -> dict:
+        """
+        Price arrays and candle-color runs the ICI rules read
 
-        # Step 3: Find correction move
-        correction_data = df.iloc[impulse_end_idx + 1:idx + 1]
-        if len(correction_data) < self.min_correction_candles:
-            return None
+        They depend only on the data, not on the scanner's parameters, so
+        one result can be shared by scanners with different settings.
 
-        # Check if correction candles are opposite color
-        correction_candles = 0
-        for _, row in correction_data.iterrows():
-            if self.validator.is_same_color_candle(row, not bullish):
-                correction_candles += 1
+        Args:
+            df: DataFrame or BarArrays with OHLC data
 
-        if correction_candles < self.min_correction_candles:
-            return None
+        Returns:
+            Dict with high/low/close arrays and, per direction (True for
+            bullish), the impulse-color run lengths and the cumulative
+            count of correction-color candles
+        """
+        bars = as_bars(df)
+        green = bars.close > bars.open
+        red = bars.close < bars.open
+
+        arrays = {
+            'high': bars.high,
+            'low': bars.low,
+            'close': bars.close,
+        }
+        for bullish, impulse_color, correction_color in ((True, green, red),
+                                                         (False, red, green)):
+            arrays[bullish] = {
+                'runs': run_lengths(impulse_color),
+                'color_count': np.concatenate([[0], np.cumsum(correction_color)]),
+            }
+        return arrays
+
+    def _evaluate_ici(self, df: BarData, indices: np.ndarray,
+                      bullish: bool, arrays: Optional[dict] = None) -> dict:
+        """
+        Run the ICI rules for one direction over many bars at once
 
-        # Step 4: Validate Fibonacci retracement
+        Args:
+            df: DataFrame or BarArrays with OHLC data
+            indices: Bar indices to evaluate (pattern ends at each index)
+            bullish: True for bullish pattern
+            arrays: Precomputed _pattern_arrays(df) (built here if not given)
+
+        Returns:
+            Dict of arrays for the bars that qualify (before EMA/MACD)
+        """
+        if arrays is None:
+            arrays = self._pattern_arrays(df)
+        highs = arrays['high']
+        lows = arrays['low']
+        closes = arrays['close']
+
+        idx = np.asarray(indices, dtype=np.int64)
+        counts = self.stage_counts
+        counts.start(len(idx))
+
+        # Phase 1: structural prefilter on candle colors only (cheap)
+        # Step 1: Impulse ends min_correction_candles before idx
+        impulse_end = idx - self.min_correction_candles
+        idx, impulse_end = counts.apply('history', impulse_end >= self.min_impulse_candles,
+                                        idx, impulse_end)
+
+        # Count impulse candles backwards (at most 20, never bar 0)
+        runs = arrays[bullish]['runs']
+        impulse_candles = np.minimum(runs[impulse_end], np.minimum(impulse_end, 20))
+        idx, impulse_end, impulse_candles = counts.apply(
+            'impulse', impulse_candles >= self.min_impulse_candles,
+            idx, impulse_end, impulse_candles)
+
+        # Step 3: Correction candles must be opposite color
+        color_count = arrays[bullish]['color_count']
+        correction_candles = color_count[idx + 1] - color_count[impulse_end + 1]
+        idx, impulse_end, impulse_candles = counts.apply(
+            'correction', correction_candles >= self.min_correction_candles,
+            idx, impulse_end, impulse_candles)
+
+        # Phase 2: price validation on the surviving bars
+        # Step 2: Impulse high/low
+        impulse_start = np.where(impulse_candles > 0,
+                                 impulse_end - impulse_candles + 1, impulse_end)
+        impulse_high = window_max(highs, impulse_start, impulse_end + 1)
+        impulse_low = window_min(lows, impulse_start, impulse_end + 1)
+
+        # Step 4: Fibonacci retracement (a bearish impulse is measured from
+        # its low, i.e. with high and low swapped)
         if bullish:
-            correction_low = correction_data['Low'].min()
-            correction_pct = self.fib_calc.get_retracement_pct(
-                impulse_high, impulse_low, correction_low
-            )
-            is_valid_fib = self.min_fib_level <= correction_pct <= self.max_fib_level
+            correction_level = window_min(lows, impulse_end + 1, idx + 1)
+            correction_pct = FibonacciCalculator.retracement_pcts(
+                impulse_high, impulse_low, correction_level)
         else:
-            correction_high = correction_data['High'].max()
-            # For bearish: retracement is upward from impulse_low to correction_high
-            correction_pct = self.fib_calc.get_retracement_pct(
-                impulse_low, impulse_high, impulse_low + (impulse_low - correction_high)
-            )
-            # Reverse calculation for bearish
-            impulse_range = impulse_high - impulse_low
-            retracement = correction_high - impulse_low
-            correction_pct = retracement / impulse_range if impulse_range != 0 else 0
-            is_valid_fib = self.min_fib_level <= correction_pct <= self.max_fib_level
-
-        if not is_valid_fib:
-            return None
+            correction_level = window_max(highs, impulse_end + 1, idx + 1)
+            correction_pct = FibonacciCalculator.retracement_pcts(
+                impulse_low, impulse_high, correction_level)
 
-        # Step 5: Calculate entry, stop, target
-        current_bar = df.iloc[idx]
+        in_band = (self.min_fib_level <= correction_pct) & (correction_pct <= self.max_fib_level)
+        idx, impulse_high, impulse_low, correction_level, correction_pct = counts.apply(
+            'fibonacci', in_band,
+            idx, impulse_high, impulse_low, correction_level, correction_pct)
 
+        # Step 5: Entry, stop, target
+        entry = closes[idx]
         if bullish:
-            entry = current_bar['Close']
-            stop = correction_low - (impulse_high - impulse_low) * 0.05  # 5% buffer
-            target = self.fib_calc.calculate_target(impulse_high, impulse_low,
-                                                   self.extension_target)
+            stop = correction_level - (impulse_high - impulse_low) * 0.05  # 5% buffer
+            target = FibonacciCalculator.targets(impulse_high, impulse_low,
+                                                 self.extension_target)
         else:
-            entry = current_bar['Close']
-            stop = correction_high + (impulse_high - impulse_low) * 0.05  # 5% buffer
+            stop = correction_level + (impulse_high - impulse_low) * 0.05  # 5% buffer
             # For bearish: target is below impulse_low
-            target = impulse_low - (impulse_high - impulse_low) * abs(self.extension_target)
+            target = FibonacciCalculator.targets(impulse_low, impulse_high,
+                                                 self.extension_target)
 
-        # Step 6: Validate risk/reward
-        risk = abs(entry - stop)
-        reward = abs(target - entry)
-        risk_reward = reward / risk if risk != 0 else 0
+        # Step 6: Risk/reward (NaN R:R is not rejected, as in the scalar checks)
+        risk = np.abs(entry - stop)
+        reward = np.abs(target - entry)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            risk_reward = np.where(risk != 0, reward / risk, 0.0)
 
-        if risk_reward < self.min_risk_reward:
-            return None
+        keep = ~(risk_reward < self.min_risk_reward)
+        counts.record('risk_reward', len(keep) - np.count_nonzero(keep))
+
+        return {
+            'bullish': bullish,
+            'index': idx[keep],
+            'impulse_high': impulse_high[keep],
+            'impulse_low': impulse_low[keep],
+            'correction_level': correction_level[keep],
+            'correction_pct': correction_pct[keep],
+            'entry': entry[keep],
+            'stop': stop[keep],
+            'target': target[keep],
+            'risk_reward': risk_reward[keep],
+        }
+
+    def _build_setup(self, df: BarData, candidate: dict, row: int,
+                     timeframe: str, context: IndicatorContext) -> ICISetup:
+        """
+        Validate EMA/MACD for one qualifying bar and create its setup
+
+        Args:
+            df: BarArrays (or DataFrame) with OHLC data
+            candidate: Arrays returned by _evaluate_ici
+            row: Position within the candidate arrays
+            timeframe: Current timeframe
+            context: Precomputed EMA/MACD for df
+
+        Returns:
+            ICISetup for the bar
+        """
+        idx = int(candidate['index'][row])
+        bullish = candidate['bullish']
 
         # Step 7: Validate EMA and MACD
-        close_prices = df['Close'].iloc[:idx + 1]
         direction = 'long' if bullish else 'short'
 
-        ema_aligned = self.validator.validate_ema(close_prices, 10, 20, direction)
-        macd_aligned = self.validator.validate_macd(close_prices, direction)
+        ema_aligned = context.ema_aligned(idx, direction)
+        macd_aligned = context.macd_aligned(idx, direction)
 
-        # Overall validation
-        valid = is_valid_fib and risk_reward >= self.min_risk_reward and ema_aligned and macd_aligned
+        # Fib and R:R already passed in _evaluate_ici
+        valid = ema_aligned and macd_aligned
 
         # Step 8: Create setup
-        setup = ICISetup(
-            date=df.iloc[idx]['Date'] if 'Date' in df.columns else df.index[idx],
+        return ICISetup(
+            date=as_bars(df).date(idx),
             pattern_type='ICI',
             timeframe=timeframe,
-            impulse_high=impulse_high,
-            impulse_low=impulse_low,
-            correction_low=correction_low if bullish else correction_high,
-            correction_pct=correction_pct,
-            entry=entry,
-            stop=stop,
-            target=target,
+            impulse_high=candidate['impulse_high'][row],
+            impulse_low=candidate['impulse_low'][row],
+            correction_low=candidate['correction_level'][row],
+            correction_pct=candidate['correction_pct'][row],
+            entry=candidate['entry'][row],
+            stop=candidate['stop'][row],
+            target=candidate['target'][row],
             is_bullish=bullish,
-            risk_reward=risk_reward,
+            risk_reward=candidate['risk_reward'][row],
             ema_aligned=ema_aligned,
             macd_aligned=macd_aligned,
             valid=valid
         )
 
-        return setup
+    def _find_ici_at_index(self, df: BarData, idx: int,
+                          bullish: bool, timeframe: str,
+                          context: Optional[IndicatorContext] = None) -> Optional[ICISetup]:
+        """
+        Try to find ICI pattern ending at given index
+
+        Args:
+            df: DataFrame with OHLC data
+            idx: Current index to check
+            bullish: True for bullish pattern
+            timeframe: Current timeframe
+            context: Precomputed EMA/MACD for df (built here if not given)
 
-    def deduplicate_setups(self, setups: List[ICISetup]) -> List[ICISetup]:
+        Returns:
+            ICISetup if valid pattern found, None otherwise
+        """
+        bars = as_bars(df)
+        candidate = self._evaluate_ici(bars, np.array([idx]), bullish)
+        if len(candidate['index']) == 0:
+            return None
+        if context is None:
+            context = IndicatorContext.from_frame(bars)
+        return self._build_setup(bars, candidate, 0, timeframe, context)
+
+    def deduplicate_setups(self, setups: List[ICISetup], by='day',
+                           per: Sequence[str] = (),
+                           ranking: Sequence[Tuple[str, bool]] = DEFAULT_RANKING) -> List[ICISetup]:
         """
         Remove duplicate setups on same day, keeping best one
 
+        Valid setups win, then the highest R:R; the first setup wins ties
+        and days keep the order in which they first appear.
+
         Args:
             setups: List of ICISetup objects
+            by: 'day', 'bar' or a fixed window such as '4h' (see dedup.time_keys)
+            per: Fields that split groups, e.g. ('pattern_type', 'direction')
+            ranking: (field, higher_is_better) pairs, most important first
 
         Returns:
             Deduplicated list
         """
-        if not setups:
-            return []
-
-        # Group by date
-        by_date = {}
-        for setup in setups:
-            date_key = setup.date.date() if hasattr(setup.date, 'date') else setup.date
-            if date_key not in by_date:
-                by_date[date_key] = []
-            by_date[date_key].append(setup)
-
-        # Keep best setup per day (highest R:R that's valid)
-        deduplicated = []
-        for date_key, date_setups in by_date.items():
-            # Prioritize valid setups
-            valid_setups = [s for s in date_setups if s.valid]
-            if valid_setups:
-                best = max(valid_setups, key=lambda s: s.risk_reward)
-            else:
-                best = max(date_setups, key=lambda s: s.risk_reward)
-            deduplicated.append(best)
-
-        return deduplicated
+        return deduplicate_setups(setups, by, per, ranking)
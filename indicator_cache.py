@@ -0,0 +1,80 @@
+"""
+Indicator cache - indicators computed once per bar series and shared by every caller
+"""
+from typing import Callable, Dict, Tuple
+import numpy as np
+
+
+class IndicatorCache:
+    """
+    Indicator arrays of one bar series, keyed by (indicator, params)
+
+    Each BarArrays holds one (bars.indicators), so a validator, a scanner
+    and a pattern spec computing EMA(20) of the same bars compute it
+    once. Values belong to the bars' length and version: bars with more
+    bars appended are a new BarArrays with an empty cache, and prices
+    edited in place must be followed by bars.modified(), which drops the
+    cached values.
+
+    Cached arrays are read-only.
+    """
+
+    def __init__(self):
+        self._values: Dict[Tuple[str, tuple], np.ndarray] = {}
+        self._state = None  # (length, version) of the bars the values belong to
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def sync(self, length: int, version: int) -> None:
+        """
+        Drop the cached values if they were computed for other bars
+
+        Args:
+            length: Current number of bars
+            version: Current version of the bars (see BarArrays.modified)
+        """
+        if self._state != (length, version):
+            self._values.clear()
+            self._state = (length, version)
+
+    def get(self, indicator: str, params: tuple,
+            compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Cached indicator values, computed on the first request
+
+        Args:
+            indicator: Indicator name (e.g. 'ema')
+            params: Indicator parameters (e.g. (20,))
+            compute: Computes the values when they are not cached
+
+        Returns:
+            Read-only array of the indicator values
+        """
+        key = (indicator, params)
+        values = self._values.get(key)
+        if values is not None:
+            self.hits += 1
+            return values
+
+        self.misses += 1
+        values = np.array(compute(), dtype=float)
+        values.setflags(write=False)
+        self._values[key] = values
+        return values
+
+    def clear(self) -> None:
+        """Drop all cached indicators"""
+        self._values.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Cache usage
+
+        Returns:
+            Dict with 'indicators' (cached now), 'hits' (served from cache)
+            and 'misses' (computed)
+        """
+        return {'indicators': len(self._values), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,185 @@
+"""
+Precomputed indicator context - EMA and MACD computed once per DataFrame
+"""
+import numpy as np
+import pandas as pd
+from bar_arrays import BarArrays, BarData
+from validators import EntryValidator
+
+
+class IndicatorContext:
+    """
+    EMA/MACD series for a whole DataFrame, looked up by bar index
+
+    EMA and MACD use adjust=False, so the value at bar i only depends on
+    bars 0..i. Looking up index i here gives the same answer as
+    EntryValidator.validate_ema/validate_macd on df['Close'].iloc[:i + 1],
+    without recomputing the prefix for every candidate bar.
+    """
+
+    def __init__(self, close_prices: pd.Series, ema_fast: int = 10,
+                 ema_slow: int = 20, macd_fast: int = 12,
+                 macd_slow: int = 26, macd_signal: int = 9):
+        """
+        Compute indicator series
+
+        Args:
+            close_prices: Series of closing prices
+            ema_fast: Fast EMA period (default 10)
+            ema_slow: Slow EMA period (default 20)
+            macd_fast: MACD fast EMA period
+            macd_slow: MACD slow EMA period
+            macd_signal: MACD signal period
+        """
+        close_prices = pd.Series(close_prices, dtype=float).reset_index(drop=True)
+
+        self.ema_fast_period = ema_fast
+        self.ema_slow_period = ema_slow
+        self.macd_slow_period = macd_slow
+
+        self.ema_fast = EntryValidator.calculate_ema(close_prices, ema_fast).to_numpy()
+        self.ema_slow = EntryValidator.calculate_ema(close_prices, ema_slow).to_numpy()
+
+        macd_line, signal_line, histogram = EntryValidator.calculate_macd(
+            close_prices, macd_fast, macd_slow, macd_signal
+        )
+        self.macd_line = macd_line.to_numpy()
+        self.macd_signal = signal_line.to_numpy()
+        self.macd_histogram = histogram.to_numpy()
+
+    @classmethod
+    def from_frame(cls, df: BarData, ema_fast: int = 10, ema_slow: int = 20,
+                   macd_fast: int = 12, macd_slow: int = 26,
+                   macd_signal: int = 9) -> 'IndicatorContext':
+        """
+        Build context from a DataFrame with a Close column, or BarArrays
+
+        For BarArrays the EMAs and MACD come from the bars' indicator
+        cache, so they are shared with every other caller of the same bars.
+        """
+        if not isinstance(df, BarArrays):
+            return cls(df['Close'], ema_fast, ema_slow, macd_fast, macd_slow, macd_signal)
+
+        macd_line, signal_line, _ = EntryValidator.cached_macd(
+            df, macd_fast, macd_slow, macd_signal)
+        context = cls.from_values(
+            EntryValidator.cached_ema(df, ema_fast), EntryValidator.cached_ema(df, ema_slow),
+            macd_line, signal_line, ema_slow, macd_slow)
+        context.ema_fast_period = ema_fast
+        return context
+
+    @classmethod
+    def from_values(cls, ema_fast: np.ndarray, ema_slow: np.ndarray,
+                    macd_line: np.ndarray, macd_signal: np.ndarray,
+                    ema_slow_period: int = 20,
+                    macd_slow_period: int = 26) -> 'IndicatorContext':
+        """
+        Build context from indicator values computed elsewhere
+
+        Used when the values come from running (streaming) state rather
+        than a full close-price history.
+
+        Args:
+            ema_fast: Fast EMA values
+            ema_slow: Slow EMA values
+            macd_line: MACD line values
+            macd_signal: MACD signal line values
+            ema_slow_period: Slow EMA period (warm-up length)
+            macd_slow_period: MACD slow EMA period (warm-up length)
+
+        Returns:
+            IndicatorContext over the given values
+        """
+        context = cls.__new__(cls)
+        context.ema_fast_period = None
+        context.ema_slow_period = ema_slow_period
+        context.macd_slow_period = macd_slow_period
+
+        context.ema_fast = np.asarray(ema_fast, dtype=float)
+        context.ema_slow = np.asarray(ema_slow, dtype=float)
+        context.macd_line = np.asarray(macd_line, dtype=float)
+        context.macd_signal = np.asarray(macd_signal, dtype=float)
+        context.macd_histogram = context.macd_line - context.macd_signal
+        return context
+
+    def __len__(self) -> int:
+        return len(self.ema_fast)
+
+    def ema_aligned_mask(self, direction: str = 'long') -> np.ndarray:
+        """
+        EMA alignment for every bar
+
+        Args:
+            direction: 'long' or 'short'
+
+        Returns:
+            Boolean array, False where fewer than ema_slow bars exist
+        """
+        if direction == 'long':
+            aligned = self.ema_fast > self.ema_slow
+        else:  # short
+            aligned = self.ema_fast < self.ema_slow
+
+        aligned[:self.ema_slow_period - 1] = False
+        return aligned
+
+    def macd_aligned_mask(self, direction: str = 'long') -> np.ndarray:
+        """
+        MACD confirmation for every bar
+
+        Args:
+            direction: 'long' or 'short'
+
+        Returns:
+            Boolean array, False where fewer than macd_slow bars exist
+        """
+        if direction == 'long':
+            # MACD > 0 and histogram > 0 (bullish)
+            aligned = (self.macd_line > 0) & (self.macd_histogram > 0)
+        else:  # short
+            # MACD < 0 and histogram < 0 (bearish)
+            aligned = (self.macd_line < 0) & (self.macd_histogram < 0)
+
+        aligned[:self.macd_slow_period - 1] = False
+        return aligned
+
+    def ema_aligned(self, idx: int, direction: str = 'long') -> bool:
+        """
+        Check EMA alignment at one bar
+
+        Args:
+            idx: Bar index
+            direction: 'long' or 'short'
+
+        Returns:
+            True if EMAs are aligned correctly for the direction
+        """
+        if idx + 1 < self.ema_slow_period:
+            return False
+
+        if direction == 'long':
+            return bool(self.ema_fast[idx] > self.ema_slow[idx])
+        else:  # short
+            return bool(self.ema_fast[idx] < self.ema_slow[idx])
+
+    def macd_aligned(self, idx: int, direction: str = 'long') -> bool:
+        """
+        Check MACD confirmation at one bar
+
+        Args:
+            idx: Bar index
+            direction: 'long' or 'short'
+
+        Returns:
+            True if MACD confirms the direction
+        """
+        if idx + 1 < self.macd_slow_period:
+            return False
+
+        macd_value = self.macd_line[idx]
+        histogram_value = self.macd_histogram[idx]
+
+        if direction == 'long':
+            return bool(macd_value > 0 and histogram_value > 0)
+        else:  # short
+            return bool(macd_value < 0 and histogram_value < 0)
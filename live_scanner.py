@@ -0,0 +1,229 @@
+"""
+Live scanning - evaluate only the newest closed bar for each pattern
+"""
+from collections import deque
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from fous_validators import FOUSFeatures
+from indicators import IndicatorContext
+from scan_pipeline import ScanPipeline, ScanResult, PATTERNS
+from streaming_indicators import EMAState, VWAPState
+
+
+# Bars that must close after a bar before ICI-family patterns are decided
+# there (their scan() loops stop one bar short); FOUS scanners declare bars_ahead
+ICI_DECISION_LAG = 1
+
+# Scanners that relabel setups in their scan()
+PATTERN_LABELS = {'Momentum': 'Momentum', 'Harmonic': 'Harmonic'}
+
+
+class LiveScanner:
+    """
+    Incremental scanner for one symbol/timeframe
+
+    Feed each closed bar to on_bar(), then call scan_latest() to get the
+    setups that became decidable with it. EMA, MACD and VWAP depend on the
+    whole history and are carried as O(1) running state; every other rule
+    only looks back a bounded number of bars, so it is evaluated on a
+    fixed-size tail window. Work per bar is therefore independent of how
+    much history has been seen.
+
+    scan_latest() reports exactly what a batch ScanPipeline scan of all
+    bars seen so far reports for the newly decidable bars.
+    """
+
+    COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+    # Longest lookback of any rule (Gold's 100-bar volatility percentile
+    # over a 20-bar volatility of returns)
+    MAX_LOOKBACK = 128
+
+    def __init__(self, patterns: Optional[List[str]] = None,
+                 timeframe: str = '1h',
+                 scanners: Optional[Dict[str, object]] = None,
+                 window: int = 256):
+        """
+        Initialize live scanner
+
+        Args:
+            patterns: Patterns to report (default: all of PATTERNS)
+            timeframe: Timeframe of the bars
+            scanners: Optional scanner instances by pattern name
+            window: Bars kept for evaluation; call scan_latest() at least
+                every window - MAX_LOOKBACK bars
+        """
+        if window <= self.MAX_LOOKBACK:
+            raise ValueError(f"window must be larger than {self.MAX_LOOKBACK}")
+
+        self.pipeline = ScanPipeline(patterns, scanners)
+        self.patterns = self.pipeline.patterns
+        self.scanners = self.pipeline.scanners
+        self.timeframe = timeframe
+        self.window = window
+
+        self.bars_seen = 0
+        self._scanned = 0
+        self._bars = deque(maxlen=window)
+        self._values = {name: deque(maxlen=window) for name in
+                        ('ema9', 'ema10', 'ema20', 'ema21', 'macd_line', 'macd_signal', 'vwap')}
+
+        self._emas = {span: EMAState(span) for span in (9, 10, 12, 20, 21, 26)}
+        self._macd_signal = EMAState(9)
+        self._vwap = VWAPState()
+
+        # Gold components (Force, Survival, Revival) by bar, waiting until
+        # every component is decided there and there are 100 bars of history
+        self._pending_gold = ({}, {}, {})
+
+    @property
+    def last_date(self):
+        """Date of the newest bar seen (None before the first bar)"""
+        return self._bars[-1][0] if self._bars else None
+
+    def on_bar(self, bar) -> None:
+        """
+        Add one closed bar
+
+        Args:
+            bar: Mapping (dict or Series) with Date, Open, High, Low, Close, Volume
+        """
+        values = [bar[column] for column in self.COLUMNS]
+        self._bars.append(values)
+        self.bars_seen += 1
+
+        high, low, close, volume = (float(v) for v in values[2:])
+        ema = {span: state.update(close) for span, state in self._emas.items()}
+        macd_line = ema[12] - ema[26]
+
+        self._values['ema9'].append(ema[9])
+        self._values['ema10'].append(ema[10])
+        self._values['ema20'].append(ema[20])
+        self._values['ema21'].append(ema[21])
+        self._values['macd_line'].append(macd_line)
+        self._values['macd_signal'].append(self._macd_signal.update(macd_line))
+        self._values['vwap'].append(self._vwap.update(high, low, close, volume))
+
+    def warm_up(self, bars: pd.DataFrame) -> None:
+        """
+        Feed history without reporting setups on it
+
+        Args:
+            bars: Closed bars (DataFrame with the COLUMNS columns), oldest first
+        """
+        for _, bar in bars.iterrows():
+            self.on_bar(bar)
+        self._scanned = self.bars_seen
+
+    def scan_latest(self) -> ScanResult:
+        """
+        Evaluate the bars that became decidable since the last call
+
+        Returns:
+            ScanResult with the new setups per enabled pattern
+        """
+        result = ScanResult(timeframe=self.timeframe)
+        enabled = set(self.patterns)
+        for pattern in PATTERNS:
+            if pattern in enabled:
+                result.setups[pattern] = []
+
+        n = self.bars_seen
+        previous, self._scanned = self._scanned, n
+        if n == previous or n < 50:
+            return result
+
+        df = pd.DataFrame(list(self._bars), columns=self.COLUMNS)
+        offset = n - len(df)
+
+        def new_bars(lag: int) -> np.ndarray:
+            """Local indices of bars newly decidable with a decision lag"""
+            # Once the window is full, older bars lack the lookback they need
+            first = max(previous - lag, 50, offset + self.MAX_LOOKBACK if offset else 0)
+            return np.arange(first, n - lag) - offset
+
+        if enabled & {'ICI', 'Momentum', 'WM', 'Harmonic'}:
+            context = IndicatorContext.from_values(
+                self._values['ema10'], self._values['ema20'],
+                self._values['macd_line'], self._values['macd_signal']
+            )
+
+        for pattern in ('ICI', 'Momentum'):
+            if pattern in enabled:
+                setups = self.scanners[pattern]._scan_indices(
+                    df, new_bars(self._decision_lag(pattern)), self.timeframe, context)
+                result.setups[pattern] = self._label(pattern, setups)
+
+        wm = [p for p in ('WM', 'Harmonic')
+              if p in enabled and n >= self.scanners[p].lookback_period]
+        if wm:
+            pivots = self.scanners[wm[0]]._find_pivots(df)
+            prices = self.scanners[wm[0]]._price_arrays(df)
+        for pattern in wm:
+            setups = self.scanners[pattern]._scan_indices(
+                df, new_bars(self._decision_lag(pattern)), self.timeframe, context, pivots, prices)
+            result.setups[pattern] = self._label(pattern, setups)
+
+        if enabled & {'Force', 'Survival', 'Revival', 'Gold'}:
+            self._scan_fous(df, enabled, new_bars, result)
+
+        return result
+
+    def _scan_fous(self, df: pd.DataFrame, enabled: set, new_bars,
+                   result: ScanResult) -> None:
+        """Evaluate Force/Survival/Revival at their new bars and pair Gold"""
+        features = FOUSFeatures(df, indicators={
+            name: self._values[name] for name in ('vwap', 'ema9', 'ema20', 'ema21')
+        })
+        offset = self.bars_seen - len(df)
+
+        found, bars = {}, {}
+        for key, scanner in self.pipeline.fous_scanners(enabled).items():
+            found[key], bars[key] = [], []
+            for i in new_bars(scanner.bars_ahead):
+                setup = scanner._find_at_index(df, int(i), self.timeframe, features)
+                if setup:
+                    found[key].append(setup)
+                    bars[key].append(int(i) + offset)
+            if key in enabled:
+                result.setups[key] = found[key]
+
+        if 'Gold' not in enabled:
+            return
+
+        # Revival on a Force bar is only decided a few bars later
+        for pending, component_bars, setups in zip(self._pending_gold,
+                                                   self.pipeline.gold_inputs(bars),
+                                                   self.pipeline.gold_inputs(found)):
+            pending.update(zip(component_bars, setups))
+
+        # Like GoldScanner.scan, Gold needs 100 bars of history; components
+        # found before that are kept and paired once it is there
+        if self.bars_seen < 100:
+            return
+
+        decided = self.bars_seen - self._decision_lag('Gold')
+        force, survival, revival = (
+            [setup for bar, setup in pending.items() if bar < decided]
+            for pending in self._pending_gold)
+        self._pending_gold = tuple({bar: setup for bar, setup in pending.items() if bar >= decided}
+                                   for pending in self._pending_gold)
+        result.setups['Gold'] = self.scanners['Gold'].combine(
+            force, survival, revival, self.timeframe, features)
+
+    def _decision_lag(self, pattern: str) -> int:
+        """Bars that must close after a bar before pattern is decided there"""
+        if pattern == 'Gold':
+            return max(scanner.bars_ahead for scanner in self.pipeline.gold_components.values())
+        if pattern in ('Force', 'Survival', 'Revival'):
+            return self.scanners[pattern].bars_ahead
+        return ICI_DECISION_LAG
+
+    @staticmethod
+    def _label(pattern: str, setups: list) -> list:
+        """Apply the pattern label a scanner's scan() would set"""
+        if pattern in PATTERN_LABELS:
+            for setup in setups:
+                setup.pattern_type = PATTERN_LABELS[pattern]
+        return setups
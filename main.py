@@ -7,33 +7,36 @@ Scans for four pattern types:
 3. W/M - Double top/bottom on weekly/monthly
 4. Harmonic - W/M on daily timeframe
 """
-import pandas as pd
 from datetime import datetime
-from typing import List
+from typing import List, Union
 import os
 
 from data_loader import load_spy_data, DataLoader
 from ici_scanner import ICIScanner, ICISetup
-from pattern_scanners import MomentumScanner, WMScanner, HarmonicScanner
+from parallel_scanner import ParallelScanExecutor, ScanJob
+from setup_table import SetupTable, as_table
 
 
 class PatternScannerReport:
     """Generate reports and statistics for pattern scanning"""
 
     @staticmethod
-    def print_statistics(all_setups: List[ICISetup]):
+    def print_statistics(all_setups: Union[List[ICISetup], SetupTable]):
         """Print statistics for all patterns found"""
-        if not all_setups:
+        if not len(all_setups):
             print("\nNo patterns found.")
             return
 
+        table = as_table(all_setups)
+        valid_mask = table.mask(valid=True)
+
         print("\n" + "=" * 80)
         print("PATTERN SCANNING STATISTICS")
         print("=" * 80)
 
         # Overall statistics
-        total = len(all_setups)
-        valid = len([s for s in all_setups if s.valid])
+        total = len(table)
+        valid = int(valid_mask.sum())
         invalid = total - valid
 
         print(f"\nTotal setups found: {total}")
@@ -45,41 +48,23 @@ class PatternScannerReport:
         print("BY PATTERN TYPE:")
         print("-" * 80)
 
-        pattern_types = {}
-        for setup in all_setups:
-            ptype = setup.pattern_type
-            if ptype not in pattern_types:
-                pattern_types[ptype] = {'total': 0, 'valid': 0, 'bullish': 0, 'bearish': 0}
-            pattern_types[ptype]['total'] += 1
-            if setup.valid:
-                pattern_types[ptype]['valid'] += 1
-            if setup.is_bullish:
-                pattern_types[ptype]['bullish'] += 1
-            else:
-                pattern_types[ptype]['bearish'] += 1
-
-        for ptype, stats in pattern_types.items():
+        by_pattern = table.frame.assign(bullish=table.is_bullish()).groupby(
+            'pattern_type', sort=False).agg(total=('valid', 'size'), valid=('valid', 'sum'),
+                                            bullish=('bullish', 'sum'))
+
+        for ptype, stats in by_pattern.iterrows():
             print(f"\n{ptype}:")
             print(f"  Total: {stats['total']}")
             print(f"  Valid: {stats['valid']} ({stats['valid']/stats['total']*100:.1f}%)")
             print(f"  Bullish: {stats['bullish']}")
-            print(f"  Bearish: {stats['bearish']}")
+            print(f"  Bearish: {stats['total'] - stats['bullish']}")
 
         # Statistics by timeframe
         print("\n" + "-" * 80)
         print("BY TIMEFRAME:")
         print("-" * 80)
 
-        timeframe_stats = {}
-        for setup in all_setups:
-            tf = setup.timeframe
-            if tf not in timeframe_stats:
-                timeframe_stats[tf] = {'total': 0, 'valid': 0}
-            timeframe_stats[tf]['total'] += 1
-            if setup.valid:
-                timeframe_stats[tf]['valid'] += 1
-
-        for tf, stats in timeframe_stats.items():
+        for tf, stats in table.counts('timeframe').iterrows():
             print(f"\n{tf}:")
             print(f"  Total: {stats['total']}")
             print(f"  Valid: {stats['valid']} ({stats['valid']/stats['total']*100:.1f}%)")
@@ -89,20 +74,22 @@ class PatternScannerReport:
         print("RISK/REWARD ANALYSIS:")
         print("-" * 80)
 
-        rr_ratios = [s.risk_reward for s in all_setups if s.valid]
-        if rr_ratios:
-            print(f"\nAverage R:R: {sum(rr_ratios)/len(rr_ratios):.2f}")
-            print(f"Min R:R: {min(rr_ratios):.2f}")
-            print(f"Max R:R: {max(rr_ratios):.2f}")
+        rr_ratios = table.frame['risk_reward'].to_numpy(dtype=float)[valid_mask]
+        if len(rr_ratios):
+            print(f"\nAverage R:R: {rr_ratios.sum()/len(rr_ratios):.2f}")
+            print(f"Min R:R: {rr_ratios.min():.2f}")
+            print(f"Max R:R: {rr_ratios.max():.2f}")
 
         # Indicator alignment
         print("\n" + "-" * 80)
         print("INDICATOR ALIGNMENT:")
         print("-" * 80)
 
-        ema_aligned = len([s for s in all_setups if s.ema_aligned])
-        macd_aligned = len([s for s in all_setups if s.macd_aligned])
-        both_aligned = len([s for s in all_setups if s.ema_aligned and s.macd_aligned])
+        ema = table.column('ema_aligned', False).fillna(False).to_numpy(dtype=bool)
+        macd = table.column('macd_aligned', False).fillna(False).to_numpy(dtype=bool)
+        ema_aligned = int(ema.sum())
+        macd_aligned = int(macd.sum())
+        both_aligned = int((ema & macd).sum())
 
         print(f"\nEMA aligned: {ema_aligned} ({ema_aligned/total*100:.1f}%)")
         print(f"MACD aligned: {macd_aligned} ({macd_aligned/total*100:.1f}%)")
@@ -111,23 +98,15 @@ class PatternScannerReport:
         print("\n" + "=" * 80)
 
     @staticmethod
-    def export_to_csv(setups: List[ICISetup], filename: str = 'pattern_setups.csv'):
+    def export_to_csv(setups: Union[List[ICISetup], SetupTable],
+                      filename: str = 'pattern_setups.csv'):
         """Export setups to CSV file"""
-        if not setups:
+        if not len(setups):
             print("No setups to export.")
             return
 
-        # Convert setups to list of dicts
-        data = [setup.to_dict() for setup in setups]
-
-        # Create DataFrame
-        df = pd.DataFrame(data)
-
-        # Sort by date
-        df.sort_values('Date', inplace=True)
-
-        # Export
-        df.to_csv(filename, index=False)
+        # Columnar export, sorted by date
+        as_table(setups).to_csv(filename, sort_by='Date')
         print(f"\nExported {len(setups)} setups to {filename}")
 
     @staticmethod
@@ -176,34 +155,36 @@ def run_all_scanners(data_source: str = 'yfinance', csv_path: str = None):
     # Initialize scanners
     print("\n2. Initializing scanners...")
     ici_scanner = ICIScanner()
-    momentum_scanner = MomentumScanner()
-    wm_scanner = WMScanner()
-    harmonic_scanner = HarmonicScanner()
+    # (timeframe, pattern) jobs run on a process pool over shared-memory bars
+    executor = ParallelScanExecutor()
     print("   All scanners ready")
 
+    loader = DataLoader()
+    frames = {
+        ('SPY', 'daily'): df_daily,
+        ('SPY', 'weekly'): loader.resample_to_timeframe(df_daily, '1W'),
+        ('SPY', 'monthly'): loader.resample_to_timeframe(df_daily, '1M'),
+    }
+    jobs = [ScanJob('SPY', 'daily', 'ICI'), ScanJob('SPY', 'daily', 'Harmonic'),
+            ScanJob('SPY', 'weekly', 'ICI'), ScanJob('SPY', 'weekly', 'WM'),
+            ScanJob('SPY', 'monthly', 'ICI'), ScanJob('SPY', 'monthly', 'WM')]
+    results = executor.run(frames, jobs)
+
     all_setups = []
 
     # Scan ICI patterns on daily, weekly, monthly
     print("\n3. Scanning ICI patterns...")
 
     print("   - Daily timeframe...")
-    ici_daily = ici_scanner.scan(df_daily, 'daily')
-    ici_daily = ici_scanner.deduplicate_setups(ici_daily)
+    ici_daily = ici_scanner.deduplicate_setups(results[('SPY', 'daily', 'ICI')])
     all_setups.extend(ici_daily)
     print(f"     Found {len(ici_daily)} ICI setups on daily")
 
-    # Resample to weekly
-    loader = DataLoader()
-    df_weekly = loader.resample_to_timeframe(df_daily, '1W')
-    ici_weekly = ici_scanner.scan(df_weekly, 'weekly')
-    ici_weekly = ici_scanner.deduplicate_setups(ici_weekly)
+    ici_weekly = ici_scanner.deduplicate_setups(results[('SPY', 'weekly', 'ICI')])
     all_setups.extend(ici_weekly)
     print(f"     Found {len(ici_weekly)} ICI setups on weekly")
 
-    # Resample to monthly
-    df_monthly = loader.resample_to_timeframe(df_daily, '1M')
-    ici_monthly = ici_scanner.scan(df_monthly, 'monthly')
-    ici_monthly = ici_scanner.deduplicate_setups(ici_monthly)
+    ici_monthly = ici_scanner.deduplicate_setups(results[('SPY', 'monthly', 'ICI')])
     all_setups.extend(ici_monthly)
     print(f"     Found {len(ici_monthly)} ICI setups on monthly")
 
@@ -211,25 +192,25 @@ def run_all_scanners(data_source: str = 'yfinance', csv_path: str = None):
     print("\n4. Scanning Momentum patterns...")
     print("   - Skipping (requires 1h data - use interval='1h' with shorter period)")
     # To enable: df_1h = load_spy_data(source='yfinance', period='60d', interval='1h')
-    # momentum_setups = momentum_scanner.scan(df_1h, '1h')
+    # momentum_setups = executor.run({('SPY', '1h'): df_1h}, [ScanJob('SPY', '1h', 'Momentum')])
 
     # Scan W/M patterns
     print("\n5. Scanning W/M patterns...")
 
     print("   - Weekly timeframe...")
-    wm_weekly = wm_scanner.scan(df_weekly, 'weekly')
+    wm_weekly = results[('SPY', 'weekly', 'WM')]
     all_setups.extend(wm_weekly)
     print(f"     Found {len(wm_weekly)} W/M setups on weekly")
 
     print("   - Monthly timeframe...")
-    wm_monthly = wm_scanner.scan(df_monthly, 'monthly')
+    wm_monthly = results[('SPY', 'monthly', 'WM')]
     all_setups.extend(wm_monthly)
     print(f"     Found {len(wm_monthly)} W/M setups on monthly")
 
     # Scan Harmonic patterns
     print("\n6. Scanning Harmonic patterns...")
     print("   - Daily timeframe...")
-    harmonic_daily = harmonic_scanner.scan(df_daily, 'daily')
+    harmonic_daily = results[('SPY', 'daily', 'Harmonic')]
     all_setups.extend(harmonic_daily)
     print(f"     Found {len(harmonic_daily)} Harmonic setups on daily")
 
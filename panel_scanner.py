@@ -0,0 +1,255 @@
+"""
+Panel scanner - ICI and FOUS patterns across many symbols in one pass
+"""
+from typing import Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+from bar_arrays import as_bars
+from fous_scanners import _build_fous_setups
+from fous_validators import FOUSFeatures
+from indicators import IndicatorContext
+from scan_pipeline import ScanPipeline
+from validators import EntryValidator
+
+
+# Patterns with panel-wide (vectorized) kernels
+PANEL_PATTERNS = ('ICI', 'Momentum', 'Force', 'Survival', 'Revival', 'Gold')
+
+
+class Panel:
+    """
+    OHLCV data for many symbols as 2-D (bar x symbol) arrays
+
+    Each symbol's bars are right-aligned in a column of width rows and
+    preceded by at least one row of NaN padding, so every bar-indexed
+    lookback stops at the start of its own symbol. Bars are aligned by
+    position, not by calendar date, so symbols with different sessions
+    (stocks and crypto) can share a panel.
+
+    The flattened frame (symbol after symbol) is what the scanners run
+    on; flat_index() maps a symbol's bar to its row there.
+    """
+
+    COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+    def __init__(self, frames: Dict[str, pd.DataFrame]):
+        """
+        Align symbols into a panel
+
+        Args:
+            frames: DataFrame with Date (column or index) and OHLCV per symbol
+        """
+        self.symbols = list(frames)
+        self.lengths = np.array([len(df) for df in frames.values()], dtype=np.int64)
+        self.width = int(self.lengths.max()) + 1 if len(self.lengths) else 1
+        self.pads = self.width - self.lengths
+
+        self._matrices = {}
+        for name in self.COLUMNS:
+            matrix = np.full((self.width, len(self.symbols)), np.nan)
+            for column, df in enumerate(frames.values()):
+                matrix[self.pads[column]:, column] = df[name].to_numpy(dtype=float)
+            self._matrices[name] = matrix
+
+        dates = []
+        for column, df in enumerate(frames.values()):
+            symbol_dates = df['Date'] if 'Date' in df.columns else df.index.to_series()
+            dates.append(pd.Series([pd.NaT] * int(self.pads[column]), dtype=object))
+            dates.append(symbol_dates.reset_index(drop=True))
+
+        self.frame = pd.DataFrame({
+            name: self._matrices[name].T.ravel() for name in self.COLUMNS
+        })
+        self.frame.insert(0, 'Date', pd.concat(dates, ignore_index=True) if dates
+                          else pd.Series([], dtype=object))
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def matrix(self, name: str) -> pd.DataFrame:
+        """One OHLCV column as a bar x symbol DataFrame"""
+        return pd.DataFrame(self._matrices[name], columns=self.symbols)
+
+    def flat_index(self, symbol: str, bars) -> np.ndarray:
+        """Rows of the flattened frame for a symbol's bar numbers"""
+        column = self.symbols.index(symbol)
+        return column * self.width + self.pads[column] + np.asarray(bars, dtype=np.int64)
+
+    def rows(self, symbol: str) -> slice:
+        """Rows of the flattened frame holding a symbol's bars"""
+        column = self.symbols.index(symbol)
+        return slice(column * self.width + int(self.pads[column]), (column + 1) * self.width)
+
+    def positions(self) -> np.ndarray:
+        """Bar number within its symbol for every flattened row (negative in padding)"""
+        return (np.arange(self.width)[None, :] - self.pads[:, None]).ravel()
+
+    def series_ends(self) -> np.ndarray:
+        """Row after the last bar of the row's symbol, for every flattened row"""
+        ends = (np.arange(len(self.symbols), dtype=np.int64) + 1) * self.width
+        return np.repeat(ends, self.width)
+
+    def symbol_of(self, rows: np.ndarray) -> np.ndarray:
+        """Column (symbol position) of each flattened row"""
+        return np.asarray(rows, dtype=np.int64) // self.width
+
+    def scan_indices(self, first: int, stop_offset: int,
+                     min_length: int = 50) -> np.ndarray:
+        """
+        Flattened rows of every symbol's bars first..length-stop_offset-1
+
+        Args:
+            first: First bar number scanned per symbol
+            stop_offset: Bars left out at the end of each symbol
+            min_length: Symbols with fewer bars are skipped
+
+        Returns:
+            Sorted int64 array of rows
+        """
+        rows = []
+        for column, length in enumerate(self.lengths):
+            if length < min_length:
+                continue
+            start = column * self.width + self.pads[column]
+            rows.append(np.arange(start + first, start + length - stop_offset))
+        return np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+
+    def indicator_context(self) -> IndicatorContext:
+        """
+        EMA/MACD context over the flattened frame
+
+        Computed column-wise; the NaN padding leaves each symbol's EMAs
+        identical to IndicatorContext.from_frame on its own DataFrame.
+        """
+        close = self.matrix('Close')
+
+        def flat(values) -> np.ndarray:
+            return np.asarray(values, dtype=float).T.ravel()
+
+        macd_line, signal_line, _ = EntryValidator.calculate_macd(close)
+        return IndicatorContext.from_values(
+            flat(EntryValidator.calculate_ema(close, 10)),
+            flat(EntryValidator.calculate_ema(close, 20)),
+            flat(macd_line), flat(signal_line)
+        )
+
+
+class PanelScanner:
+    """
+    Scan a universe of symbols at once
+
+    The ICI-family and FOUS kernels run once over the whole panel instead
+    of once per symbol. Each symbol gets exactly the setups ScanPipeline
+    finds on its own DataFrame, ranked best first.
+    """
+
+    def __init__(self, patterns: Optional[List[str]] = None,
+                 scanners: Optional[Dict[str, object]] = None):
+        """
+        Initialize panel scanner
+
+        Args:
+            patterns: Patterns to scan (default: all of PANEL_PATTERNS)
+            scanners: Optional scanner instances by pattern name
+        """
+        patterns = list(PANEL_PATTERNS) if patterns is None else list(patterns)
+
+        unsupported = [p for p in patterns if p not in PANEL_PATTERNS]
+        if unsupported:
+            raise ValueError(f"Patterns without panel kernels: {unsupported}")
+
+        self.pipeline = ScanPipeline(patterns, scanners)
+        self.patterns = self.pipeline.patterns
+        self.scanners = self.pipeline.scanners
+
+    def scan(self, data: Union[Panel, Dict[str, pd.DataFrame]],
+             timeframe: str = 'daily') -> Dict[str, list]:
+        """
+        Scan every symbol
+
+        Args:
+            data: Panel, or DataFrame per symbol
+            timeframe: Timeframe being scanned
+
+        Returns:
+            Dict of symbol -> setups ranked by validity, then R:R
+        """
+        panel = data if isinstance(data, Panel) else Panel(data)
+        bars = as_bars(panel.frame)
+        enabled = set(self.patterns)
+        found = {symbol: [] for symbol in panel.symbols}
+
+        # ICI family (scan() stops one bar short for entry validation)
+        ici = [p for p in ('ICI', 'Momentum') if p in enabled]
+        if ici:
+            context = panel.indicator_context()
+            indices = panel.scan_indices(50, 1)
+        for pattern in ici:
+            scanner = self.scanners[pattern]
+            rows, candidates = scanner._ordered_candidates(bars, indices)
+            setups = [scanner._build_setup(bars, candidate, row, timeframe, context)
+                      for candidate, row in candidates]
+            if pattern == 'Momentum':
+                for setup in setups:
+                    setup.pattern_type = 'Momentum'
+            for symbol, symbol_setups in self._by_symbol(panel, rows, setups).items():
+                found[symbol] += symbol_setups
+
+        # FOUS components (Gold needs all three)
+        fous = self.pipeline.fous_scanners(enabled)
+        if fous:
+            features = FOUSFeatures.from_panel(panel)
+        components = {}
+        for key, scanner in fous.items():
+            candidate = scanner._evaluate(
+                features, panel.scan_indices(50, scanner.bars_ahead))
+            setups = _build_fous_setups(bars, candidate,
+                                        scanner.pattern_type, timeframe)
+            components[key] = self._by_symbol(panel, candidate['index'], setups)
+            if key in enabled:
+                for symbol, symbol_setups in components[key].items():
+                    found[symbol] += symbol_setups
+
+        if 'Gold' in enabled:
+            gold_scanner = self.scanners['Gold']
+            inputs = self.pipeline.gold_inputs(components)
+            for column, symbol in enumerate(panel.symbols):
+                # Like GoldScanner.scan, Gold needs 100 bars of history
+                if panel.lengths[column] < 100:
+                    continue
+                found[symbol] += gold_scanner.combine(
+                    *(setups[symbol] for setups in inputs), timeframe, features,
+                    panel.rows(symbol)
+                )
+
+        return {symbol: self.rank(setups) for symbol, setups in found.items()}
+
+    @staticmethod
+    def _by_symbol(panel: Panel, rows: np.ndarray, setups: list) -> Dict[str, list]:
+        """Split setups (in row order) into per-symbol lists"""
+        grouped = {symbol: [] for symbol in panel.symbols}
+        for column, setup in zip(panel.symbol_of(rows), setups):
+            grouped[panel.symbols[column]].append(setup)
+        return grouped
+
+    @staticmethod
+    def rank(setups: list) -> list:
+        """
+        Order setups best first
+
+        Valid setups come first, then higher R:R (NaN last); ties keep
+        pattern and bar order.
+
+        Args:
+            setups: Setups of one symbol
+
+        Returns:
+            Ranked list
+        """
+        def key(setup):
+            risk_reward = setup.risk_reward
+            if risk_reward is None or np.isnan(risk_reward):
+                risk_reward = -np.inf
+            return (not setup.valid, -risk_reward)
+
+        return sorted(setups, key=key)
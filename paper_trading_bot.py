@@ -18,9 +18,7 @@ import json
 import os
 
 # Import scanners
-from ici_scanner import ICIScanner
-from pattern_scanners import MomentumScanner
-from fous_scanners import ForceScanner, RevivalScanner
+from live_scanner import LiveScanner
 
 @dataclass
 class PaperPosition:
@@ -79,11 +77,8 @@ class PaperTradingBot:
         self.positions: List[PaperPosition] = []
         self.next_position_id = 1
 
-        # Scanners
-        self.ici_scanner = ICIScanner()
-        self.momentum_scanner = MomentumScanner()
-        self.force_scanner = ForceScanner()
-        self.revival_scanner = RevivalScanner()
+        # Live scanners per market, created on first scan
+        self.live_scanners: Dict[str, LiveScanner] = {}
 
         # Markets to trade
         self.markets = {
@@ -133,6 +128,41 @@ class PaperTradingBot:
             print(f"Error getting data for {symbol}: {e}")
             return None
 
+    def scan_new_bars(self, symbol: str, interval: str,
+                      df: pd.DataFrame) -> Dict[str, list]:
+        """
+        Feed bars not seen yet to the market's live scanner
+
+        Args:
+            symbol: Market symbol
+            interval: Bar interval
+            df: Latest data from get_latest_data
+
+        Returns:
+            Setups found on the new bars, by pattern
+        """
+        scanner = self.live_scanners.get(symbol)
+        if scanner is None:
+            # Momentum only runs on 1h data
+            patterns = ['ICI', 'Force', 'Revival']
+            if interval == '1h':
+                patterns.insert(1, 'Momentum')
+            scanner = LiveScanner(patterns, timeframe=interval)
+            self.live_scanners[symbol] = scanner
+
+        # The last row is the bar still forming; only closed bars are scanned
+        closed = df.iloc[:-1]
+        if scanner.last_date is not None:
+            closed = closed[closed['Date'] > scanner.last_date]
+
+        found = {pattern: [] for pattern in ('ICI', 'Momentum', 'Force', 'Revival')}
+        for _, bar in closed.iterrows():
+            scanner.on_bar(bar)
+            for pattern, setups in scanner.scan_latest().setups.items():
+                found[pattern].extend(setups)
+
+        return found
+
     def scan_for_setups(self) -> List[Dict]:
         """Scan all markets for new setups"""
         print(f"\n[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] Scanning for setups...")
@@ -153,23 +183,12 @@ class PaperTradingBot:
                 print(f"  {config['name']}: Insufficient data")
                 continue
 
-            # Scan ICI
-            ici_setups = self.ici_scanner.scan(df, timeframe=config['interval'])
-            valid_ici = [s for s in ici_setups if s.valid]
-
-            # Scan Momentum (1h only)
-            momentum_setups = []
-            if config['interval'] == '1h':
-                momentum_setups = self.momentum_scanner.scan(df, timeframe='1h')
-                valid_ici.extend([s for s in momentum_setups if s.valid])
-
-            # Scan Force
-            force_setups = self.force_scanner.scan(df, timeframe=config['interval'])
-            valid_force = [s for s in force_setups if s.valid]
+            # Scan ICI, Momentum (1h only), Force and Revival on the new bars only
+            results = self.scan_new_bars(symbol, config['interval'], df)
 
-            # Scan Revival
-            revival_setups = self.revival_scanner.scan(df, timeframe=config['interval'])
-            valid_revival = [s for s in revival_setups if s.valid]
+            valid_ici = [s for s in results['ICI'] + results['Momentum'] if s.valid]
+            valid_force = [s for s in results['Force'] if s.valid]
+            valid_revival = [s for s in results['Revival'] if s.valid]
 
             # Get most recent setup (last bar)
             all_valid = valid_ici + valid_force + valid_revival
@@ -0,0 +1,349 @@
+"""
+Parallel scan executor - (symbol, timeframe, pattern) jobs on a process pool
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import os
+import numpy as np
+import pandas as pd
+from bar_arrays import BarData, as_bars
+from scan_pipeline import ScanPipeline, ScanResult, PATTERNS
+from window_scan import INDICATORS, WindowScanner, history_indicators
+
+
+@dataclass(frozen=True)
+class ScanJob:
+    """One pattern on one symbol/timeframe"""
+    symbol: str
+    timeframe: str
+    pattern: str
+    scanner: Optional[object] = None  # Custom scanner instance (default configuration if None)
+
+    @property
+    def frame_key(self) -> Tuple[str, str]:
+        return (self.symbol, self.timeframe)
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return (self.symbol, self.timeframe, self.pattern)
+
+
+@dataclass(frozen=True)
+class SharedBars:
+    """
+    Handle to one DataFrame's OHLCV published in shared memory
+
+    The bars are stored as one (bars x 5) float64 block plus int64
+    nanosecond dates (and any extra float64 columns after them), so
+    workers map them without the DataFrame being pickled. Only this small
+    handle is sent to each worker.
+    """
+    name: str
+    length: int
+    tz: Optional[str] = None
+    dates: Optional[tuple] = None  # Dates that are not datetimes travel with the handle
+    extra: Tuple[str, ...] = ()    # Names of the extra columns
+
+    COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+    @classmethod
+    def publish(cls, df: pd.DataFrame, extra: Optional[Dict[str, np.ndarray]] = None
+                ) -> Tuple['SharedBars', shared_memory.SharedMemory]:
+        """
+        Copy a DataFrame's bars into a new shared memory block
+
+        Args:
+            df: DataFrame with OHLCV columns and Date (column or index)
+            extra: Additional per-bar float64 columns by name (e.g.
+                precomputed indicators)
+
+        Returns:
+            (handle, shared memory block); the caller owns the block and
+            must close() and unlink() it when the jobs are done
+        """
+        n = len(df)
+        dates = df['Date'] if 'Date' in df.columns else df.index.to_series()
+
+        timestamps = tz = shipped = None
+        if pd.api.types.is_datetime64_any_dtype(dates):
+            index = pd.DatetimeIndex(dates)
+            tz = str(index.tz) if index.tz is not None else None
+            timestamps = index.as_unit('ns').asi8
+        else:
+            shipped = tuple(dates)
+
+        extra = extra or {}
+        size = max(n * 8 * (len(cls.COLUMNS) + 1 + len(extra)), 1)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+
+        bars, stamps, columns = cls._views(shm, n, len(extra))
+        bars[:] = df[list(cls.COLUMNS)].to_numpy(dtype=float)
+        if timestamps is not None:
+            stamps[:] = timestamps
+        for row, values in zip(columns, extra.values()):
+            row[:] = values
+        del bars, stamps, columns
+
+        return cls(shm.name, n, tz, shipped, tuple(extra)), shm
+
+    def attach(self) -> Tuple[shared_memory.SharedMemory, pd.DataFrame]:
+        """
+        Map the published bars as a DataFrame
+
+        The OHLCV and extra columns are views of the shared block; delete
+        the DataFrame before closing the returned block.
+
+        Returns:
+            (shared memory block, DataFrame with Date, OHLCV and extra columns)
+        """
+        shm = shared_memory.SharedMemory(name=self.name)
+        bars, stamps, columns = self._views(shm, self.length, len(self.extra))
+
+        df = pd.DataFrame(bars, columns=list(self.COLUMNS), copy=False)
+        if self.dates is not None:
+            dates = list(self.dates)
+        else:
+            dates = pd.to_datetime(stamps.copy(), utc=self.tz is not None)
+            if self.tz is not None:
+                dates = dates.tz_convert(self.tz)
+        df.insert(0, 'Date', dates)
+        for name, values in zip(self.extra, columns):
+            df[name] = values
+        return shm, df
+
+    @classmethod
+    def _views(cls, shm: shared_memory.SharedMemory, n: int, extra: int = 0) -> tuple:
+        """(bars x 5) float64, int64 date and (extra x bars) float64 views of a block"""
+        width = len(cls.COLUMNS)
+        bars = np.ndarray((n, width), dtype=np.float64, buffer=shm.buf)
+        stamps = np.ndarray((n,), dtype=np.int64, buffer=shm.buf, offset=n * width * 8)
+        columns = np.ndarray((extra, n), dtype=np.float64, buffer=shm.buf,
+                             offset=n * (width + 1) * 8)
+        return bars, stamps, columns
+
+
+def _scan_frame(df: pd.DataFrame, job: ScanJob) -> list:
+    """Run one job's pattern on a DataFrame"""
+    scanners = {job.pattern: job.scanner} if job.scanner is not None else None
+    return ScanPipeline([job.pattern], scanners).scan(df, job.timeframe)[job.pattern]
+
+
+def _run_job(handle: SharedBars, job: ScanJob) -> list:
+    """Worker entry point: scan one job on shared bars"""
+    shm, df = handle.attach()
+    try:
+        return _scan_frame(df, job)
+    finally:
+        del df
+        shm.close()
+
+
+class ParallelScanExecutor:
+    """
+    Fan (symbol, timeframe, pattern) jobs out to a process pool
+
+    Every DataFrame is published to shared memory once, however many jobs
+    use it. Results are merged in job order, so the output does not depend
+    on which worker finishes first and matches a sequential scan.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize executor
+
+        Args:
+            max_workers: Worker processes (default: one per CPU); 1 scans
+                in this process
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def run(self, frames: Dict[Tuple[str, str], pd.DataFrame],
+            jobs: List[ScanJob]) -> Dict[Tuple[str, str, str], list]:
+        """
+        Run scan jobs
+
+        Args:
+            frames: DataFrame per (symbol, timeframe)
+            jobs: Jobs to run
+
+        Returns:
+            Dict of (symbol, timeframe, pattern) -> setups, in job order
+        """
+        for job in jobs:
+            if job.pattern not in PATTERNS:
+                raise ValueError(f"Unknown pattern: {job.pattern}")
+            if job.frame_key not in frames:
+                raise ValueError(f"No data for {job.symbol} {job.timeframe}")
+
+        if self.max_workers == 1 or len(jobs) <= 1:
+            return {job.key: _scan_frame(frames[job.frame_key], job) for job in jobs}
+
+        handles = {}
+        blocks = []
+        try:
+            for job in jobs:
+                if job.frame_key not in handles:
+                    handle, shm = SharedBars.publish(frames[job.frame_key])
+                    handles[job.frame_key] = handle
+                    blocks.append(shm)
+
+            workers = min(self.max_workers, len(jobs))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_run_job, handles[job.frame_key], job) for job in jobs]
+                return {job.key: future.result() for job, future in zip(jobs, futures)}
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    def scan(self, frames: Dict[Tuple[str, str], pd.DataFrame],
+             patterns: List[str]) -> Dict[Tuple[str, str, str], list]:
+        """
+        Run the same patterns on every frame
+
+        Args:
+            frames: DataFrame per (symbol, timeframe)
+            patterns: Patterns to scan on each frame
+
+        Returns:
+            Dict of (symbol, timeframe, pattern) -> setups
+        """
+        jobs = [ScanJob(symbol, timeframe, pattern)
+                for symbol, timeframe in frames for pattern in patterns]
+        return self.run(frames, jobs)
+
+
+# Bars, indicators and window scanner of the worker process (built once by _init_chunk_worker)
+_chunk_worker = None
+
+
+def _init_chunk_worker(handle: SharedBars, patterns: List[str],
+                       scanners: Optional[Dict[str, object]]):
+    """Worker initializer: map the shared bars and indicators of a chunked scan"""
+    global _chunk_worker
+    shm, df = handle.attach()
+    bars = as_bars(df)
+    indicators = {name: df[name].to_numpy() for name in INDICATORS}
+    # shm keeps the mapping alive for the worker's lifetime
+    _chunk_worker = (bars, indicators, WindowScanner(patterns, scanners), shm)
+
+
+def _scan_chunk(chunk: Tuple[int, int], timeframe: str) -> Dict[str, list]:
+    """Worker entry point: scan one chunk of the shared series"""
+    bars, indicators, windows, _ = _chunk_worker
+    return ChunkedScanExecutor.scan_chunk(windows, bars, indicators, chunk, timeframe)
+
+
+class ChunkedScanExecutor:
+    """
+    Scan one long series in time chunks on a process pool
+
+    Each chunk is evaluated on a window that adds the longest rule
+    lookback of the enabled patterns before it (the halo) and their
+    longest decision lag after it, so every bar sees exactly the bars a
+    single pass would. EMA, MACD and VWAP depend on the whole history and
+    have no finite halo; they are computed once over the series and
+    published with the bars. Chunks are merged in time order, so the
+    result is identical to ScanPipeline.scan of the whole series.
+    """
+
+    def __init__(self, patterns: Optional[List[str]] = None,
+                 scanners: Optional[Dict[str, object]] = None,
+                 max_workers: Optional[int] = None,
+                 chunk_size: Optional[int] = None):
+        """
+        Initialize executor
+
+        Args:
+            patterns: Patterns to scan (default: all of PATTERNS)
+            scanners: Optional scanner instances by pattern name
+            max_workers: Worker processes (default: one per CPU); 1 scans
+                the chunks in this process
+            chunk_size: Bars per chunk (default: one chunk per worker)
+        """
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+
+        self.windows = WindowScanner(patterns, scanners)
+        self.patterns = self.windows.patterns
+        self.scanners = scanners
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def chunks(self, n: int) -> List[Tuple[int, int]]:
+        """
+        Chunk boundaries of an n-bar series
+
+        Args:
+            n: Bars in the series
+
+        Returns:
+            (start, stop) bar ranges covering the series in order
+        """
+        size = self.chunk_size or -(-n // self.max_workers)
+        return [(start, min(start + size, n)) for start in range(0, n, max(size, 1))]
+
+    def scan(self, df: BarData, timeframe: str = 'daily') -> ScanResult:
+        """
+        Scan a series chunk by chunk
+
+        Args:
+            df: DataFrame or BarArrays with OHLCV data, oldest bar first
+            timeframe: Timeframe of the bars
+
+        Returns:
+            ScanResult identical to ScanPipeline.scan(df, timeframe)
+        """
+        bars = as_bars(df)
+        n = len(bars)
+        chunks = self.chunks(n)
+
+        # Short series gain nothing from chunking (and hit the scanners' length limits)
+        if len(chunks) <= 1 or n < self.windows.lookback + self.windows.lag + 100:
+            return self.windows.pipeline.scan(bars, timeframe)
+
+        indicators = history_indicators(bars)
+
+        if self.max_workers == 1:
+            parts = [self.scan_chunk(self.windows, bars, indicators, chunk, timeframe)
+                     for chunk in chunks]
+            return ScanResult(timeframe, WindowScanner.merge(parts))
+
+        frame = df if isinstance(df, pd.DataFrame) else bars.to_frame()
+        handle, shm = SharedBars.publish(frame, indicators)
+        try:
+            workers = min(self.max_workers, len(chunks))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_chunk_worker,
+                                     initargs=(handle, self.patterns, self.scanners)) as pool:
+                futures = [pool.submit(_scan_chunk, chunk, timeframe) for chunk in chunks]
+                parts = [future.result() for future in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+
+        return ScanResult(timeframe, WindowScanner.merge(parts))
+
+    @staticmethod
+    def scan_chunk(windows: WindowScanner, bars, indicators: Dict[str, np.ndarray],
+                   chunk: Tuple[int, int], timeframe: str) -> Dict[str, list]:
+        """
+        Setups on one chunk of a series
+
+        Args:
+            windows: WindowScanner of the enabled patterns
+            bars: BarArrays of the whole series
+            indicators: INDICATORS over the whole series
+            chunk: (start, stop) bars to evaluate
+            timeframe: Timeframe of the bars
+
+        Returns:
+            Setup lists by pattern
+        """
+        start, stop = chunk
+        first = max(0, start - windows.lookback)
+        last = min(len(bars), stop + windows.lag)
+        window = {name: values[first:last] for name, values in indicators.items()}
+        return windows.scan(bars[first:last], start - first, stop - first, timeframe,
+                            window, offset=first)
@@ -0,0 +1,334 @@
+"""
+Parameter sweep - scanner configurations evaluated against shared features
+"""
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+from typing import Dict, List, Optional, Sequence, Union
+import inspect
+import os
+import numpy as np
+import pandas as pd
+from fous_scanners import ForceScanner, SurvivalScanner, RevivalScanner
+from fous_validators import FOUSFeatures
+from ici_scanner import ICIScanner
+from indicators import IndicatorContext
+from parallel_scanner import SharedBars
+from pattern_scanners import MomentumScanner
+
+
+# Patterns that can be swept, and their scanner classes
+SWEEP_SCANNERS = {
+    'ICI': ICIScanner,
+    'Momentum': MomentumScanner,
+    'Force': ForceScanner,
+    'Survival': SurvivalScanner,
+    'Revival': RevivalScanner,
+}
+
+# Exit codes of simulate_trades
+EXIT_REASONS = ('timeout', 'stop', 'target')
+
+
+def parameter_names(pattern: str) -> List[str]:
+    """Constructor parameters of a pattern's scanner"""
+    for cls in SWEEP_SCANNERS[pattern].__mro__:
+        parameters = list(inspect.signature(cls.__init__).parameters.values())[1:]
+        # MomentumScanner forwards **kwargs to ICIScanner
+        if not any(p.kind == p.VAR_KEYWORD for p in parameters):
+            return [p.name for p in parameters]
+    return []
+
+
+def expand_grid(grid: Union[Dict[str, Sequence], List[dict]]) -> List[dict]:
+    """
+    Configurations of a parameter grid
+
+    Args:
+        grid: Values per parameter (every combination is used), or an
+            explicit list of configurations
+
+    Returns:
+        List of {parameter: value} dicts; the first parameter varies slowest
+    """
+    if isinstance(grid, dict):
+        names = list(grid)
+        return [dict(zip(names, values)) for values in product(*grid.values())]
+    return [dict(config) for config in grid]
+
+
+def simulate_trades(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray,
+                    index: np.ndarray, entry: np.ndarray, stop: np.ndarray,
+                    target: np.ndarray, bullish: np.ndarray,
+                    max_bars: int = 30) -> Dict[str, np.ndarray]:
+    """
+    Walk many trades forward over the scanned bars at once
+
+    Same rules as Backtester.backtest_trade: the trade starts on the setup
+    bar, the stop is checked before the target on every bar, and the trade
+    is closed at the close of bar max_bars; if the data ends first it is
+    closed at entry.
+
+    Args:
+        highs, lows, closes: Price arrays of the scanned DataFrame
+        index: Setup bar of each trade
+        entry, stop, target: Trade levels
+        bullish: True for long trades
+        max_bars: Bars before the timeout exit
+
+    Returns:
+        Dict of arrays: exit_price, exit_reason (index into EXIT_REASONS),
+        bars_held, pnl_r, pnl_pct
+    """
+    index = np.asarray(index, dtype=np.int64)
+    n = len(highs)
+
+    # (trade x bar) windows of the bars after each setup
+    offsets = np.arange(max_bars + 1)
+    bars = index[:, None] + offsets[None, :]
+    available = bars < n
+    bars = np.minimum(bars, n - 1)
+
+    long_side = np.asarray(bullish, dtype=bool)[:, None]
+    stop_hit = available & np.where(long_side, lows[bars] <= stop[:, None],
+                                    highs[bars] >= stop[:, None])
+    target_hit = available & np.where(long_side, highs[bars] >= target[:, None],
+                                      lows[bars] <= target[:, None])
+
+    hit = stop_hit | target_hit
+    any_hit = hit.any(axis=1)
+    first_hit = hit.argmax(axis=1)
+    rows = np.arange(len(index))
+
+    timed_out = available[:, max_bars]
+    last_bar = available.sum(axis=1) - 1
+
+    exit_reason = np.zeros(len(index), dtype=np.int64)
+    exit_price = np.where(timed_out, closes[bars[:, max_bars]], entry)
+    bars_held = np.where(timed_out, max_bars, last_bar)
+
+    stopped = any_hit & stop_hit[rows, first_hit]
+    reached = any_hit & ~stopped
+    exit_reason[stopped] = 1
+    exit_reason[reached] = 2
+    exit_price = np.where(stopped, stop, np.where(reached, target, exit_price))
+    bars_held = np.where(any_hit, first_hit, bars_held)
+
+    bullish = long_side[:, 0]
+    gain = np.where(bullish, exit_price - entry, entry - exit_price)
+    risk = np.abs(entry - stop)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pnl_r = np.where(risk > 0, gain / risk, 0.0)
+        pnl_pct = gain / entry * 100
+
+    return {
+        'exit_price': exit_price,
+        'exit_reason': exit_reason,
+        'bars_held': bars_held,
+        'pnl_r': pnl_r,
+        'pnl_pct': pnl_pct,
+    }
+
+
+def summarize_trades(trades: Dict[str, np.ndarray]) -> dict:
+    """
+    Backtest summary of simulated trades
+
+    Uses the definitions of backtest_all_setups.calculate_metrics.
+
+    Args:
+        trades: Result of simulate_trades
+
+    Returns:
+        Dict of trade count, win rate, R totals, profit factor and exits
+    """
+    pnl_r = trades['pnl_r']
+    total = len(pnl_r)
+    wins = pnl_r > 0
+
+    gross_profit = pnl_r[wins].sum()
+    gross_loss = abs(pnl_r[~wins].sum())
+
+    return {
+        'trades': total,
+        'wins': int(wins.sum()),
+        'win_rate': wins.mean() * 100 if total else 0.0,
+        'total_r': pnl_r.sum(),
+        'avg_r': pnl_r.mean() if total else 0.0,
+        'profit_factor': gross_profit / gross_loss if gross_loss > 0 else 0.0,
+        'avg_pnl_pct': trades['pnl_pct'].mean() if total else 0.0,
+        'target_hits': int((trades['exit_reason'] == 2).sum()),
+        'stop_hits': int((trades['exit_reason'] == 1).sum()),
+        'timeouts': int((trades['exit_reason'] == 0).sum()),
+        'avg_bars_held': trades['bars_held'].mean() if total else 0.0,
+    }
+
+
+class SweepFeatures:
+    """
+    Data-dependent features of one DataFrame for one pattern
+
+    Everything that does not depend on the scanner's parameters (price
+    arrays, candle-color runs, EMA/MACD alignment, FOUS volume/RSI/VWAP
+    features) is computed once here and shared by every configuration.
+    """
+
+    def __init__(self, df: pd.DataFrame, pattern: str):
+        """
+        Compute features
+
+        Args:
+            df: DataFrame with OHLCV data
+            pattern: Pattern being swept (a key of SWEEP_SCANNERS)
+        """
+        if pattern not in SWEEP_SCANNERS:
+            raise ValueError(f"Pattern cannot be swept: {pattern}")
+
+        self.df = df
+        self.pattern = pattern
+        self.high = df['High'].to_numpy(dtype=float)
+        self.low = df['Low'].to_numpy(dtype=float)
+        self.close = df['Close'].to_numpy(dtype=float)
+
+        if issubclass(SWEEP_SCANNERS[pattern], ICIScanner):
+            context = IndicatorContext.from_frame(df)
+            self.arrays = ICIScanner._pattern_arrays(df)
+            self.aligned = {
+                bullish: context.ema_aligned_mask(direction) & context.macd_aligned_mask(direction)
+                for bullish, direction in ((True, 'long'), (False, 'short'))
+            }
+        else:
+            self.features = FOUSFeatures(df)
+
+    def evaluate(self, config: dict, max_bars: int = 30) -> dict:
+        """
+        Setup counts and backtest summary of one configuration
+
+        Counts match len(scanner.scan(df)) for the configured scanner; the
+        backtest covers the valid setups.
+
+        Args:
+            config: Scanner constructor arguments
+            max_bars: Bars before a simulated trade times out
+
+        Returns:
+            Dict of the configuration, setup counts and backtest summary
+        """
+        scanner = SWEEP_SCANNERS[self.pattern](**config)
+        n = len(self.df)
+
+        if isinstance(scanner, ICIScanner):
+            indices = np.arange(50, n - 1) if n >= 50 else np.empty(0, dtype=np.int64)
+            candidates = [scanner._evaluate_ici(self.df, indices, bullish, self.arrays)
+                          for bullish in (True, False)]
+            candidate = {key: np.concatenate([c[key] for c in candidates])
+                         for key in ('index', 'entry', 'stop', 'target')}
+            candidate['bullish'] = np.concatenate([np.full(len(c['index']), c['bullish'])
+                                                   for c in candidates])
+            candidate['valid'] = np.concatenate([self.aligned[c['bullish']][c['index']]
+                                                 for c in candidates])
+        else:
+            indices = (np.arange(50, n - scanner.bars_ahead) if n >= 50
+                       else np.empty(0, dtype=np.int64))
+            candidate = scanner._evaluate(self.features, indices)
+            candidate['bullish'] = np.ones(len(candidate['index']), dtype=bool)
+
+        valid = np.asarray(candidate['valid'], dtype=bool)
+        trades = simulate_trades(
+            self.high, self.low, self.close, candidate['index'][valid],
+            candidate['entry'][valid], candidate['stop'][valid],
+            candidate['target'][valid], candidate['bullish'][valid], max_bars
+        )
+
+        row = dict(config)
+        row['setups'] = len(valid)
+        row['valid'] = int(valid.sum())
+        row.update(summarize_trades(trades))
+        return row
+
+
+# Features of the worker process (built once per worker by _init_worker)
+_worker_features = None
+
+
+def _init_worker(handle: SharedBars, pattern: str):
+    """Worker initializer: map the shared bars and build their features"""
+    global _worker_features
+    shm, df = handle.attach()
+    _worker_features = SweepFeatures(df, pattern)
+    _worker_features.shm = shm  # Keeps the mapping alive for the worker's lifetime
+
+
+def _run_chunk(configs: List[dict], max_bars: int) -> List[dict]:
+    """Worker entry point: evaluate a chunk of configurations"""
+    return [_worker_features.evaluate(config, max_bars) for config in configs]
+
+
+class ParameterSweep:
+    """
+    Evaluate a grid of scanner configurations on one DataFrame
+
+    Features are computed once (once per worker process when run in
+    parallel) and every configuration only reruns the parameter-dependent
+    rules. Each configuration gets its setup counts and a backtest
+    summary of its valid setups.
+    """
+
+    def __init__(self, pattern: str = 'ICI', max_workers: Optional[int] = None,
+                 max_bars: int = 30):
+        """
+        Initialize sweep
+
+        Args:
+            pattern: Pattern to sweep (a key of SWEEP_SCANNERS)
+            max_workers: Worker processes (default: one per CPU); 1 runs
+                in this process
+            max_bars: Bars before a simulated trade times out
+        """
+        if pattern not in SWEEP_SCANNERS:
+            raise ValueError(f"Pattern cannot be swept: {pattern}")
+
+        self.pattern = pattern
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_bars = max_bars
+
+    def run(self, df: pd.DataFrame,
+            grid: Union[Dict[str, Sequence], List[dict]]) -> pd.DataFrame:
+        """
+        Evaluate every configuration of a grid
+
+        Args:
+            df: DataFrame with OHLCV data
+            grid: Values per parameter, or a list of configurations
+
+        Returns:
+            DataFrame with one row per configuration, in grid order:
+            parameters, setup counts and backtest summary
+        """
+        configs = expand_grid(grid)
+        allowed = parameter_names(self.pattern)
+        for config in configs:
+            unknown = [name for name in config if name not in allowed]
+            if unknown:
+                raise ValueError(f"Unknown {self.pattern} parameters: {unknown}")
+
+        if self.max_workers == 1 or len(configs) <= 1:
+            features = SweepFeatures(df, self.pattern)
+            rows = [features.evaluate(config, self.max_bars) for config in configs]
+            return pd.DataFrame(rows)
+
+        # A few chunks per worker keeps them busy without much overhead
+        workers = min(self.max_workers, len(configs))
+        chunk_size = -(-len(configs) // (workers * 4))
+        chunks = [configs[i:i + chunk_size] for i in range(0, len(configs), chunk_size)]
+
+        handle, shm = SharedBars.publish(df)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(handle, self.pattern)) as pool:
+                futures = [pool.submit(_run_chunk, chunk, self.max_bars) for chunk in chunks]
+                rows = [row for future in futures for row in future.result()]
+        finally:
+            shm.close()
+            shm.unlink()
+
+        return pd.DataFrame(rows)
@@ -1,10 +1,15 @@
 """
 Additional pattern scanners: Momentum, W/M, and Harmonic
 """
-from typing import List, Optional
-import pandas as pd
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from dedup import DEFAULT_RANKING, deduplicate_setups
+from bar_arrays import BarData, as_bars
 from ici_scanner import ICIScanner, ICISetup
 from fibonacci import FibonacciCalculator
+from indicators import IndicatorContext
+from stage_counter import StageCounter
+from timeframe_index import confirm_entries
 from validators import EntryValidator
 
 
@@ -26,14 +31,30 @@ class MomentumScanner(ICIScanner):
             min_risk_reward=kwargs.get('min_risk_reward', 1.3)
         )
 
-    def scan(self, df: pd.DataFrame, timeframe: str = '1h') -> List[ICISetup]:
-        """Scan for momentum patterns on 1h timeframe"""
-        setups = super().scan(df, timeframe)
+    def scan(self, df: BarData, timeframe: str = '1h',
+             context: Optional[IndicatorContext] = None,
+             entry_df: Optional[BarData] = None) -> List[ICISetup]:
+        """
+        Scan for momentum patterns on 1h timeframe
+
+        Args:
+            df: DataFrame or BarArrays with OHLC data
+            timeframe: Timeframe being scanned
+            context: Precomputed EMA/MACD for df (built here if not given)
+            entry_df: Optional lower-timeframe (15m) bars to confirm entries on
+
+        Returns:
+            List of ICISetup objects
+        """
+        setups = super().scan(df, timeframe, context)
 
         # Update pattern type
         for setup in setups:
             setup.pattern_type = 'Momentum'
 
+        if entry_df is not None:
+            confirm_entries(setups, df, entry_df)
+
         return setups
 
 
@@ -67,112 +88,270 @@ class WMScanner:
         self.lookback_period = lookback_period
         self.fib_calc = FibonacciCalculator()
         self.validator = EntryValidator()
+        self.stage_counts = StageCounter()  # Bars removed per filter stage
 
-    def scan(self, df: pd.DataFrame, timeframe: str = 'weekly') -> List[ICISetup]:
+    def scan(self, df: BarData, timeframe: str = 'weekly',
+             context: Optional[IndicatorContext] = None,
+             pivots: Optional[dict] = None,
+             entry_df: Optional[BarData] = None) -> List[ICISetup]:
         """
         Scan for W/M patterns
 
         Args:
-            df: DataFrame with OHLC data
+            df: DataFrame or BarArrays with OHLC data
             timeframe: Timeframe being scanned
+            context: Precomputed EMA/MACD for df (built here if not given)
+            pivots: Precomputed _find_pivots(df) result (built here if not given)
+            entry_df: Optional lower-timeframe (4h) bars to confirm entries on
 
         Returns:
             List of ICISetup objects
         """
-        setups = []
+        self.stage_counts.reset()
 
         if len(df) < self.lookback_period:
-            return setups
+            return []
 
-        # Find pivot points
-        pivots = self._find_pivots(df)
+        bars = as_bars(df)
 
-        # Look for W and M patterns in pivots
-        for i in range(50, len(df) - 1):
-            # Try to find W pattern (bullish)
-            w_setup = self._find_w_pattern(df, pivots, i, timeframe)
-            if w_setup:
-                setups.append(w_setup)
+        # Find pivot points
+        if pivots is None:
+            pivots = self._find_pivots(bars)
+        prices = self._price_arrays(bars)
 
-            # Try to find M pattern (bearish)
-            m_setup = self._find_m_pattern(df, pivots, i, timeframe)
-            if m_setup:
-                setups.append(m_setup)
+        if context is None:
+            context = IndicatorContext.from_frame(bars)
 
+        setups = self._scan_indices(bars, np.arange(50, len(bars) - 1), timeframe,
+                                    context, pivots, prices)
+        if entry_df is not None:
+            confirm_entries(setups, bars, entry_df)
         return setups
 
-    def _find_pivots(self, df: pd.DataFrame, window: int = 5) -> dict:
+    def _scan_indices(self, df: BarData, indices: np.ndarray, timeframe: str,
+                      context: IndicatorContext, pivots: dict,
+                      prices: dict) -> List[ICISetup]:
         """
-        Find pivot highs and lows
+        Evaluate W and M patterns at the given bar indices
+
+        The vectorized pivot prefilter (_candidate_bars) runs first; the
+        Fibonacci and R:R checks only run on the bars it keeps.
 
         Args:
-            df: DataFrame with OHLC data
-            window: Window size for pivot detection
+            df: DataFrame or BarArrays with OHLC data
+            indices: Bar indices to evaluate
+            timeframe: Current timeframe
+            context: Precomputed EMA/MACD for df
+            pivots: _find_pivots(df) result
+            prices: _price_arrays(df) result
 
         Returns:
-            Dict with 'highs' and 'lows' indices
+            ICISetup objects ordered by bar, W before M
+        """
+        bars = as_bars(df)
+        finders = (self._find_w_pattern, self._find_m_pattern)
+        candidates = [self._candidate_bars(pivots, prices, indices, bullish)
+                      for bullish in (True, False)]
+
+        bar_index = np.concatenate(candidates)
+        direction = np.concatenate([np.zeros(len(candidates[0]), dtype=np.int64),
+                                    np.ones(len(candidates[1]), dtype=np.int64)])
+        order = np.lexsort((direction, bar_index))
+
+        setups = []
+        for k in order:
+            setup = finders[direction[k]](bars, pivots, int(bar_index[k]), timeframe,
+                                          context, prices)
+            if setup:
+                setups.append(setup)
+
+        self.stage_counts.record('fibonacci_rr', len(order) - len(setups))
+        return setups
+
+    def _candidate_bars(self, pivots: dict, prices: dict, indices: np.ndarray,
+                        bullish: bool) -> np.ndarray:
         """
-        pivot_highs = []
-        pivot_lows = []
+        Prefilter bars on pivot structure and neckline break
 
-        for i in range(window, len(df) - window):
-            # Check if current bar is a pivot high
-            is_pivot_high = True
-            is_pivot_low = True
+        Applies, for all bars at once, the structural rejections of
+        _find_w_pattern (bullish) or _find_m_pattern (bearish): two outer
+        pivots and one inner pivot in the lookback window, an inner pivot
+        between the last two outer ones, a higher low (lower high), and a
+        close through the neckline.
 
-            current_high = df.iloc[i]['High']
-            current_low = df.iloc[i]['Low']
+        Args:
+            pivots: _find_pivots result
+            prices: _price_arrays result
+            indices: Bar indices to evaluate
+            bullish: True for W, False for M
+
+        Returns:
+            Bars that can still form the pattern, in index order
+        """
+        counts = self.stage_counts
+        idx = np.asarray(indices, dtype=np.int64)
+        counts.start(len(idx))
+
+        outer, inner = ((pivots['lows'], pivots['highs']) if bullish
+                        else (pivots['highs'], pivots['lows']))
+
+        def in_window(pivot_indices: np.ndarray) -> tuple:
+            # Pivots p with idx - lookback_period < p < idx, as _recent_pivots
+            start = np.searchsorted(pivot_indices, idx - self.lookback_period, side='right')
+            stop = np.searchsorted(pivot_indices, idx, side='left')
+            return start, stop
+
+        outer_start, outer_stop = in_window(outer)
+        inner_start, inner_stop = in_window(inner)
+        idx, outer_stop = counts.apply(
+            'pivots', (outer_stop - outer_start >= 2) & (inner_stop - inner_start >= 1),
+            idx, outer_stop)
+
+        first = outer[outer_stop - 2]
+        second = outer[outer_stop - 1]
+
+        # First inner pivot after the first outer one must come before the second
+        k = np.searchsorted(inner, first, side='right')
+        middle = inner[np.minimum(k, len(inner) - 1)] if len(inner) else k
+        idx, first, second, middle = counts.apply(
+            'middle_pivot', (k < len(inner)) & (middle < second),
+            idx, first, second, middle)
+
+        # Higher low (W) or lower high (M), then the close through the neckline
+        close = prices['Close'][idx]
+        if bullish:
+            shape = ~(prices['Low'][second] <= prices['Low'][first])
+        else:
+            shape = ~(prices['High'][second] >= prices['High'][first])
+        idx, close, middle = counts.apply('shape', shape, idx, close, middle)
+
+        if bullish:
+            breaks = ~(close < prices['High'][middle])
+        else:
+            breaks = ~(close > prices['Low'][middle])
+
+        return counts.apply('neckline', breaks, idx)
+
+    def deduplicate_setups(self, setups: List[ICISetup], by='day',
+                           per: Sequence[str] = (),
+                           ranking: Sequence[Tuple[str, bool]] = DEFAULT_RANKING) -> List[ICISetup]:
+        """
+        Keep the best W/M setup per day (see ICIScanner.deduplicate_setups)
 
-            # Compare with surrounding bars
-            for j in range(1, window + 1):
-                if df.iloc[i - j]['High'] > current_high or df.iloc[i + j]['High'] > current_high:
-                    is_pivot_high = False
-                if df.iloc[i - j]['Low'] < current_low or df.iloc[i + j]['Low'] < current_low:
-                    is_pivot_low = False
+        Args:
+            setups: List of ICISetup objects
+            by: 'day', 'bar' or a fixed window such as '4h'
+            per: Fields that split groups, e.g. ('direction',) keeps the
+                best W and the best M
+            ranking: (field, higher_is_better) pairs, most important first
 
-            if is_pivot_high:
-                pivot_highs.append(i)
-            if is_pivot_low:
-                pivot_lows.append(i)
+        Returns:
+            Deduplicated list
+        """
+        return deduplicate_setups(setups, by, per, ranking)
+
+    @staticmethod
+    def _price_arrays(df: BarData) -> dict:
+        """High/Low/Close as float arrays for positional lookups"""
+        bars = as_bars(df)
+        return {
+            'High': bars.high,
+            'Low': bars.low,
+            'Close': bars.close,
+        }
+
+    def _find_pivots(self, df: BarData, window: int = 5) -> dict:
+        """
+        Find pivot highs and lows
 
-        return {'highs': pivot_highs, 'lows': pivot_lows}
+        A bar is a pivot high when no bar within `window` bars on either
+        side has a higher high (ties allowed), using one centered rolling
+        max over the whole series. Pivot lows mirror this with lows.
 
-    def _find_w_pattern(self, df: pd.DataFrame, pivots: dict,
-                       idx: int, timeframe: str) -> Optional[ICISetup]:
+        Args:
+            df: DataFrame or BarArrays with OHLC data
+            window: Window size for pivot detection
+
+        Returns:
+            Dict with 'highs' and 'lows' as sorted int64 index arrays
+        """
+        span = 2 * window + 1
+        bars = as_bars(df)
+        highs = bars.series('High')
+        lows = bars.series('Low')
+
+        # Centered extremes skip NaN neighbours, like the scalar comparisons did
+        max_high = highs.rolling(span, center=True, min_periods=1).max().to_numpy()
+        min_low = lows.rolling(span, center=True, min_periods=1).min().to_numpy()
+
+        is_pivot_high = ~(max_high > highs.to_numpy())
+        is_pivot_low = ~(min_low < lows.to_numpy())
+
+        # Only bars with a full window on both sides qualify
+        edge = np.zeros(len(bars), dtype=bool)
+        edge[window:len(bars) - window] = True
+
+        return {
+            'highs': np.flatnonzero(is_pivot_high & edge),
+            'lows': np.flatnonzero(is_pivot_low & edge),
+        }
+
+    def _recent_pivots(self, pivot_indices: np.ndarray, idx: int) -> np.ndarray:
+        """Pivots p with idx - lookback_period < p < idx (binary search)"""
+        start = np.searchsorted(pivot_indices, idx - self.lookback_period, side='right')
+        stop = np.searchsorted(pivot_indices, idx, side='left')
+        return pivot_indices[start:stop]
+
+    @staticmethod
+    def _first_pivot_between(pivot_indices: np.ndarray, left: int,
+                             right: int) -> Optional[int]:
+        """First pivot p with left < p < right, or None"""
+        k = np.searchsorted(pivot_indices, left, side='right')
+        if k < len(pivot_indices) and pivot_indices[k] < right:
+            return int(pivot_indices[k])
+        return None
+
+    def _find_w_pattern(self, df: BarData, pivots: dict,
+                       idx: int, timeframe: str,
+                       context: IndicatorContext,
+                       prices: Optional[dict] = None) -> Optional[ICISetup]:
         """
         Find W pattern (bullish): Low - High - Low (higher low)
 
         Args:
-            df: DataFrame
+            df: DataFrame or BarArrays
             pivots: Pivot points dict
             idx: Current index
             timeframe: Current timeframe
+            context: Precomputed EMA/MACD for df
+            prices: Price arrays from _price_arrays (built here if not given)
 
         Returns:
             ICISetup if valid pattern found
         """
         # Need at least 3 pivots: low, high, low
-        recent_lows = [p for p in pivots['lows'] if p < idx and p > idx - self.lookback_period]
-        recent_highs = [p for p in pivots['highs'] if p < idx and p > idx - self.lookback_period]
+        recent_lows = self._recent_pivots(pivots['lows'], idx)
+        recent_highs = self._recent_pivots(pivots['highs'], idx)
 
         if len(recent_lows) < 2 or len(recent_highs) < 1:
             return None
 
         # Get last 2 lows and intermediate high
-        low1_idx = recent_lows[-2]
-        low2_idx = recent_lows[-1]
+        low1_idx = int(recent_lows[-2])
+        low2_idx = int(recent_lows[-1])
 
         # Find high between the two lows
-        highs_between = [p for p in recent_highs if low1_idx < p < low2_idx]
-        if not highs_between:
+        high_idx = self._first_pivot_between(pivots['highs'], low1_idx, low2_idx)
+        if high_idx is None:
             return None
 
-        high_idx = highs_between[0]
+        if prices is None:
+            prices = self._price_arrays(df)
 
         # Get prices
-        low1 = df.iloc[low1_idx]['Low']
-        high = df.iloc[high_idx]['High']
-        low2 = df.iloc[low2_idx]['Low']
+        low1 = prices['Low'][low1_idx]
+        high = prices['High'][high_idx]
+        low2 = prices['Low'][low2_idx]
 
         # Validate W pattern: low2 should be higher than low1 (higher low)
         if low2 <= low1:
@@ -180,7 +359,7 @@ class WMScanner:
 
         # Validate neckline break
         neckline = high
-        current_price = df.iloc[idx]['Close']
+        current_price = prices['Close'][idx]
 
         # For W pattern, we want price to break above neckline
         if current_price < neckline:
@@ -206,14 +385,13 @@ class WMScanner:
             return None
 
         # Validate indicators
-        close_prices = df['Close'].iloc[:idx + 1]
-        ema_aligned = self.validator.validate_ema(close_prices, 10, 20, 'long')
-        macd_aligned = self.validator.validate_macd(close_prices, 'long')
+        ema_aligned = context.ema_aligned(idx, 'long')
+        macd_aligned = context.macd_aligned(idx, 'long')
 
         valid = ema_aligned and macd_aligned and risk_reward >= self.min_risk_reward
 
         return ICISetup(
-            date=df.iloc[idx]['Date'] if 'Date' in df.columns else df.index[idx],
+            date=as_bars(df).date(idx),
             pattern_type='W',
             timeframe=timeframe,
             impulse_high=high,
@@ -230,42 +408,47 @@ class WMScanner:
             valid=valid
         )
 
-    def _find_m_pattern(self, df: pd.DataFrame, pivots: dict,
-                       idx: int, timeframe: str) -> Optional[ICISetup]:
+    def _find_m_pattern(self, df: BarData, pivots: dict,
+                       idx: int, timeframe: str,
+                       context: IndicatorContext,
+                       prices: Optional[dict] = None) -> Optional[ICISetup]:
         """
         Find M pattern (bearish): High - Low - High (lower high)
 
         Args:
-            df: DataFrame
+            df: DataFrame or BarArrays
             pivots: Pivot points dict
             idx: Current index
             timeframe: Current timeframe
+            context: Precomputed EMA/MACD for df
+            prices: Price arrays from _price_arrays (built here if not given)
 
         Returns:
             ICISetup if valid pattern found
         """
         # Need at least 3 pivots: high, low, high
-        recent_highs = [p for p in pivots['highs'] if p < idx and p > idx - self.lookback_period]
-        recent_lows = [p for p in pivots['lows'] if p < idx and p > idx - self.lookback_period]
+        recent_highs = self._recent_pivots(pivots['highs'], idx)
+        recent_lows = self._recent_pivots(pivots['lows'], idx)
 
         if len(recent_highs) < 2 or len(recent_lows) < 1:
             return None
 
         # Get last 2 highs and intermediate low
-        high1_idx = recent_highs[-2]
-        high2_idx = recent_highs[-1]
+        high1_idx = int(recent_highs[-2])
+        high2_idx = int(recent_highs[-1])
 
         # Find low between the two highs
-        lows_between = [p for p in recent_lows if high1_idx < p < high2_idx]
-        if not lows_between:
+        low_idx = self._first_pivot_between(pivots['lows'], high1_idx, high2_idx)
+        if low_idx is None:
             return None
 
-        low_idx = lows_between[0]
+        if prices is None:
+            prices = self._price_arrays(df)
 
         # Get prices
-        high1 = df.iloc[high1_idx]['High']
-        low = df.iloc[low_idx]['Low']
-        high2 = df.iloc[high2_idx]['High']
+        high1 = prices['High'][high1_idx]
+        low = prices['Low'][low_idx]
+        high2 = prices['High'][high2_idx]
 
         # Validate M pattern: high2 should be lower than high1 (lower high)
         if high2 >= high1:
@@ -273,7 +456,7 @@ class WMScanner:
 
         # Validate neckline break
         neckline = low
-        current_price = df.iloc[idx]['Close']
+        current_price = prices['Close'][idx]
 
         # For M pattern, we want price to break below neckline
         if current_price > neckline:
@@ -301,14 +484,13 @@ class WMScanner:
             return None
 
         # Validate indicators
-        close_prices = df['Close'].iloc[:idx + 1]
-        ema_aligned = self.validator.validate_ema(close_prices, 10, 20, 'short')
-        macd_aligned = self.validator.validate_macd(close_prices, 'short')
+        ema_aligned = context.ema_aligned(idx, 'short')
+        macd_aligned = context.macd_aligned(idx, 'short')
 
         valid = ema_aligned and macd_aligned and risk_reward >= self.min_risk_reward
 
         return ICISetup(
-            date=df.iloc[idx]['Date'] if 'Date' in df.columns else df.index[idx],
+            date=as_bars(df).date(idx),
             pattern_type='M',
             timeframe=timeframe,
             impulse_high=high1,
@@ -342,9 +524,24 @@ class HarmonicScanner(WMScanner):
             lookback_period=kwargs.get('lookback_period', 50)
         )
 
-    def scan(self, df: pd.DataFrame, timeframe: str = 'daily') -> List[ICISetup]:
-        """Scan for harmonic patterns on daily timeframe"""
-        setups = super().scan(df, timeframe)
+    def scan(self, df: BarData, timeframe: str = 'daily',
+             context: Optional[IndicatorContext] = None,
+             pivots: Optional[dict] = None,
+             entry_df: Optional[BarData] = None) -> List[ICISetup]:
+        """
+        Scan for harmonic patterns on daily timeframe
+
+        Args:
+            df: DataFrame or BarArrays with OHLC data
+            timeframe: Timeframe being scanned
+            context: Precomputed EMA/MACD for df (built here if not given)
+            pivots: Precomputed _find_pivots(df) result (built here if not given)
+            entry_df: Optional lower-timeframe (1h) bars to confirm entries on
+
+        Returns:
+            List of ICISetup objects
+        """
+        setups = super().scan(df, timeframe, context, pivots, entry_df)
 
         # Update pattern type and add additional pivot validation
         validated_setups = []
@@ -0,0 +1,355 @@
+"""
+Pattern specs - declarative bar rules compiled to whole-series NumPy masks
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Tuple
+import operator
+import numpy as np
+import pandas as pd
+from array_utils import run_lengths
+from bar_arrays import BarArrays, BarData, as_bars
+from fous_validators import FOUSValidator
+from validators import EntryValidator
+
+
+class Expr:
+    """
+    Node of a pattern spec: a value (float array) or condition (bool array)
+
+    Nodes are built with col() and operators: arithmetic (+ - * /) and
+    comparisons (< <= > >=) on values, & | ~ on conditions. Comparisons
+    with NaN are False, like the scalar validators; ~ negates that, so
+    ~(col('vwap') > x) is True where VWAP is NaN (col('vwap') <= x is not).
+    """
+
+    is_condition = False
+
+    def __init__(self, op: str, *args):
+        self.op = op
+        self.args = args
+
+    @property
+    def key(self) -> tuple:
+        """Structural identity (equal keys are evaluated once)"""
+        return (self.op,) + tuple(arg.key if isinstance(arg, Expr) else arg
+                                  for arg in self.args)
+
+    @property
+    def children(self) -> List['Expr']:
+        return [arg for arg in self.args if isinstance(arg, Expr)]
+
+    def __repr__(self) -> str:
+        args = ', '.join(repr(arg) for arg in self.args)
+        return f"{self.op}({args})"
+
+    # Values
+    def __add__(self, other): return _value('add', self, other)
+    def __sub__(self, other): return _value('sub', self, other)
+    def __mul__(self, other): return _value('mul', self, other)
+    def __truediv__(self, other): return _value('div', self, other)
+    def __radd__(self, other): return _value('add', other, self)
+    def __rsub__(self, other): return _value('sub', other, self)
+    def __rmul__(self, other): return _value('mul', other, self)
+    def __rtruediv__(self, other): return _value('div', other, self)
+
+    def __lt__(self, other): return _condition('lt', self, other)
+    def __le__(self, other): return _condition('le', self, other)
+    def __gt__(self, other): return _condition('gt', self, other)
+    def __ge__(self, other): return _condition('ge', self, other)
+
+    def between(self, low: float, high: float) -> 'Expr':
+        """low <= value <= high"""
+        return (self >= low) & (self <= high)
+
+    def shift(self, bars: int = 1) -> 'Expr':
+        """Value `bars` bars earlier (NaN / False before the first bar)"""
+        return type(self)('shift', self, _count(bars, allow_zero=True))
+
+    def ema(self, span: int) -> 'Expr':
+        """EMA like EntryValidator.calculate_ema"""
+        return Expr('ema', self._value(), _count(span))
+
+    def rsi(self, period: int = 14) -> 'Expr':
+        """RSI like FOUSValidator.calculate_rsi"""
+        return Expr('rsi', self._value(), _count(period))
+
+    def rolling_mean(self, window: int) -> 'Expr':
+        """Mean of the last `window` values, including this bar"""
+        return Expr('rolling_mean', self._value(), _count(window))
+
+    def rolling_min(self, window: int) -> 'Expr':
+        """Minimum of the last `window` values, including this bar"""
+        return Expr('rolling_min', self._value(), _count(window))
+
+    def rolling_max(self, window: int) -> 'Expr':
+        """Maximum of the last `window` values, including this bar"""
+        return Expr('rolling_max', self._value(), _count(window))
+
+    def rising(self, bars: int) -> 'Expr':
+        """Value rose on each of the last `bars` bars"""
+        return (self > self.shift(1)).consecutive(bars)
+
+    def falling(self, bars: int) -> 'Expr':
+        """Value fell on each of the last `bars` bars"""
+        return (self < self.shift(1)).consecutive(bars)
+
+    # Conditions
+    def __and__(self, other): return _condition('and', self._condition(), _as_condition(other))
+    def __or__(self, other): return _condition('or', self._condition(), _as_condition(other))
+    def __invert__(self): return _condition('not', self._condition())
+
+    def consecutive(self, bars: int) -> 'Expr':
+        """Condition held on each of the last `bars` bars, including this one"""
+        return _condition('consecutive', self._condition(), _count(bars))
+
+    def within(self, bars: int) -> 'Expr':
+        """Condition held on any of the last `bars` bars, including this one"""
+        return _condition('within', self._condition(), _count(bars))
+
+    def count(self, bars: int) -> 'Expr':
+        """Bars among the last `bars` on which the condition held"""
+        return Expr('count', self._condition(), _count(bars))
+
+    def _value(self) -> 'Expr':
+        if self.is_condition:
+            raise ValueError(f"Expected a value, got condition {self!r}")
+        return self
+
+    def _condition(self) -> 'Expr':
+        if not self.is_condition:
+            raise ValueError(f"Expected a condition, got value {self!r}")
+        return self
+
+
+class Condition(Expr):
+    """Expr with a boolean result"""
+    is_condition = True
+
+
+def _value(op: str, left, right) -> Expr:
+    return Expr(op, _as_value(left), _as_value(right))
+
+
+def _condition(op: str, *args) -> Condition:
+    if op in ('lt', 'le', 'gt', 'ge'):
+        args = tuple(_as_value(arg) for arg in args)
+    return Condition(op, *args)
+
+
+def _as_value(item) -> Expr:
+    if isinstance(item, Expr):
+        return item._value()
+    if isinstance(item, (bool, np.bool_)) or not isinstance(item, (int, float, np.number)):
+        raise ValueError(f"Expected a number or value expression, got {item!r}")
+    return Expr('const', float(item))
+
+
+def _as_condition(item) -> Expr:
+    if not isinstance(item, Expr):
+        raise ValueError(f"Expected a condition, got {item!r}")
+    return item._condition()
+
+
+def _count(bars, allow_zero: bool = False) -> int:
+    if not isinstance(bars, (int, np.integer)) or bars < (0 if allow_zero else 1):
+        raise ValueError(f"Bar count must be a {'non-negative' if allow_zero else 'positive'} "
+                         f"integer, got {bars!r}")
+    return int(bars)
+
+
+# Columns a spec can read: bar arrays plus indicators computed like the validators
+COLUMNS = ('open', 'high', 'low', 'close', 'volume', 'vwap',
+           'macd_line', 'macd_signal', 'macd_histogram')
+
+
+def col(name: str) -> Expr:
+    """
+    Column of the bars
+
+    Args:
+        name: One of COLUMNS
+
+    Returns:
+        Value expression
+    """
+    name = name.lower()
+    if name not in COLUMNS:
+        raise ValueError(f"Unknown column: {name} (expected one of {COLUMNS})")
+    return Expr('col', name)
+
+
+def green() -> Condition:
+    """Close above open"""
+    return col('close') > col('open')
+
+
+def red() -> Condition:
+    """Close below open"""
+    return col('close') < col('open')
+
+
+def _shift(values: np.ndarray, bars: int) -> np.ndarray:
+    fill = False if values.dtype == bool else np.nan
+    shifted = np.full(len(values), fill, dtype=values.dtype)
+    if bars < len(values):
+        shifted[bars:] = values[:len(values) - bars]
+    return shifted
+
+
+def _window_count(mask: np.ndarray, bars: int) -> np.ndarray:
+    """True values among the last `bars` positions, including each one"""
+    counts = np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+    stops = np.arange(1, len(mask) + 1)
+    return counts[stops] - counts[np.maximum(stops - bars, 0)]
+
+
+def _rolling(how: str) -> Callable:
+    def evaluate(values: np.ndarray, window: int) -> np.ndarray:
+        rolling = pd.Series(values, copy=False).rolling(window)
+        return getattr(rolling, how)().to_numpy()
+    return evaluate
+
+
+def _column(bars: BarArrays, name: str) -> np.ndarray:
+    if name in ('open', 'high', 'low', 'close', 'volume'):
+        return getattr(bars, name)
+    if name == 'vwap':
+        return FOUSValidator.calculate_vwap(bars).to_numpy()
+    macd = EntryValidator.cached_macd(bars)
+    return macd[('macd_line', 'macd_signal', 'macd_histogram').index(name)]
+
+
+def _close_indicator(bars: BarArrays, node: Expr):
+    """EMA/RSI of the close prices from the bars' indicator cache (None for other nodes)"""
+    if node.op not in ('ema', 'rsi') or node.args[0].key != ('col', 'close'):
+        return None
+    if node.op == 'ema':
+        return EntryValidator.cached_ema(bars, node.args[1])
+    return FOUSValidator.cached_rsi(bars, node.args[1])
+
+
+_COMPARE = {'lt': operator.lt, 'le': operator.le, 'gt': operator.gt, 'ge': operator.ge}
+_ARITHMETIC = {'add': np.add, 'sub': np.subtract, 'mul': np.multiply, 'div': np.divide}
+
+# Node evaluators: (evaluated child arrays, literal args) -> array
+_KERNELS: Dict[str, Callable] = {
+    'shift': lambda values, bars: _shift(values, bars),
+    'ema': lambda values, span: pd.Series(values, copy=False).ewm(
+        span=span, adjust=False).mean().to_numpy(),
+    'rsi': lambda values, period: FOUSValidator.calculate_rsi(
+        pd.Series(values, copy=False), period).to_numpy(),
+    'rolling_mean': _rolling('mean'),
+    'rolling_min': _rolling('min'),
+    'rolling_max': _rolling('max'),
+    'and': np.logical_and,
+    'or': np.logical_or,
+    'not': np.logical_not,
+    'consecutive': lambda mask, bars: run_lengths(mask) >= bars,
+    'within': lambda mask, bars: _window_count(mask, bars) > 0,
+    'count': lambda mask, bars: _window_count(mask, bars).astype(float),
+}
+
+
+class CompiledPattern:
+    """
+    A spec flattened into NumPy steps
+
+    Nodes are ordered children-first and structurally equal nodes are
+    merged, so a column or indicator used by several rules is computed
+    once per series.
+    """
+
+    def __init__(self, condition: Expr):
+        self.steps: List[Tuple[Expr, Tuple[int, ...]]] = []
+        slots: Dict[tuple, int] = {}
+
+        def visit(node: Expr) -> int:
+            key = node.key
+            if key not in slots:
+                inputs = tuple(visit(child) for child in node.children)
+                slots[key] = len(self.steps)
+                self.steps.append((node, inputs))
+            return slots[key]
+
+        visit(condition._condition())
+
+    def __call__(self, df: BarData) -> np.ndarray:
+        """
+        Evaluate on every bar of a series
+
+        Args:
+            df: DataFrame or BarArrays with OHLCV data
+
+        Returns:
+            Boolean array over the bars
+        """
+        bars = as_bars(df)
+        n = len(bars)
+        results: List[np.ndarray] = []
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for node, inputs in self.steps:
+                values = [results[slot] for slot in inputs]
+                literals = [arg for arg in node.args if not isinstance(arg, Expr)]
+                cached = _close_indicator(bars, node)
+                if cached is not None:
+                    result = cached
+                elif node.op == 'col':
+                    result = _column(bars, node.args[0])
+                elif node.op == 'const':
+                    result = np.full(n, node.args[0])
+                elif node.op in _COMPARE:
+                    result = _COMPARE[node.op](*values)
+                elif node.op in _ARITHMETIC:
+                    result = _ARITHMETIC[node.op](*values)
+                else:
+                    result = _KERNELS[node.op](*values, *literals)
+                results.append(result)
+
+        return np.asarray(results[-1], dtype=bool)
+
+
+@dataclass
+class PatternSpec:
+    """
+    A named bar rule, e.g. "RSI was below 30 within 5 bars and is now 30-45":
+
+        rsi = col('close').rsi(14)
+        PatternSpec('rsi_recovery', (rsi < 30).within(5).shift(1) & rsi.between(30, 45))
+
+    Every bar is evaluated at once; research can add or tweak rules
+    without writing per-bar loops.
+    """
+    name: str
+    condition: Expr
+
+    def __post_init__(self):
+        self._compiled = CompiledPattern(self.condition)
+
+    def mask(self, df: BarData) -> np.ndarray:
+        """Boolean array: rule holds at each bar"""
+        return self._compiled(df)
+
+    def bars(self, df: BarData) -> np.ndarray:
+        """Indices of the bars the rule holds at"""
+        return np.flatnonzero(self.mask(df))
+
+    def dates(self, df: BarData) -> pd.Index:
+        """Dates of the bars the rule holds at"""
+        bars = as_bars(df)
+        return bars.dates[self.bars(bars)]
+
+
+def evaluate_specs(specs: List[PatternSpec], df: BarData) -> pd.DataFrame:
+    """
+    Masks of several specs over one series
+
+    Args:
+        specs: Specs to evaluate
+        df: DataFrame or BarArrays with OHLCV data
+
+    Returns:
+        DataFrame with one boolean column per spec name, indexed by date
+    """
+    bars = as_bars(df)
+    return pd.DataFrame({spec.name: spec.mask(bars) for spec in specs}, index=bars.dates)
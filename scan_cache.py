@@ -0,0 +1,229 @@
+"""
+Scan cache - rescan only the bars appended since a series was last scanned
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import copy
+import hashlib
+import numpy as np
+import pandas as pd
+from bar_arrays import BarArrays, BarData, as_bars
+from scan_pipeline import ScanResult
+from window_scan import INDICATORS, IndicatorStates, WindowScanner, history_indicators
+
+
+def scanner_config(scanner) -> tuple:
+    """Hashable description of a scanner's class and parameters"""
+    params = []
+    for name, value in sorted(vars(scanner).items()):
+        if value is None or isinstance(value, (bool, int, float, str)):
+            params.append((name, value))
+        elif hasattr(value, 'scan'):
+            # Composite scanners (Gold) include their components
+            params.append((name, scanner_config(value)))
+    return (type(scanner).__name__, tuple(params))
+
+
+def _identity_arrays(bars: BarArrays) -> List[np.ndarray]:
+    """Element-wise arrays identifying the bars (a prefix hashes like the shorter series)"""
+    arrays = [bars.open, bars.high, bars.low, bars.close, bars.volume]
+    if bars.timestamps is not None:
+        arrays.append(bars.timestamps)
+    elif bars.labels is not None:
+        arrays.append(pd.util.hash_array(np.asarray(bars.labels, dtype=object)))
+    return arrays
+
+
+def _update_hashers(hashers: list, arrays: List[np.ndarray], start: int, stop: int) -> list:
+    """Feed rows start..stop of each array to its hasher"""
+    for hasher, array in zip(hashers, arrays):
+        hasher.update(np.ascontiguousarray(array[start:stop]))
+    return hashers
+
+
+def _digest(hashers: list, bars: BarArrays) -> str:
+    """Fingerprint from the per-column hashers"""
+    combined = hashlib.blake2b(digest_size=16)
+    for hasher in hashers:
+        combined.update(hasher.digest())
+    combined.update(str(bars.tz).encode())
+    return combined.hexdigest()
+
+
+def bar_fingerprint(df: BarData, length: Optional[int] = None) -> str:
+    """
+    Fingerprint of a series' first bars
+
+    Args:
+        df: DataFrame or BarArrays with OHLCV data
+        length: Bars to include (default: all)
+
+    Returns:
+        Hex digest of the dates and OHLCV values
+    """
+    bars = as_bars(df)
+    arrays = _identity_arrays(bars)
+    hashers = [hashlib.blake2b(digest_size=16) for _ in arrays]
+    stop = len(bars) if length is None else length
+    return _digest(_update_hashers(hashers, arrays, 0, stop), bars)
+
+
+@dataclass
+class CacheEntry:
+    """Scan of one series, with what is needed to extend it"""
+    length: int
+    fingerprint: str
+    result: ScanResult
+    states: IndicatorStates
+    tail: Dict[str, np.ndarray]  # Last values of INDICATORS
+
+
+class ScanCache:
+    """
+    ScanPipeline results cached per (symbol, timeframe, config, fingerprint)
+
+    When a series is scanned again and its first bars are unchanged (same
+    fingerprint as the cached scan), only a tail window is rescanned: the
+    last bars whose setups could still change (the longest decision lag of
+    the enabled patterns) plus the new bars, with the longest rule
+    lookback before them as history. EMA, MACD and VWAP, which depend on
+    the whole history, are carried as running state like LiveScanner does.
+    Cached setups before the window are kept, so the merged result is
+    exactly what a full ScanPipeline scan of the new series returns.
+
+    Any other change (revised or removed bars, different config) falls
+    back to a full scan.
+    """
+
+    def __init__(self, patterns: Optional[List[str]] = None,
+                 scanners: Optional[Dict[str, object]] = None,
+                 max_entries: int = 256):
+        """
+        Initialize cache
+
+        Args:
+            patterns: Patterns to scan (default: all of PATTERNS)
+            scanners: Optional scanner instances by pattern name
+            max_entries: Series kept; the least recently scanned is dropped
+        """
+        self.windows = WindowScanner(patterns, scanners)
+        self.pipeline = self.windows.pipeline
+        self.patterns = self.windows.patterns
+        self.scanners = self.windows.scanners
+        self.max_entries = max_entries
+
+        self.config = tuple((pattern, scanner_config(self.scanners[pattern]))
+                            for pattern in self.patterns)
+        self.lag = self.windows.lag
+        self.lookback = self.windows.lookback
+
+        # (symbol, timeframe, config) -> entry holding the fingerprint it was scanned with
+        self._entries: 'OrderedDict[tuple, CacheEntry]' = OrderedDict()
+        self.hits = 0
+        self.tail_scans = 0
+        self.full_scans = 0
+
+    def key(self, symbol: str, timeframe: str, df: BarData) -> tuple:
+        """Full cache key of a series: (symbol, timeframe, config, fingerprint)"""
+        return (symbol, timeframe, self.config, bar_fingerprint(df))
+
+    def scan(self, df: BarData, symbol: str, timeframe: str = 'daily') -> ScanResult:
+        """
+        Scan a series, reusing the cached scan of its unchanged bars
+
+        Args:
+            df: DataFrame or BarArrays with OHLCV data, oldest bar first
+            symbol: Symbol the bars belong to
+            timeframe: Timeframe of the bars
+
+        Returns:
+            ScanResult identical to ScanPipeline.scan(df, timeframe)
+        """
+        bars = as_bars(df)
+        n = len(bars)
+        slot = (symbol, timeframe, self.config)
+        entry = self._entries.get(slot)
+
+        arrays = _identity_arrays(bars)
+        hashers = [hashlib.blake2b(digest_size=16) for _ in arrays]
+
+        reusable = entry is not None and entry.length <= n
+        if reusable:
+            _update_hashers(hashers, arrays, 0, entry.length)
+            reusable = _digest(hashers, bars) == entry.fingerprint
+
+        if reusable and entry.length == n:
+            self.hits += 1
+            self._entries.move_to_end(slot)
+            return self._copy(entry.result)
+
+        # Too little history for a tail window: a full scan is just as cheap
+        if reusable and entry.length >= self.lookback + self.lag + 100:
+            _update_hashers(hashers, arrays, entry.length, n)
+            entry = self._extend(entry, bars, timeframe, _digest(hashers, bars))
+            self.tail_scans += 1
+        else:
+            entry = self._full_scan(bars, timeframe, bar_fingerprint(bars))
+            self.full_scans += 1
+
+        self._entries[slot] = entry
+        self._entries.move_to_end(slot)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return self._copy(entry.result)
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """Drop cached scans (of one symbol, or all)"""
+        for slot in [s for s in self._entries if symbol is None or s[0] == symbol]:
+            del self._entries[slot]
+
+    def _full_scan(self, bars: BarArrays, timeframe: str, fingerprint: str) -> CacheEntry:
+        """Scan every bar and record the running indicator state at the end"""
+        result = self.pipeline.scan(bars, timeframe)
+        values = history_indicators(bars)
+
+        keep = self.lookback + self.lag
+        return CacheEntry(
+            length=len(bars),
+            fingerprint=fingerprint,
+            result=result,
+            states=IndicatorStates.from_history(bars, values),
+            tail={name: values[name][-keep:].copy() for name in INDICATORS},
+        )
+
+    def _extend(self, entry: CacheEntry, bars: BarArrays, timeframe: str,
+                fingerprint: str) -> CacheEntry:
+        """Rescan the tail window of a series that grew since entry was cached"""
+        old, n = entry.length, len(bars)
+        start = old - self.lag            # First bar whose setups may change
+        first = start - self.lookback     # First bar of the tail window
+        window = bars[first:n]
+
+        # Carry the running indicators over the new bars (a copy keeps entry intact)
+        states = copy.deepcopy(entry.states)
+        new = states.advance(bars[old:n])
+        values = {name: np.concatenate([entry.tail[name], new[name]]) for name in INDICATORS}
+
+        found = self.windows.scan(window, start - first, len(window), timeframe,
+                                  values, offset=first)
+
+        # Cached setups on bars before the window's decidable range are final
+        redone = set(bars.dates[start:old])
+        kept = {pattern: [setup for setup in setups if setup.date not in redone]
+                for pattern, setups in entry.result.setups.items()}
+        result = ScanResult(timeframe, WindowScanner.merge([kept, found]))
+
+        keep = self.lookback + self.lag
+        return CacheEntry(
+            length=n,
+            fingerprint=fingerprint,
+            result=result,
+            states=states,
+            tail={name: values[name][-keep:].copy() for name in INDICATORS},
+        )
+
+    @staticmethod
+    def _copy(result: ScanResult) -> ScanResult:
+        """ScanResult with its own setup lists (the cached lists stay untouched)"""
+        return ScanResult(result.timeframe, {p: list(s) for p, s in result.setups.items()})
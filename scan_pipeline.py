@@ -0,0 +1,299 @@
+"""
+Fused scan pipeline - every pattern on one DataFrame with shared features
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from bar_arrays import BarArrays, BarData, as_bars
+from dedup import DEFAULT_RANKING, deduplicate_setups
+from ici_scanner import ICIScanner
+from pattern_scanners import MomentumScanner, WMScanner, HarmonicScanner
+from fous_scanners import GoldScanner
+from fous_validators import FOUSFeatures
+from indicators import IndicatorContext
+from setup_table import SetupTable
+from timeframe_index import TimeframeIndex, confirm_entries
+
+
+# Patterns whose entries can be confirmed on a lower timeframe
+ENTRY_PATTERNS = ('Momentum', 'WM', 'Harmonic')
+
+# Pattern names in reporting order
+PATTERNS = ('ICI', 'Momentum', 'WM', 'Harmonic', 'Force', 'Survival', 'Revival', 'Gold')
+
+ICI_PATTERNS = ('ICI', 'Momentum', 'WM', 'Harmonic')
+FOUS_PATTERNS = ('Force', 'Survival', 'Revival', 'Gold')
+
+# Patterns Gold pairs, with the GoldScanner attributes holding their scanners
+GOLD_COMPONENTS = {'Force': 'force_scanner', 'Survival': 'survival_scanner',
+                   'Revival': 'revival_scanner'}
+
+
+def gold_key(pattern: str) -> str:
+    """Result key of a Gold component run by Gold's own scanner"""
+    return f'Gold {pattern}'
+
+
+@dataclass
+class ScanResult:
+    """Setups found on one DataFrame, grouped by pattern"""
+    timeframe: str
+    setups: Dict[str, list] = field(default_factory=dict)
+
+    def __getitem__(self, pattern: str) -> list:
+        return self.setups.get(pattern, [])
+
+    def all_setups(self) -> list:
+        """All setups, in PATTERNS order"""
+        return [s for pattern in PATTERNS for s in self.setups.get(pattern, [])]
+
+    def valid_setups(self) -> list:
+        """Setups that passed every validation"""
+        return [s for s in self.all_setups() if s.valid]
+
+    def deduplicate(self, by='day', per: Sequence[str] = (),
+                    ranking: Sequence[Tuple[str, bool]] = DEFAULT_RANKING) -> 'ScanResult':
+        """
+        Best setup per time bucket within each pattern
+
+        Args:
+            by: 'day', 'bar' or a fixed window such as '4h' (see dedup.time_keys)
+            per: Fields that further split groups, e.g. ('direction',)
+            ranking: (field, higher_is_better) pairs, most important first
+
+        Returns:
+            New ScanResult with deduplicated setups
+        """
+        return ScanResult(self.timeframe, {
+            pattern: deduplicate_setups(found, by, per, ranking)
+            for pattern, found in self.setups.items()
+        })
+
+    def to_table(self) -> SetupTable:
+        """All setups as a columnar SetupTable, in PATTERNS order"""
+        return SetupTable.from_setups(self.all_setups())
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Total and valid setup counts per pattern"""
+        return {
+            pattern: {'total': len(found), 'valid': sum(1 for s in found if s.valid)}
+            for pattern, found in self.setups.items()
+        }
+
+
+class ScanPipeline:
+    """
+    Run several pattern scanners over one DataFrame
+
+    Indicators (EMA/MACD context, FOUS features, W/M pivots) are built once
+    and shared. ICI, Momentum, Force, Survival and Revival are vectorized;
+    W/M and Harmonic share one pivot set and only check the bars their
+    pivot prefilter keeps, and Gold is assembled from the component
+    results instead of rescanning them. Every pattern returns exactly what
+    its scanner's scan() would return on the same DataFrame.
+    """
+
+    def __init__(self, patterns: Optional[List[str]] = None,
+                 scanners: Optional[Dict[str, object]] = None):
+        """
+        Initialize pipeline
+
+        Args:
+            patterns: Patterns to scan (default: all of PATTERNS)
+            scanners: Optional scanner instances by pattern name, replacing
+                the default-configured ones
+        """
+        self.patterns = list(PATTERNS) if patterns is None else list(patterns)
+
+        unknown = [p for p in self.patterns if p not in PATTERNS]
+        if unknown:
+            raise ValueError(f"Unknown patterns: {unknown}")
+
+        scanners = scanners or {}
+        gold_scanner = scanners.get('Gold', GoldScanner())
+
+        # Force/Survival/Revival default to Gold's components so Gold can reuse their results
+        self.gold_components = {pattern: getattr(gold_scanner, attribute)
+                                for pattern, attribute in GOLD_COMPONENTS.items()}
+        self.scanners = {
+            'ICI': scanners.get('ICI', ICIScanner()),
+            'Momentum': scanners.get('Momentum', MomentumScanner()),
+            'WM': scanners.get('WM', WMScanner()),
+            'Harmonic': scanners.get('Harmonic', HarmonicScanner()),
+            'Force': scanners.get('Force', self.gold_components['Force']),
+            'Survival': scanners.get('Survival', self.gold_components['Survival']),
+            'Revival': scanners.get('Revival', self.gold_components['Revival']),
+            'Gold': gold_scanner,
+        }
+
+    def fous_scanners(self, enabled) -> Dict[str, object]:
+        """
+        FOUS component scanners a scan of the enabled patterns runs
+
+        Gold pairs the results of its own component scanners. These are the
+        reported Force/Survival/Revival scanners unless those were replaced,
+        in which case Gold's are run as well, under gold_key(pattern).
+
+        Args:
+            enabled: Enabled pattern names
+
+        Returns:
+            Dict of scanner by result key, in Force/Survival/Revival order
+        """
+        scanners = {pattern: self.scanners[pattern]
+                    for pattern in GOLD_COMPONENTS if pattern in enabled}
+        if 'Gold' in enabled:
+            for pattern, scanner in self.gold_components.items():
+                if scanners.get(pattern) is not scanner:
+                    scanners[gold_key(pattern)] = scanner
+        return scanners
+
+    @staticmethod
+    def gold_inputs(found: Dict[str, list]) -> List[list]:
+        """
+        Force, Survival and Revival setups for GoldScanner.combine
+
+        Args:
+            found: Setup lists by the keys of fous_scanners()
+
+        Returns:
+            The three component setup lists Gold's own scanners found
+        """
+        return [found[gold_key(pattern)] if gold_key(pattern) in found else found[pattern]
+                for pattern in GOLD_COMPONENTS]
+
+    def scan(self, df: BarData, timeframe: str = 'daily',
+             entry_frames: Optional[Dict[str, BarData]] = None) -> ScanResult:
+        """
+        Scan all enabled patterns
+
+        Args:
+            df: DataFrame or BarArrays with OHLCV data (a DataFrame is
+                converted to BarArrays once, for every scanner)
+            timeframe: Timeframe being scanned
+            entry_frames: Optional lower-timeframe bars by pattern (Momentum,
+                WM, Harmonic) to confirm entries on; patterns given the same
+                frame share one alignment index
+
+        Returns:
+            ScanResult with one list of setups per enabled pattern
+        """
+        df = as_bars(df)
+        enabled = set(self.patterns)
+        result = ScanResult(timeframe=timeframe)
+
+        for scanner in [*self.scanners.values(), *self.gold_components.values()]:
+            if hasattr(scanner, 'stage_counts'):
+                scanner.stage_counts.reset()
+
+        context = None
+        if enabled & set(ICI_PATTERNS):
+            context = IndicatorContext.from_frame(df)
+
+        # Vectorized scanners
+        for pattern in ('ICI', 'Momentum'):
+            if pattern in enabled:
+                result.setups[pattern] = self.scanners[pattern].scan(df, timeframe, context)
+
+        # Gold needs all three components, even if they are not reported
+        fous = self.fous_scanners(enabled if len(df) >= 100 else enabled - {'Gold'})
+        wm = [p for p in ('WM', 'Harmonic')
+              if p in enabled and len(df) >= self.scanners[p].lookback_period]
+
+        found = self._scan_bars(df, timeframe, context, wm, fous)
+
+        for pattern in ('WM', 'Harmonic'):
+            if pattern in enabled:
+                result.setups[pattern] = found.get(pattern, [])
+        for setup in found.get('Harmonic', []):
+            setup.pattern_type = 'Harmonic'
+
+        for pattern in ('Force', 'Survival', 'Revival'):
+            if pattern in enabled:
+                result.setups[pattern] = found.get(pattern, [])
+
+        if 'Gold' in enabled:
+            result.setups['Gold'] = []
+            if len(df) >= 100:
+                result.setups['Gold'] = self.scanners['Gold'].combine(
+                    *self.gold_inputs(found), timeframe, found['features'])
+
+        self._confirm_entries(result, df, entry_frames or {})
+
+        # Keep the reporting order independent of evaluation order
+        result.setups = {p: result.setups[p] for p in PATTERNS if p in result.setups}
+        return result
+
+    @staticmethod
+    def _confirm_entries(result: ScanResult, bars: BarArrays,
+                         entry_frames: Dict[str, BarData]) -> None:
+        """Validate entries of the ENTRY_PATTERNS on their lower-timeframe bars"""
+        unknown = [p for p in entry_frames if p not in ENTRY_PATTERNS]
+        if unknown:
+            raise ValueError(f"No lower-timeframe entry validation for: {unknown}")
+
+        indexes = {}
+        for pattern, frame in entry_frames.items():
+            if pattern not in result.setups:
+                continue
+            if id(frame) not in indexes:
+                lower = as_bars(frame)
+                indexes[id(frame)] = (lower, TimeframeIndex.from_bars(bars, lower))
+            lower, index = indexes[id(frame)]
+            confirm_entries(result.setups[pattern], bars, lower, index)
+
+    def stage_report(self) -> pd.DataFrame:
+        """
+        Bars removed by each filter stage during the last scan()
+
+        Returns:
+            DataFrame indexed by (pattern, stage); see StageCounter.to_frame
+        """
+        frames = {pattern: self.scanners[pattern].stage_counts.to_frame()
+                  for pattern in self.patterns
+                  if hasattr(self.scanners[pattern], 'stage_counts')}
+        if not frames:
+            return pd.DataFrame(columns=['removed', 'remaining', 'removed_pct'])
+        return pd.concat(frames, names=['pattern', 'stage'])
+
+    def _scan_bars(self, df: BarArrays, timeframe: str,
+                   context: Optional[IndicatorContext], wm: List[str],
+                   fous: Dict[str, object]) -> dict:
+        """
+        Evaluate the W/M family on shared pivots, plus the FOUS components
+
+        Args:
+            df: Bars to scan
+            timeframe: Timeframe being scanned
+            context: EMA/MACD context (needed when wm is not empty)
+            wm: W/M-family patterns to evaluate
+            fous: FOUS component scanners to evaluate, by result key (see
+                fous_scanners)
+
+        Returns:
+            Dict of setup lists by pattern or result key, plus 'features'
+            if FOUS ran
+        """
+        n = len(df)
+        found = {pattern: [] for pattern in [*wm, *fous]}
+
+        # FOUS scanners evaluate all their bars at once on the shared features
+        if fous and n >= 50:
+            features = FOUSFeatures(df)
+            found['features'] = features
+            for key, scanner in fous.items():
+                found[key] = scanner._scan_indices(
+                    df, np.arange(50, n - scanner.bars_ahead), timeframe, features)
+
+        if not wm:
+            return found
+
+        pivots = self.scanners[wm[0]]._find_pivots(df)
+        prices = WMScanner._price_arrays(df)
+
+        for pattern in wm:
+            found[pattern] = self.scanners[pattern]._scan_indices(
+                df, np.arange(50, n - 1), timeframe, context, pivots, prices)
+
+        return found
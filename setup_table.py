@@ -0,0 +1,337 @@
+"""
+Columnar setup table - many ICI/FOUS setups as one DataFrame
+"""
+from dataclasses import fields
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from dedup import DEFAULT_RANKING, best_rows
+from ici_scanner import ICISetup
+from fous_scanners import FOUSSetup
+
+
+# Setup dataclass per kind, and the fields each one has
+SETUP_TYPES = {'ICI': ICISetup, 'FOUS': FOUSSetup}
+SETUP_FIELDS = {kind: [f.name for f in fields(cls)] for kind, cls in SETUP_TYPES.items()}
+
+# CSV columns of ICISetup.to_dict / FOUSSetup.to_dict: (column, field, decimals)
+EXPORT_COLUMNS = {
+    'ICI': [('Date', 'date', None), ('Pattern', 'pattern_type', None),
+            ('Timeframe', 'timeframe', None), ('Direction', 'direction', None),
+            ('Entry', 'entry', 2), ('Stop', 'stop', 2), ('Target', 'target', 2),
+            ('Correction_Pct', 'correction_pct', 3), ('Risk_Reward', 'risk_reward', 2),
+            ('EMA_Aligned', 'ema_aligned', None), ('MACD_Aligned', 'macd_aligned', None),
+            ('Valid', 'valid', None)],
+    'FOUS': [('Date', 'date', None), ('Pattern', 'pattern_type', None),
+             ('Timeframe', 'timeframe', None), ('Entry', 'entry', 2), ('Stop', 'stop', 2),
+             ('Target', 'target', 2), ('Risk_Reward', 'risk_reward', 2),
+             ('Volume_Spike', 'volume_spike', None), ('RSI', 'rsi', 1),
+             ('EMA_Aligned', 'ema_aligned', None), ('VWAP_Bullish', 'vwap_bullish', None),
+             ('Valid', 'valid', None), ('Notes', 'notes', None)],
+}
+
+
+class SetupView:
+    """
+    Lazy row of a SetupTable
+
+    Reads (and writes) the table's columns on attribute access, so code
+    written for ICISetup/FOUSSetup keeps working without a dataclass
+    being built for every row.
+    """
+
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table: 'SetupTable', row: int):
+        object.__setattr__(self, '_table', table)
+        object.__setattr__(self, '_row', row)
+
+    @property
+    def kind(self) -> str:
+        return self._table.frame['kind'].iat[self._row]
+
+    def __getattr__(self, name: str):
+        if name in SETUP_FIELDS[self.kind]:
+            return self._table.frame[name].iat[self._row]
+        raise AttributeError(f"{SETUP_TYPES[self.kind].__name__} row has no attribute '{name}'")
+
+    def __setattr__(self, name: str, value) -> None:
+        if name not in SETUP_FIELDS[self.kind]:
+            raise AttributeError(f"{SETUP_TYPES[self.kind].__name__} row has no attribute '{name}'")
+        frame = self._table.frame
+        frame.iloc[self._row, frame.columns.get_loc(name)] = value
+
+    def __repr__(self) -> str:
+        return f"SetupView({self.to_setup()!r})"
+
+    def to_setup(self):
+        """Materialize the row as its ICISetup/FOUSSetup dataclass"""
+        kind = self.kind
+        return SETUP_TYPES[kind](**{name: getattr(self, name) for name in SETUP_FIELDS[kind]})
+
+    def to_dict(self) -> dict:
+        """Same as the dataclass to_dict()"""
+        return self.to_setup().to_dict()
+
+
+class SetupTable:
+    """
+    Setups stored column-wise
+
+    One row per setup, one column per ICISetup/FOUSSetup field plus
+    'kind' ('ICI' or 'FOUS'). Filtering, sorting, deduplication and
+    export work on whole columns; iterating yields SetupView rows that
+    behave like the original dataclasses.
+    """
+
+    def __init__(self, frame: Optional[pd.DataFrame] = None):
+        """
+        Wrap a setup DataFrame
+
+        Args:
+            frame: DataFrame with a 'kind' column and setup field columns
+        """
+        if frame is None:
+            frame = pd.DataFrame({'kind': pd.Series([], dtype=object)})
+        self.frame = frame.reset_index(drop=True)
+
+    @classmethod
+    def from_setups(cls, setups: Iterable) -> 'SetupTable':
+        """
+        Build a table from setup dataclasses (or rows of another table)
+
+        Args:
+            setups: ICISetup/FOUSSetup objects or SetupView rows
+
+        Returns:
+            SetupTable in the same order
+        """
+        setups = list(setups)
+        if setups and all(isinstance(s, SetupView) for s in setups):
+            tables = {id(s._table): s._table for s in setups}
+            if len(tables) == 1:
+                table = next(iter(tables.values()))
+                return cls(table.frame.iloc[[s._row for s in setups]])
+
+        records = []
+        kinds = []
+        for setup in setups:
+            if isinstance(setup, SetupView):
+                kinds.append(setup.kind)
+                setup = setup.to_setup()
+            else:
+                kinds.append('FOUS' if isinstance(setup, FOUSSetup) else 'ICI')
+            records.append(vars(setup))
+
+        frame = pd.DataFrame.from_records(records)
+        # A field that is None on every row having it would otherwise collapse to NaN
+        for name in frame.columns[frame.isna().all()]:
+            values = [record.get(name, np.nan) for record in records]
+            if any(value is None for value in values):
+                frame[name] = pd.Series(values, dtype=object)
+        frame.insert(0, 'kind', pd.Series(kinds, dtype=object))
+        return cls(frame)
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Iterable], kind: str = 'ICI') -> 'SetupTable':
+        """
+        Build a table directly from field arrays (no dataclasses)
+
+        Args:
+            columns: Array per setup field
+            kind: 'ICI' or 'FOUS'
+
+        Returns:
+            SetupTable
+        """
+        if kind not in SETUP_TYPES:
+            raise ValueError(f"Unknown setup kind: {kind}")
+        frame = pd.DataFrame({name: columns[name] for name in SETUP_FIELDS[kind]
+                              if name in columns})
+        frame.insert(0, 'kind', kind)
+        return cls(frame)
+
+    @classmethod
+    def concat(cls, tables: Iterable['SetupTable']) -> 'SetupTable':
+        """Stack tables in order"""
+        frames = [table.frame for table in tables if len(table)]
+        if not frames:
+            return cls()
+        return cls(pd.concat(frames, ignore_index=True))
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __iter__(self):
+        return (SetupView(self, row) for row in range(len(self)))
+
+    def __getitem__(self, row: int) -> SetupView:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("SetupTable row out of range")
+        return SetupView(self, row)
+
+    def to_setups(self) -> list:
+        """Materialize every row as its dataclass"""
+        return [row.to_setup() for row in self]
+
+    def column(self, name: str, default=np.nan) -> pd.Series:
+        """A field column, filled with default where the table lacks it"""
+        if name in self.frame.columns:
+            return self.frame[name]
+        return pd.Series(default, index=self.frame.index)
+
+    def is_bullish(self) -> np.ndarray:
+        """Direction per row (FOUS setups are long-only)"""
+        bullish = self.column('is_bullish', True)
+        return bullish.where(self.frame['kind'] == 'ICI', True).astype(bool).to_numpy()
+
+    def directions(self) -> np.ndarray:
+        """'LONG' or 'SHORT' per row"""
+        return np.where(self.is_bullish(), 'LONG', 'SHORT')
+
+    def mask(self, valid: Optional[bool] = None, pattern=None,
+             direction: Optional[str] = None, timeframe=None) -> np.ndarray:
+        """
+        Boolean row mask for the given criteria
+
+        Args:
+            valid: Keep only valid (True) or invalid (False) setups
+            pattern: Pattern type or list of pattern types
+            direction: 'long' or 'short'
+            timeframe: Timeframe or list of timeframes
+
+        Returns:
+            Boolean array
+        """
+        keep = np.ones(len(self), dtype=bool)
+        if valid is not None:
+            keep &= self.frame['valid'].to_numpy(dtype=bool) == valid
+        if pattern is not None:
+            patterns = [pattern] if isinstance(pattern, str) else list(pattern)
+            keep &= self.frame['pattern_type'].isin(patterns).to_numpy()
+        if direction is not None:
+            if direction not in ('long', 'short'):
+                raise ValueError("direction must be 'long' or 'short'")
+            keep &= self.is_bullish() == (direction == 'long')
+        if timeframe is not None:
+            timeframes = [timeframe] if isinstance(timeframe, str) else list(timeframe)
+            keep &= self.frame['timeframe'].isin(timeframes).to_numpy()
+        return keep
+
+    def filter(self, valid: Optional[bool] = None, pattern=None,
+               direction: Optional[str] = None, timeframe=None) -> 'SetupTable':
+        """Rows matching every given criterion (see mask())"""
+        return self.take(np.flatnonzero(self.mask(valid, pattern, direction, timeframe)))
+
+    def take(self, rows) -> 'SetupTable':
+        """Rows at the given positions"""
+        return SetupTable(self.frame.iloc[np.asarray(rows, dtype=np.int64)])
+
+    def sort(self, by='risk_reward', ascending=False) -> 'SetupTable':
+        """
+        Stable sort by one or more fields (NaN last)
+
+        Args:
+            by: Field name or list of field names
+            ascending: Sort direction (or one per field)
+
+        Returns:
+            Sorted SetupTable
+        """
+        return SetupTable(self.frame.sort_values(by, ascending=ascending,
+                                                 kind='mergesort', na_position='last'))
+
+    def deduplicate(self, by='day', per: Sequence[str] = (),
+                    ranking: Sequence[Tuple[str, bool]] = DEFAULT_RANKING) -> 'SetupTable':
+        """
+        Best setup per calendar day (or other time bucket)
+
+        Same rule as ICIScanner.deduplicate_setups: valid setups win, then
+        the highest R:R; the first setup wins ties and groups keep the
+        order in which they first appear.
+
+        Args:
+            by: 'day', 'bar' or a fixed window such as '4h' (see dedup.time_keys)
+            per: Columns that split groups, e.g. ('pattern_type', 'direction');
+                'kind' and 'direction' are available too
+            ranking: (field, higher_is_better) pairs, most important first
+
+        Returns:
+            Deduplicated SetupTable
+        """
+        if not len(self):
+            return SetupTable(self.frame)
+
+        columns = {name: self.frame[name].to_numpy()
+                   for name in dict.fromkeys(['date'] + list(per) + [n for n, _ in ranking])
+                   if name != 'direction'}
+        if 'direction' in per:
+            columns['direction'] = self.directions()
+        return self.take(best_rows(columns, by, per, ranking))
+
+    def counts(self, by: str = 'pattern_type') -> pd.DataFrame:
+        """Total and valid setups per value of a field, in order of appearance"""
+        grouped = self.frame.groupby(by, sort=False)['valid']
+        return pd.DataFrame({'total': grouped.size(), 'valid': grouped.sum().astype(int)})
+
+    def to_frame(self, columns: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """
+        Export-ready DataFrame
+
+        Args:
+            columns: Optional field -> column name mapping for raw values
+                ('direction' gives LONG/SHORT). By default the columns and
+                rounding of the dataclasses' to_dict() are used.
+
+        Returns:
+            DataFrame with one row per setup
+        """
+        if columns is not None:
+            return pd.DataFrame({
+                header: (self.directions() if name == 'direction'
+                         else self.column(name).to_numpy())
+                for name, header in columns.items()
+            })
+
+        # One block per kind, then back to row order (columns in order of first use)
+        parts = []
+        for kind in pd.unique(self.frame['kind']):
+            rows = np.flatnonzero((self.frame['kind'] == kind).to_numpy())
+            block = self.frame.iloc[rows]
+            part = {}
+            for header, name, decimals in EXPORT_COLUMNS[kind]:
+                if name == 'direction':
+                    part[header] = self.directions()[rows]
+                elif decimals is not None:
+                    part[header] = block[name].astype(float).round(decimals).to_numpy()
+                else:
+                    part[header] = block[name].to_numpy()
+            if 'RSI' in part:
+                # to_dict() reports a zero RSI as missing
+                part['RSI'] = np.where(part['RSI'] != 0, part['RSI'], np.nan)
+            parts.append(pd.DataFrame(part, index=rows))
+
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat(parts).sort_index().reset_index(drop=True)
+
+    def to_csv(self, filename: str, sort_by: Optional[str] = 'Date', **kwargs) -> None:
+        """Write the export frame to CSV, sorted by an export column"""
+        frame = self.to_frame()
+        if sort_by is not None and len(frame):
+            frame.sort_values(sort_by, inplace=True)
+        frame.to_csv(filename, index=False, **kwargs)
+
+    def to_parquet(self, filename: str, sort_by: Optional[str] = 'Date', **kwargs) -> None:
+        """Write the export frame to Parquet (needs pyarrow or fastparquet)"""
+        frame = self.to_frame()
+        if sort_by is not None and len(frame):
+            frame.sort_values(sort_by, inplace=True)
+        frame.to_parquet(filename, index=False, **kwargs)
+
+
+def as_table(setups) -> SetupTable:
+    """A SetupTable for either a table or a list of setups"""
+    return setups if isinstance(setups, SetupTable) else SetupTable.from_setups(setups)
@@ -0,0 +1,78 @@
+"""
+Stage counters - how many bars each filter of a scanner removes
+"""
+from typing import Dict
+import numpy as np
+import pandas as pd
+
+
+class StageCounter:
+    """
+    Bars removed by each stage of a scanner's filter chain
+
+    Kernels call start() with the bars they evaluate and apply() for each
+    filter, which also compacts the arrays to the surviving bars so later
+    (more expensive) stages only see candidates. Counts accumulate until
+    reset(); a scan over both directions reports their sum.
+    """
+
+    def __init__(self):
+        self.evaluated = 0
+        self.removed: Dict[str, int] = {}
+
+    def reset(self) -> None:
+        """Clear all counts"""
+        self.evaluated = 0
+        self.removed = {}
+
+    def start(self, bars: int) -> None:
+        """Record bars entering the filter chain"""
+        self.evaluated += int(bars)
+
+    def record(self, stage: str, removed: int) -> None:
+        """Add bars removed by a stage"""
+        self.removed[stage] = self.removed.get(stage, 0) + int(removed)
+
+    def apply(self, stage: str, keep: np.ndarray, *arrays: np.ndarray):
+        """
+        Filter bar-aligned arrays by a stage's mask
+
+        Args:
+            stage: Stage name
+            keep: Boolean mask of the bars that pass
+            *arrays: Arrays aligned with keep
+
+        Returns:
+            The filtered array, or a tuple of them if several were given
+        """
+        keep = np.asarray(keep, dtype=bool)
+        self.record(stage, len(keep) - np.count_nonzero(keep))
+        filtered = tuple(np.asarray(array)[keep] for array in arrays)
+        return filtered[0] if len(filtered) == 1 else filtered
+
+    @property
+    def passed(self) -> int:
+        """Bars that passed every stage"""
+        return self.evaluated - sum(self.removed.values())
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Selectivity per stage
+
+        Returns:
+            DataFrame indexed by stage with bars removed, bars remaining
+            after the stage, and the share of incoming bars removed (%)
+        """
+        removed = pd.Series(self.removed, dtype=np.int64)
+        remaining = self.evaluated - removed.cumsum()
+        incoming = remaining + removed
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.where(incoming > 0, removed / incoming * 100, 0.0)
+        return pd.DataFrame({'removed': removed, 'remaining': remaining,
+                             'removed_pct': pct}, index=removed.index)
+
+    def __repr__(self) -> str:
+        parts = [f"evaluated={self.evaluated}"]
+        parts += [f"{stage}=-{count}" for stage, count in self.removed.items()]
+        parts.append(f"passed={self.passed}")
+        return f"StageCounter({', '.join(parts)})"
@@ -0,0 +1,131 @@
+"""
+Streaming scanner - scan bar files chunk by chunk in constant memory
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from bar_arrays import BarArrays, BarData, as_bars
+from data_loader import DataLoader
+from window_scan import INDICATORS, IndicatorStates, WindowScanner, history_indicators
+
+
+class StreamingScanner:
+    """
+    Scan a series that arrives in chunks, emitting setups as they become final
+
+    Only the bars of the current chunk plus the longest rule lookback and
+    decision lag of the enabled patterns are held in memory, together
+    with the running EMA, MACD and VWAP state (the only rules that depend
+    on the whole history). A setup is emitted once no later bar can
+    change it, so memory stays constant however long the series is.
+
+    Collected per pattern, the emitted setups are exactly ScanPipeline's
+    setups for the whole series (Gold setups come in GoldScanner.combine's
+    order within each chunk rather than across the series).
+    """
+
+    def __init__(self, patterns: Optional[List[str]] = None,
+                 scanners: Optional[Dict[str, object]] = None,
+                 chunk_size: int = 100_000):
+        """
+        Initialize streaming scanner
+
+        Args:
+            patterns: Patterns to scan (default: all of PATTERNS)
+            scanners: Optional scanner instances by pattern name
+            chunk_size: Rows read per chunk by scan_csv
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+
+        self.windows = WindowScanner(patterns, scanners)
+        self.patterns = self.windows.patterns
+        self.chunk_size = chunk_size
+
+    def scan_csv(self, filepath: str, timeframe: str = 'daily',
+                 date_column: str = 'Date',
+                 parse_dates: bool = True) -> Iterator[Tuple[str, object]]:
+        """
+        Scan a CSV file of bars without loading it whole
+
+        Args:
+            filepath: Path to CSV file (bars oldest first)
+            timeframe: Timeframe of the bars
+            date_column: Name of date column
+            parse_dates: Whether to parse dates
+
+        Yields:
+            (pattern, setup) pairs in chunk order
+        """
+        chunks = DataLoader.iter_csv_chunks(filepath, self.chunk_size, date_column, parse_dates)
+        yield from self.scan_chunks(chunks, timeframe)
+
+    def scan_chunks(self, chunks: Iterable[BarData],
+                    timeframe: str = 'daily') -> Iterator[Tuple[str, object]]:
+        """
+        Scan consecutive chunks of one series
+
+        Args:
+            chunks: DataFrames or BarArrays with OHLCV data, in date order
+            timeframe: Timeframe of the bars
+
+        Yields:
+            (pattern, setup) pairs in chunk order
+        """
+        windows = self.windows
+        # Bars needed before the first window (below this the scanners'
+        # length limits differ from the whole series')
+        warmup = windows.lookback + windows.lag + 100
+
+        pending: List[BarArrays] = []   # Bars read before the first window
+        buffer: Optional[BarArrays] = None
+        values: Dict[str, np.ndarray] = {}
+        states: Optional[IndicatorStates] = None
+        offset = 0       # Series position of buffer's first bar
+        evaluated = 0    # Series position of the first bar not yet emitted
+
+        for chunk in chunks:
+            bars = as_bars(chunk)
+            if len(bars) == 0:
+                continue
+
+            if states is None:
+                pending.append(bars)
+                if sum(len(part) for part in pending) < warmup:
+                    continue
+                buffer = BarArrays.concat(pending)
+                pending = []
+                values = history_indicators(buffer)
+                states = IndicatorStates.from_history(buffer, values)
+            else:
+                new = states.advance(bars)
+                buffer = BarArrays.concat([buffer, bars])
+                values = {name: np.concatenate([values[name], new[name]]) for name in INDICATORS}
+
+            # Bars at least `lag` bars before the end are final
+            stop = offset + len(buffer) - windows.lag
+            yield from self._emit(windows.scan(buffer, evaluated - offset, stop - offset,
+                                               timeframe, values, offset=offset))
+            evaluated = stop
+
+            # Keep only the history the next window needs
+            first = max(offset, evaluated - windows.lookback)
+            buffer = buffer[first - offset:]
+            values = {name: array[first - offset:] for name, array in values.items()}
+            offset = first
+
+        if states is None:
+            # The whole series fits the warm-up: scan it in one pass
+            if pending:
+                result = windows.pipeline.scan(BarArrays.concat(pending), timeframe)
+                yield from self._emit(result.setups)
+            return
+
+        # The last bars are decided as the end of the series
+        yield from self._emit(windows.scan(buffer, evaluated - offset, len(buffer),
+                                           timeframe, values, offset=offset))
+
+    def _emit(self, found: Dict[str, list]) -> Iterator[Tuple[str, object]]:
+        """(pattern, setup) pairs of one window, in pattern order"""
+        for pattern in self.patterns:
+            for setup in found.get(pattern, []):
+                yield pattern, setup
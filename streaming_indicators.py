@@ -0,0 +1,508 @@
+"""
+Streaming indicators - O(1) per-bar state matching the batch indicator functions
+"""
+from collections import deque
+from typing import Optional, Tuple
+import math
+import numpy as np
+import pandas as pd
+
+
+class EMAState:
+    """
+    Running EMA, identical to Series.ewm(span=span, adjust=False).mean()
+
+    Follows pandas' recursion exactly (including NaN inputs), so the value
+    after each update equals the batch EMA at that bar.
+    """
+
+    def __init__(self, span: int):
+        self.alpha = 2.0 / (span + 1)
+        self.value = np.nan
+        self._old_weight = 1.0
+
+    @classmethod
+    def from_history(cls, span: int, prices: np.ndarray, ema: np.ndarray) -> 'EMAState':
+        """
+        State after a history whose batch EMA is already known
+
+        Args:
+            span: EMA span
+            prices: Prices of the history
+            ema: Batch EMA of prices (same span, adjust=False)
+
+        Returns:
+            EMAState that continues exactly where the batch EMA ends
+        """
+        state = cls(span)
+        if len(prices) == 0 or np.isnan(ema[-1]):
+            return state
+
+        state.value = ema[-1]
+        # Weight decays once per NaN price after the last valid one
+        last_valid = np.flatnonzero(~np.isnan(prices))[-1]
+        for _ in range(len(prices) - 1 - last_valid):
+            state._old_weight *= 1 - state.alpha
+        return state
+
+    def update(self, price: float) -> float:
+        """Add one price and return the EMA at that bar"""
+        if np.isnan(self.value):
+            if not np.isnan(price):
+                self.value = price
+                self._old_weight = 1.0
+            return self.value
+
+        self._old_weight *= 1 - self.alpha
+        if not np.isnan(price):
+            if self.value != price:
+                self.value = ((self._old_weight * self.value + self.alpha * price) /
+                              (self._old_weight + self.alpha))
+            self._old_weight = 1.0
+        return self.value
+
+    def advance(self, prices: np.ndarray) -> np.ndarray:
+        """
+        Add many prices at once
+
+        Args:
+            prices: Prices following the ones already added
+
+        Returns:
+            EMA at each of the prices (same values as repeated update())
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        if len(prices) == 0:
+            return np.empty(0)
+        if np.isnan(self.value) or self._old_weight != 1.0:
+            # pandas cannot be seeded with a decayed weight; replay instead
+            return np.array([self.update(price) for price in prices])
+
+        # Seeded with the current value, pandas runs the same recursion
+        ema = pd.Series(np.concatenate([[self.value], prices])).ewm(
+            alpha=self.alpha, adjust=False).mean().to_numpy()[1:]
+
+        self.value = ema[-1]
+        valid = np.flatnonzero(~np.isnan(prices))
+        trailing = len(prices) - 1 - valid[-1] if len(valid) else len(prices)
+        for _ in range(trailing):
+            self._old_weight *= 1 - self.alpha
+        return ema
+
+
+class VWAPState:
+    """Running cumulative VWAP, identical to FOUSValidator.calculate_vwap"""
+
+    def __init__(self):
+        self.price_volume = 0.0
+        self.volume = 0.0
+
+    @classmethod
+    def from_history(cls, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                     volume: np.ndarray) -> 'VWAPState':
+        """State after a history of bars, without replaying them one by one"""
+        state = cls()
+        price_volume = (high + low + close) / 3 * volume
+        if len(volume):
+            # Sequential sums skipping NaN, like the running update
+            state.price_volume = np.cumsum(np.where(np.isnan(price_volume), 0.0, price_volume))[-1]
+            state.volume = np.cumsum(np.where(np.isnan(volume), 0.0, volume))[-1]
+        return state
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        """Add one bar and return the VWAP at that bar"""
+        price_volume = (high + low + close) / 3 * volume
+
+        # cumsum skips NaN but reports NaN at that bar
+        if not np.isnan(price_volume):
+            self.price_volume += price_volume
+        if not np.isnan(volume):
+            self.volume += volume
+
+        if np.isnan(price_volume) or np.isnan(volume):
+            return np.nan
+        return self.price_volume / self.volume
+
+    def advance(self, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                volume: np.ndarray) -> np.ndarray:
+        """
+        Add many bars at once
+
+        Args:
+            high, low, close, volume: Bars following the ones already added
+
+        Returns:
+            VWAP at each bar (same values as repeated update())
+        """
+        price_volume = (high + low + close) / 3 * volume
+
+        # Sequential sums continuing from the state, NaN skipped but reported
+        sum_price_volume = np.cumsum(np.concatenate(
+            [[self.price_volume], np.where(np.isnan(price_volume), 0.0, price_volume)]))[1:]
+        sum_volume = np.cumsum(np.concatenate(
+            [[self.volume], np.where(np.isnan(volume), 0.0, volume)]))[1:]
+        if len(volume):
+            self.price_volume = sum_price_volume[-1]
+            self.volume = sum_volume[-1]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vwap = sum_price_volume / sum_volume
+        vwap[np.isnan(price_volume) | np.isnan(volume)] = np.nan
+        return vwap
+
+
+class MACDState:
+    """Running MACD, identical to EntryValidator.calculate_macd"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMAState(fast)
+        self.slow = EMAState(slow)
+        self.signal = EMAState(signal)
+
+    def update(self, price: float) -> Tuple[float, float, float]:
+        """
+        Add one price
+
+        Returns:
+            (macd_line, signal_line, histogram) at that bar
+        """
+        macd_line = self.fast.update(price) - self.slow.update(price)
+        signal_line = self.signal.update(macd_line)
+        return macd_line, signal_line, macd_line - signal_line
+
+
+class RollingMeanState:
+    """
+    Running Series.rolling(window).mean()
+
+    Follows pandas' online algorithm (Kahan-compensated add/remove, the
+    same-value and sign corrections), so every value equals the batch
+    rolling mean bit for bit.
+    """
+
+    def __init__(self, window: int, min_periods: Optional[int] = None):
+        if window < 1:
+            raise ValueError("window must be positive")
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self._values = deque()
+        self._nobs = 0
+        self._neg_ct = 0
+        self._sum = 0.0
+        self._add_compensation = 0.0
+        self._remove_compensation = 0.0
+        self._same_count = 0
+        self._prev_value = np.nan
+
+    def update(self, value: float) -> float:
+        """Add one value and return the mean of the window ending at it"""
+        value = float(value)
+        if not self._values:
+            self._prev_value = value
+        elif len(self._values) == self.window:
+            self._remove(self._values.popleft())
+        self._values.append(value)
+        self._add(value)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        """Mean of the current window (NaN below min_periods)"""
+        if self._nobs < max(self.min_periods, 1):
+            return np.nan
+        result = self._sum / self._nobs
+        if self._same_count >= self._nobs:
+            return self._prev_value
+        if self._neg_ct == 0 and result < 0:
+            return 0.0
+        if self._neg_ct == self._nobs and result > 0:
+            return 0.0
+        return result
+
+    def _add(self, value: float) -> None:
+        if math.isnan(value):
+            return
+        self._nobs += 1
+        y = value - self._add_compensation
+        t = self._sum + y
+        self._add_compensation = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, value) < 0:
+            self._neg_ct += 1
+        if value == self._prev_value:
+            self._same_count += 1
+        else:
+            self._same_count = 1
+        self._prev_value = value
+
+    def _remove(self, value: float) -> None:
+        if math.isnan(value):
+            return
+        self._nobs -= 1
+        y = -value - self._remove_compensation
+        t = self._sum + y
+        self._remove_compensation = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, value) < 0:
+            self._neg_ct -= 1
+
+
+class RollingStdState:
+    """
+    Running Series.rolling(window).std() via Welford's online variance
+
+    Values are added and removed one at a time, with the window's moments
+    recomputed when removals leave a single value, a non-positive sum of
+    squares or a constant run, and a window of equal values reads as 0.
+    Matches the batch rolling standard deviation to floating-point
+    rounding (its last bits differ across pandas versions).
+    """
+
+    def __init__(self, window: int, min_periods: Optional[int] = None, ddof: int = 1):
+        if window < 1:
+            raise ValueError("window must be positive")
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.ddof = ddof
+        self._values = deque()
+        self._nobs = 0
+        self._mean = 0.0
+        self._ssqdm = 0.0
+        self._same_count = 0
+        self._prev_value = np.nan
+
+    def update(self, value: float) -> float:
+        """Add one value and return the standard deviation of the window ending at it"""
+        value = float(value)
+        if not self._values:
+            self._prev_value = value
+        elif len(self._values) == self.window:
+            self._remove(self._values.popleft())
+        self._values.append(value)
+        self._add(value)
+        return self.value
+
+    @property
+    def variance(self) -> float:
+        """Variance of the current window (NaN below min_periods)"""
+        if self._nobs < max(self.min_periods, 1) or self._nobs <= self.ddof:
+            return np.nan
+        if self._same_count >= self._nobs:
+            return 0.0
+        return self._ssqdm / (self._nobs - self.ddof)
+
+    @property
+    def value(self) -> float:
+        """Standard deviation of the current window (negative variance reads as 0)"""
+        variance = self.variance
+        if math.isnan(variance):
+            return np.nan
+        return math.sqrt(variance) if variance > 0 else 0.0
+
+    def _add(self, value: float) -> None:
+        if math.isnan(value):
+            return
+        self._nobs += 1
+        self._same_count = self._same_count + 1 if value == self._prev_value else 1
+        self._prev_value = value
+
+        delta = value - self._mean
+        self._mean += delta / self._nobs
+        self._ssqdm += delta * (value - self._mean)
+
+    def _remove(self, value: float) -> None:
+        if math.isnan(value):
+            return
+        self._nobs -= 1
+        if not self._nobs:
+            self._mean = 0.0
+            self._ssqdm = 0.0
+            return
+
+        delta = value - self._mean
+        self._mean -= delta / self._nobs
+        self._ssqdm -= delta * (value - self._mean)
+        if (self._nobs == 1 or self._ssqdm <= 0 or
+                (self._same_count >= self._nobs and self._mean == self._prev_value)):
+            self._recompute()
+
+    def _recompute(self) -> None:
+        """Moments of the remaining window values from scratch"""
+        nobs, mean, ssqdm = 0, 0.0, 0.0
+        for value in self._values:
+            if not math.isnan(value):
+                nobs += 1
+                delta = value - mean
+                mean += delta / nobs
+                ssqdm += delta * (value - mean)
+        self._mean, self._ssqdm = mean, ssqdm
+
+
+class RSIState:
+    """Running RSI, identical to FOUSValidator.calculate_rsi (simple-average RSI)"""
+
+    def __init__(self, period: int = 14):
+        self.gain = RollingMeanState(period)
+        self.loss = RollingMeanState(period)
+        self._prev_price = np.nan
+
+    def update(self, price: float) -> float:
+        """Add one price and return the RSI at that bar"""
+        price = float(price)
+        delta = price - self._prev_price
+        self._prev_price = price
+
+        # Series.where(...) puts 0 at non-matching (and NaN) deltas; the loss is negated after
+        gain = self.gain.update(delta if delta > 0 else 0.0)
+        loss = self.loss.update(-(delta if delta < 0 else 0.0))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = np.float64(gain) / np.float64(loss)
+            return float(100 - (100 / (1 + rs)))
+
+
+class VolatilityState:
+    """Running annualized volatility, FOUSValidator.calculate_volatility to rounding"""
+
+    def __init__(self, period: int = 20):
+        self.std = RollingStdState(period)
+        self._prev_price = np.nan
+
+    def update(self, price: float) -> float:
+        """Add one price and return the volatility at that bar"""
+        price = float(price)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = float(np.float64(price) / np.float64(self._prev_price) - 1)
+        self._prev_price = price
+        return self.std.update(returns) * np.sqrt(252)
+
+
+def session_key(timestamp, tz: Optional[str] = 'UTC',
+                session_start: str = '00:00') -> pd.Timestamp:
+    """
+    Session a bar belongs to
+
+    Args:
+        timestamp: Bar time (tz-naive times are taken as local to tz)
+        tz: Time zone sessions are counted in (UTC for crypto)
+        session_start: Local time each session opens (HH:MM)
+
+    Returns:
+        Naive local date of the session
+    """
+    local = pd.Timestamp(timestamp)
+    if local.tzinfo is not None:
+        local = local.tz_convert(tz or 'UTC').tz_localize(None)
+    return (local - pd.Timedelta(f'{session_start}:00')).normalize()
+
+
+def session_keys(timestamps, tz: Optional[str] = 'UTC',
+                 session_start: str = '00:00') -> pd.DatetimeIndex:
+    """
+    session_key for many bar times at once
+
+    Args:
+        timestamps: Bar times (DatetimeIndex or anything it accepts)
+        tz: Time zone sessions are counted in (UTC for crypto)
+        session_start: Local time each session opens (HH:MM)
+
+    Returns:
+        Naive local session dates, one per bar
+    """
+    local = pd.DatetimeIndex(timestamps)
+    if local.tz is not None:
+        local = local.tz_convert(tz or 'UTC').tz_localize(None)
+    return (local - pd.Timedelta(f'{session_start}:00')).normalize()
+
+
+def _session_sums(values: np.ndarray, starts: np.ndarray, seed: float) -> np.ndarray:
+    """
+    Running sums of values that restart at each session start
+
+    Sessions are laid out as rows of a zero-padded grid and summed with
+    one cumsum along the rows. The sums add one value at a time, like
+    VWAPState.update, so they equal a separate cumsum per session bit for
+    bit. `seed` is the running sum the first session continues from.
+    """
+    n = len(values)
+    lengths = np.diff(np.append(starts, n))
+    session = np.repeat(np.arange(len(starts)), lengths)
+    column = np.arange(n) - starts[session] + 1
+
+    grid = np.zeros((len(starts), lengths.max() + 1))
+    grid[0, 0] = seed
+    grid[session, column] = values
+    return np.cumsum(grid, axis=1)[session, column]
+
+
+class SessionVWAPState:
+    """
+    Running VWAP that restarts every session
+
+    Equals FOUSValidator.calculate_vwap applied to each session's bars
+    separately. update() takes one bar; advance() takes many bars and
+    computes all their sessions in one grouped pass
+    (FOUSValidator.calculate_session_vwap is advance() from a fresh state).
+    """
+
+    def __init__(self, tz: Optional[str] = 'UTC', session_start: str = '00:00'):
+        """
+        Initialize state
+
+        Args:
+            tz: Time zone sessions are counted in (UTC for crypto)
+            session_start: Local time each session opens (HH:MM)
+        """
+        self.tz = tz
+        self.session_start = session_start
+        self.session = None
+        self.vwap = VWAPState()
+
+    def update(self, timestamp, high: float, low: float, close: float,
+               volume: float) -> float:
+        """Add one bar and return the session VWAP at that bar"""
+        session = session_key(timestamp, self.tz, self.session_start)
+        if session != self.session:
+            self.session = session
+            self.vwap = VWAPState()
+        return self.vwap.update(high, low, close, volume)
+
+    def advance(self, timestamps, high: np.ndarray, low: np.ndarray,
+                close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+        """
+        Add many bars at once
+
+        Args:
+            timestamps: Times of the bars (oldest first)
+            high, low, close, volume: Bars following the ones already added
+
+        Returns:
+            Session VWAP at each bar (same values as repeated update())
+        """
+        keys = session_keys(timestamps, self.tz, self.session_start)
+        if len(keys) == 0:
+            return np.empty(0)
+
+        # A session starts at every change of key (and at the first bar,
+        # unless it continues the current session)
+        codes = keys.asi8
+        starts = np.flatnonzero(np.concatenate([[True], codes[1:] != codes[:-1]]))
+        continues = self.session is not None and keys[0] == self.session
+
+        high, low, close, volume = (np.asarray(a, dtype=float)
+                                    for a in (high, low, close, volume))
+        price_volume = (high + low + close) / 3 * volume
+        sum_price_volume = _session_sums(np.where(np.isnan(price_volume), 0.0, price_volume),
+                                         starts, self.vwap.price_volume if continues else 0.0)
+        sum_volume = _session_sums(np.where(np.isnan(volume), 0.0, volume),
+                                   starts, self.vwap.volume if continues else 0.0)
+
+        self.session = keys[-1]
+        self.vwap = VWAPState()
+        self.vwap.price_volume = sum_price_volume[-1]
+        self.vwap.volume = sum_volume[-1]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            vwap = sum_price_volume / sum_volume
+        vwap[np.isnan(price_volume) | np.isnan(volume)] = np.nan
+        return vwap
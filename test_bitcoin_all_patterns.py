@@ -6,12 +6,10 @@ Tests all 8 patterns (ICI + FOUS) on Bitcoin with maximum historical data
 import warnings
 warnings.filterwarnings('ignore')
 
-import pandas as pd
 import yfinance as yf
 from datetime import datetime
-from ici_scanner import ICIScanner
-from pattern_scanners import MomentumScanner, WMScanner, HarmonicScanner
-from fous_scanners import ForceScanner, SurvivalScanner, RevivalScanner, GoldScanner
+from parallel_scanner import ParallelScanExecutor, ScanJob
+from setup_table import SetupTable
 
 def load_bitcoin_data(interval='1d', period='2y'):
     """Load Bitcoin data from yfinance"""
@@ -48,48 +46,38 @@ def test_ici_patterns_bitcoin():
 
     all_ici_results = []
 
+    # Load every timeframe first, then scan them all in parallel
+    frames = {}
     for interval, period in timeframes:
-        print(f"\n{'='*80}")
-        print(f"Testing {interval.upper()} timeframe")
-        print(f"{'='*80}")
-
         df = load_bitcoin_data(interval, period)
         if df is None or len(df) < 50:
             print(f"Skipping {interval} - insufficient data")
             continue
+        frames[('BTC-USD', interval)] = df
+
+    # Momentum only runs on 1h
+    jobs = [ScanJob('BTC-USD', interval, pattern)
+            for _, interval in frames
+            for pattern in (['ICI', 'Momentum', 'WM', 'Harmonic'] if interval == '1h'
+                            else ['ICI', 'WM', 'Harmonic'])]
+    results = ParallelScanExecutor().run(frames, jobs)
 
-        # Test ICI
-        print(f"\n--- ICI Scanner ---")
-        ici_scanner = ICIScanner()
-        ici_setups = ici_scanner.scan(df, timeframe=interval)
-        valid_ici = [s for s in ici_setups if s.valid]
-        print(f"ICI: {len(ici_setups)} total, {len(valid_ici)} valid")
-        all_ici_results.extend(ici_setups)
-
-        # Test Momentum (only on 1h)
-        if interval == '1h':
-            print(f"\n--- Momentum Scanner ---")
-            mom_scanner = MomentumScanner()
-            mom_setups = mom_scanner.scan(df, timeframe=interval)
-            valid_mom = [s for s in mom_setups if s.valid]
-            print(f"Momentum: {len(mom_setups)} total, {len(valid_mom)} valid")
-            all_ici_results.extend(mom_setups)
-
-        # Test W/M
-        print(f"\n--- W/M Scanner ---")
-        wm_scanner = WMScanner()
-        wm_setups = wm_scanner.scan(df, timeframe=interval)
-        valid_wm = [s for s in wm_setups if s.valid]
-        print(f"W/M: {len(wm_setups)} total, {len(valid_wm)} valid")
-        all_ici_results.extend(wm_setups)
-
-        # Test Harmonic
-        print(f"\n--- Harmonic Scanner ---")
-        harm_scanner = HarmonicScanner()
-        harm_setups = harm_scanner.scan(df, timeframe=interval)
-        valid_harm = [s for s in harm_setups if s.valid]
-        print(f"Harmonic: {len(harm_setups)} total, {len(valid_harm)} valid")
-        all_ici_results.extend(harm_setups)
+    for _, interval in frames:
+        print(f"\n{'='*80}")
+        print(f"Testing {interval.upper()} timeframe")
+        print(f"{'='*80}")
+
+        for pattern, label, name in [('ICI', 'ICI Scanner', 'ICI'),
+                                     ('Momentum', 'Momentum Scanner', 'Momentum'),
+                                     ('WM', 'W/M Scanner', 'W/M'),
+                                     ('Harmonic', 'Harmonic Scanner', 'Harmonic')]:
+            if ('BTC-USD', interval, pattern) not in results:
+                continue
+            print(f"\n--- {label} ---")
+            setups = results[('BTC-USD', interval, pattern)]
+            valid = [s for s in setups if s.valid]
+            print(f"{name}: {len(setups)} total, {len(valid)} valid")
+            all_ici_results.extend(setups)
 
     return all_ici_results
 
@@ -107,74 +95,55 @@ def test_fous_patterns_bitcoin():
 
     all_fous_results = []
 
+    # Load every timeframe first, then scan them all in parallel
+    frames = {}
     for interval, period in timeframes:
-        print(f"\n{'='*80}")
-        print(f"Testing {interval.upper()} timeframe")
-        print(f"{'='*80}")
-
         df = load_bitcoin_data(interval, period)
         if df is None or len(df) < 50:
             print(f"Skipping {interval} - insufficient data")
             continue
+        frames[('BTC-USD', interval)] = df
 
-        # Test Force
-        print(f"\n--- Force Scanner ---")
-        force_scanner = ForceScanner()
-        force_setups = force_scanner.scan(df, timeframe=interval)
-        valid_force = [s for s in force_setups if s.valid]
-        print(f"Force: {len(force_setups)} total, {len(valid_force)} valid")
-        all_fous_results.extend(force_setups)
-
-        # Test Survival
-        print(f"\n--- Survival Scanner ---")
-        survival_scanner = SurvivalScanner()
-        survival_setups = survival_scanner.scan(df, timeframe=interval)
-        valid_survival = [s for s in survival_setups if s.valid]
-        print(f"Survival: {len(survival_setups)} total, {len(valid_survival)} valid")
-        all_fous_results.extend(survival_setups)
-
-        # Test Revival
-        print(f"\n--- Revival Scanner ---")
-        revival_scanner = RevivalScanner()
-        revival_setups = revival_scanner.scan(df, timeframe=interval)
-        valid_revival = [s for s in revival_setups if s.valid]
-        print(f"Revival: {len(revival_setups)} total, {len(valid_revival)} valid")
-        all_fous_results.extend(revival_setups)
-
-        # Test Gold
-        print(f"\n--- Gold Scanner ---")
-        gold_scanner = GoldScanner()
-        gold_setups = gold_scanner.scan(df, timeframe=interval)
-        valid_gold = [s for s in gold_setups if s.valid]
-        print(f"Gold: {len(gold_setups)} total, {len(valid_gold)} valid")
-        all_fous_results.extend(gold_setups)
+    results = ParallelScanExecutor().scan(frames, ['Force', 'Survival', 'Revival', 'Gold'])
+
+    for _, interval in frames:
+        print(f"\n{'='*80}")
+        print(f"Testing {interval.upper()} timeframe")
+        print(f"{'='*80}")
+
+        for pattern, label, name in [('Force', 'Force Scanner', 'Force'),
+                                     ('Survival', 'Survival Scanner', 'Survival'),
+                                     ('Revival', 'Revival Scanner', 'Revival'),
+                                     ('Gold', 'Gold Scanner', 'Gold')]:
+            print(f"\n--- {label} ---")
+            setups = results[('BTC-USD', interval, pattern)]
+            valid = [s for s in setups if s.valid]
+            print(f"{name}: {len(setups)} total, {len(valid)} valid")
+            all_fous_results.extend(setups)
 
     return all_fous_results
 
+# Setup field -> CSV column for the exports
+ICI_EXPORT_COLUMNS = {
+    'date': 'Date', 'pattern_type': 'Pattern', 'timeframe': 'Timeframe',
+    'direction': 'Direction', 'entry': 'Entry', 'stop': 'Stop', 'target': 'Target',
+    'risk_reward': 'R:R', 'correction_pct': 'Correction%', 'ema_aligned': 'EMA_Aligned',
+    'macd_aligned': 'MACD_Aligned', 'valid': 'Valid'
+}
+FOUS_EXPORT_COLUMNS = {
+    'date': 'Date', 'pattern_type': 'Pattern', 'timeframe': 'Timeframe',
+    'entry': 'Entry', 'stop': 'Stop', 'target': 'Target', 'risk_reward': 'R:R',
+    'volume_spike': 'Volume_Spike', 'rsi': 'RSI', 'ema_aligned': 'EMA_Aligned',
+    'vwap_bullish': 'VWAP_Bullish', 'valid': 'Valid'
+}
+
 def export_results(ici_results, fous_results):
     """Export all results to CSV files"""
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
     # Export ICI results
     if ici_results:
-        ici_data = []
-        for setup in ici_results:
-            ici_data.append({
-                'Date': setup.date,
-                'Pattern': setup.pattern_type,
-                'Timeframe': setup.timeframe,
-                'Direction': 'LONG' if setup.is_bullish else 'SHORT',
-                'Entry': setup.entry,
-                'Stop': setup.stop,
-                'Target': setup.target,
-                'R:R': setup.risk_reward,
-                'Correction%': setup.correction_pct,
-                'EMA_Aligned': setup.ema_aligned,
-                'MACD_Aligned': setup.macd_aligned,
-                'Valid': setup.valid
-            })
-
-        df_ici = pd.DataFrame(ici_data)
+        df_ici = SetupTable.from_setups(ici_results).to_frame(ICI_EXPORT_COLUMNS)
 
         # All ICI setups
         filename_all = f'bitcoin_ici_all_{timestamp}.csv'
@@ -189,24 +158,7 @@ def export_results(ici_results, fous_results):
 
     # Export FOUS results
     if fous_results:
-        fous_data = []
-        for setup in fous_results:
-            fous_data.append({
-                'Date': setup.date,
-                'Pattern': setup.pattern_type,
-                'Timeframe': setup.timeframe,
-                'Entry': setup.entry,
-                'Stop': setup.stop,
-                'Target': setup.target,
-                'R:R': setup.risk_reward,
-                'Volume_Spike': setup.volume_spike,
-                'RSI': setup.rsi,
-                'EMA_Aligned': setup.ema_aligned,
-                'VWAP_Bullish': setup.vwap_bullish,
-                'Valid': setup.valid
-            })
-
-        df_fous = pd.DataFrame(fous_data)
+        df_fous = SetupTable.from_setups(fous_results).to_frame(FOUS_EXPORT_COLUMNS)
 
         # All FOUS setups
         filename_all = f'bitcoin_fous_all_{timestamp}.csv'
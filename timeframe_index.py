@@ -0,0 +1,188 @@
+"""
+Timeframe alignment - lower-timeframe bars covered by each higher-timeframe bar
+"""
+from typing import Optional, Sequence
+import numpy as np
+import pandas as pd
+from bar_arrays import BarArrays, BarData, as_bars
+
+
+# Lower-timeframe bars a break of structure must clear (validate_break_of_structure default)
+ENTRY_LOOKBACK = 20
+
+
+def _utc_nanoseconds(bars: BarArrays) -> np.ndarray:
+    """Bar timestamps as int64 nanoseconds (UTC for tz-aware dates)"""
+    if bars.timestamps is None:
+        raise ValueError("Timeframe alignment needs datetime bar dates")
+    return bars.timestamps
+
+
+class TimeframeIndex:
+    """
+    Rows of a lower-timeframe series inside each higher-timeframe bar
+
+    Higher bar i spans [date[i], date[i + 1]); the last one spans
+    everything after its date. Both series are mapped with one
+    searchsorted call, so looking up the lower bars of any number of
+    higher bars is a pair of array reads instead of a DataFrame slice.
+    """
+
+    def __init__(self, higher_times: np.ndarray, lower_times: np.ndarray):
+        """
+        Build the index
+
+        Args:
+            higher_times: Higher-timeframe bar start times (int64, sorted)
+            lower_times: Lower-timeframe bar start times (int64, sorted)
+        """
+        self.higher_times = np.asarray(higher_times, dtype=np.int64)
+        self.lower_times = np.asarray(lower_times, dtype=np.int64)
+        for name, times in (('higher', self.higher_times), ('lower', self.lower_times)):
+            if np.any(np.diff(times) < 0):
+                raise ValueError(f"{name}-timeframe dates must be sorted")
+
+        # Lower rows start[i]:stop[i] fall inside higher bar i
+        self.start = np.searchsorted(self.lower_times, self.higher_times, side='left')
+        self.stop = np.append(self.start[1:], len(self.lower_times))
+
+    @classmethod
+    def from_bars(cls, higher: BarData, lower: BarData) -> 'TimeframeIndex':
+        """
+        Index two bar series
+
+        Args:
+            higher: Higher-timeframe DataFrame or BarArrays
+            lower: Lower-timeframe DataFrame or BarArrays
+
+        Returns:
+            TimeframeIndex of the two series
+        """
+        higher, lower = as_bars(higher), as_bars(lower)
+        if (higher.tz is None) != (lower.tz is None):
+            raise ValueError("Cannot align tz-aware and tz-naive dates")
+        return cls(_utc_nanoseconds(higher), _utc_nanoseconds(lower))
+
+    def __len__(self) -> int:
+        return len(self.higher_times)
+
+    def bars(self, idx: int) -> slice:
+        """Lower rows inside higher bar idx"""
+        return slice(int(self.start[idx]), int(self.stop[idx]))
+
+    def bar_after(self, times: np.ndarray) -> np.ndarray:
+        """
+        Higher bar that follows each timestamp's bar
+
+        Args:
+            times: Higher-timeframe bar times (int64 nanoseconds)
+
+        Returns:
+            Higher bar indices (len(self) where no later bar exists)
+        """
+        return np.searchsorted(self.higher_times, times, side='right')
+
+    def any_in(self, mask: np.ndarray, indices: np.ndarray) -> np.ndarray:
+        """
+        Whether any lower bar flagged in mask falls inside each higher bar
+
+        Args:
+            mask: Boolean array over the lower-timeframe bars
+            indices: Higher bar indices (out-of-range ones get False)
+
+        Returns:
+            Boolean array aligned with indices
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        inside = indices < len(self)
+        rows = np.where(inside, indices, 0)
+
+        counts = np.concatenate([[0], np.cumsum(mask, dtype=np.int64)])
+        found = counts[self.stop[rows]] - counts[self.start[rows]] > 0
+        return found & inside
+
+    def has_bars(self, indices: np.ndarray) -> np.ndarray:
+        """Whether each higher bar (in range) contains any lower bars"""
+        indices = np.asarray(indices, dtype=np.int64)
+        inside = indices < len(self)
+        rows = np.where(inside, indices, 0)
+        return inside & (self.stop[rows] > self.start[rows])
+
+
+def break_of_structure_mask(bars: BarData, direction: str = 'long',
+                            lookback: int = ENTRY_LOOKBACK) -> np.ndarray:
+    """
+    EntryValidator.validate_break_of_structure for every bar
+
+    Args:
+        bars: DataFrame or BarArrays with High/Low
+        direction: 'long' (high above the previous lookback highs) or
+            'short' (low below the previous lookback lows)
+        lookback: Bars the break must clear
+
+    Returns:
+        Boolean array over the bars
+    """
+    bars = as_bars(bars)
+    mask = np.zeros(len(bars), dtype=bool)
+    if lookback < 1 or len(bars) <= lookback:
+        return mask
+
+    # Extremes of the previous lookback bars, skipping NaN like pandas max/min
+    if direction == 'long':
+        prices = bars.series('High')
+        recent = prices.rolling(lookback, min_periods=1).max().shift(1).to_numpy()
+        mask[lookback:] = (prices.to_numpy() > recent)[lookback:]
+    else:  # short
+        prices = bars.series('Low')
+        recent = prices.rolling(lookback, min_periods=1).min().shift(1).to_numpy()
+        mask[lookback:] = (prices.to_numpy() < recent)[lookback:]
+    return mask
+
+
+def confirm_entries(setups: Sequence, higher: BarData, lower: BarData,
+                    index: Optional[TimeframeIndex] = None,
+                    lookback: int = ENTRY_LOOKBACK) -> list:
+    """
+    Validate ICI-family entries on a lower timeframe
+
+    A setup found on higher bar i is entered during bar i + 1; its entry
+    is confirmed when a lower-timeframe bar inside bar i + 1 breaks
+    structure in the setup's direction. Setups whose entry bar has no
+    lower-timeframe data are left unchecked (entry_confirmed None);
+    unconfirmed ones become invalid.
+
+    Args:
+        setups: ICISetup objects found on higher
+        higher: Bars the setups were found on
+        lower: Lower-timeframe bars of the same symbol
+        index: Precomputed TimeframeIndex.from_bars(higher, lower)
+        lookback: Lower-timeframe bars a break must clear
+
+    Returns:
+        The same setups, updated in place
+    """
+    setups = list(setups)
+    if not setups:
+        return setups
+
+    lower = as_bars(lower)
+    if index is None:
+        index = TimeframeIndex.from_bars(higher, lower)
+
+    dates = pd.DatetimeIndex([setup.date for setup in setups])
+    entry_bars = index.bar_after(dates.as_unit('ns').asi8)
+    bullish = np.array([setup.is_bullish for setup in setups], dtype=bool)
+
+    confirmed = np.where(
+        bullish,
+        index.any_in(break_of_structure_mask(lower, 'long', lookback), entry_bars),
+        index.any_in(break_of_structure_mask(lower, 'short', lookback), entry_bars),
+    )
+    checked = index.has_bars(entry_bars)
+
+    for setup, is_checked, is_confirmed in zip(setups, checked, confirmed):
+        if is_checked:
+            setup.entry_confirmed = bool(is_confirmed)
+            setup.valid = setup.valid and setup.entry_confirmed
+    return setups
@@ -3,6 +3,8 @@ Entry validation module - EMA, MACD, Risk/Reward
 """
 import pandas as pd
 import numpy as np
+from array_utils import forward_run_lengths, window_max, window_min
+from bar_arrays import BarArrays, BarData, as_bars
 
 
 class EntryValidator:
@@ -13,6 +15,12 @@ class EntryValidator:
         """Calculate Exponential Moving Average"""
         return prices.ewm(span=period, adjust=False).mean()
 
+    @staticmethod
+    def cached_ema(bars: BarArrays, period: int) -> np.ndarray:
+        """calculate_ema of the bars' close prices, from the bars' indicator cache"""
+        return bars.indicators.get('ema', (period,), lambda: EntryValidator.calculate_ema(
+            bars.series('Close'), period).to_numpy())
+
     @staticmethod
     def validate_ema(close_prices: pd.Series, period1: int = 10,
                     period2: int = 20, direction: str = 'long') -> bool:
@@ -61,6 +69,24 @@ class EntryValidator:
 
         return macd_line, signal_line, histogram
 
+    @staticmethod
+    def cached_macd(bars: BarArrays, fast: int = 12,
+                    slow: int = 26, signal: int = 9) -> tuple:
+        """
+        calculate_macd of the bars' close prices, from the bars' indicator cache
+
+        The MACD line reuses the cached EMAs.
+
+        Returns:
+            (macd_line, signal_line, histogram) arrays
+        """
+        cache = bars.indicators
+        macd_line = cache.get('macd_line', (fast, slow), lambda: (
+            EntryValidator.cached_ema(bars, fast) - EntryValidator.cached_ema(bars, slow)))
+        signal_line = cache.get('macd_signal', (fast, slow, signal), lambda: pd.Series(
+            macd_line, copy=False).ewm(span=signal, adjust=False).mean().to_numpy())
+        return macd_line, signal_line, macd_line - signal_line
+
     @staticmethod
     def validate_macd(close_prices: pd.Series, direction: str = 'long') -> bool:
         """
@@ -90,14 +116,14 @@ class EntryValidator:
             return macd_value < 0 and histogram_value < 0
 
     @staticmethod
-    def validate_break_of_structure(df: pd.DataFrame, entry_idx: int,
+    def validate_break_of_structure(df: BarData, entry_idx: int,
                                     direction: str = 'long',
                                     lookback: int = 20) -> bool:
         """
         Validate break of structure (BOS)
 
         Args:
-            df: DataFrame with OHLC data
+            df: DataFrame or BarArrays with OHLC data
             entry_idx: Index of potential entry bar
             direction: 'long' or 'short'
             lookback: Number of bars to look back for structure
@@ -108,18 +134,20 @@ class EntryValidator:
         if entry_idx < lookback:
             return False
 
-        lookback_data = df.iloc[max(0, entry_idx - lookback):entry_idx]
+        bars = as_bars(df)
+        window = slice(max(0, entry_idx - lookback), entry_idx)
 
+        # NaN-skipping extremes, like pandas max()/min()
         if direction == 'long':
             # For long: price should break above recent highs
-            recent_high = lookback_data['High'].max()
-            entry_high = df.iloc[entry_idx]['High']
-            return entry_high > recent_high
+            highs = bars.high[window]
+            recent_high = np.fmax.reduce(highs) if len(highs) else np.nan
+            return bars.high[entry_idx] > recent_high
         else:  # short
             # For short: price should break below recent lows
-            recent_low = lookback_data['Low'].min()
-            entry_low = df.iloc[entry_idx]['Low']
-            return entry_low < recent_low
+            lows = bars.low[window]
+            recent_low = np.fmin.reduce(lows) if len(lows) else np.nan
+            return bars.low[entry_idx] < recent_low
 
     @staticmethod
     def validate_risk_reward(entry: float, stop: float, target: float,
@@ -163,13 +191,13 @@ class EntryValidator:
             return row['Close'] < row['Open']
 
     @staticmethod
-    def count_consecutive_candles(df: pd.DataFrame, start_idx: int,
+    def count_consecutive_candles(df: BarData, start_idx: int,
                                  bullish: bool, max_count: int = 10) -> int:
         """
         Count consecutive same-color candles
 
         Args:
-            df: DataFrame with OHLC data
+            df: DataFrame or BarArrays with OHLC data
             start_idx: Starting index
             bullish: True for bullish candles
             max_count: Maximum candles to count
@@ -177,10 +205,159 @@ class EntryValidator:
         Returns:
             Number of consecutive same-color candles
         """
+        bars = as_bars(df)
         count = 0
-        for i in range(start_idx, min(start_idx + max_count, len(df))):
-            if EntryValidator.is_same_color_candle(df.iloc[i], bullish):
+        for i in range(start_idx, min(start_idx + max_count, len(bars))):
+            if EntryValidator.is_same_color_candle({'Open': bars.open[i], 'Close': bars.close[i]},
+                                                   bullish):
                 count += 1
             else:
                 break
         return count
+
+    # Batch versions: arrays of candidates in, arrays out (same rules as above)
+
+    @staticmethod
+    def ema_aligned_mask(close_prices: pd.Series, indices: np.ndarray,
+                         period1: int = 10, period2: int = 20,
+                         direction: str = 'long') -> np.ndarray:
+        """
+        validate_ema on close_prices.iloc[:i + 1] for many bars i
+
+        Args:
+            close_prices: Series of closing prices
+            indices: Bars to validate
+            period1: Fast EMA period (default 10)
+            period2: Slow EMA period (default 20)
+            direction: 'long' or 'short'
+
+        Returns:
+            Boolean array, one entry per index
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        # adjust=False EMAs at bar i only depend on bars 0..i
+        ema_fast = EntryValidator.calculate_ema(close_prices, period1).to_numpy()[indices]
+        ema_slow = EntryValidator.calculate_ema(close_prices, period2).to_numpy()[indices]
+
+        if direction == 'long':
+            aligned = ema_fast > ema_slow
+        else:  # short
+            aligned = ema_fast < ema_slow
+        return aligned & (indices + 1 >= period2)
+
+    @staticmethod
+    def macd_aligned_mask(close_prices: pd.Series, indices: np.ndarray,
+                          direction: str = 'long') -> np.ndarray:
+        """
+        validate_macd on close_prices.iloc[:i + 1] for many bars i
+
+        Args:
+            close_prices: Series of closing prices
+            indices: Bars to validate
+            direction: 'long' or 'short'
+
+        Returns:
+            Boolean array, one entry per index
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        macd_line, _, histogram = EntryValidator.calculate_macd(close_prices)
+        macd_value = macd_line.to_numpy()[indices]
+        histogram_value = histogram.to_numpy()[indices]
+
+        if direction == 'long':
+            confirmed = (macd_value > 0) & (histogram_value > 0)
+        else:  # short
+            confirmed = (macd_value < 0) & (histogram_value < 0)
+        return confirmed & (indices + 1 >= 26)
+
+    @staticmethod
+    def break_of_structure_mask(df: BarData, indices: np.ndarray,
+                                direction: str = 'long',
+                                lookback: int = 20) -> np.ndarray:
+        """
+        validate_break_of_structure for many entry bars
+
+        Args:
+            df: DataFrame or BarArrays with OHLC data
+            indices: Potential entry bars
+            direction: 'long' or 'short'
+            lookback: Number of bars to look back for structure
+
+        Returns:
+            Boolean array, one entry per index
+        """
+        bars = as_bars(df)
+        indices = np.asarray(indices, dtype=np.int64)
+        starts = np.maximum(indices - lookback, 0)
+
+        # NaN-skipping extremes of the previous lookback bars (NaN if none)
+        if direction == 'long':
+            broken = bars.high[indices] > window_max(bars.high, starts, indices)
+        else:  # short
+            broken = bars.low[indices] < window_min(bars.low, starts, indices)
+        return broken & (indices >= lookback)
+
+    @staticmethod
+    def risk_reward_mask(entries: np.ndarray, stops: np.ndarray, targets: np.ndarray,
+                         min_ratio: float = 1.3) -> np.ndarray:
+        """
+        validate_risk_reward for many trades
+
+        Args:
+            entries: Entry prices
+            stops: Stop loss prices
+            targets: Target prices (all three broadcast together)
+            min_ratio: Minimum acceptable R:R ratio (default 1.3)
+
+        Returns:
+            Boolean array, False where the risk is zero
+        """
+        entries = np.asarray(entries, dtype=float)
+        risk = np.abs(entries - np.asarray(stops, dtype=float))
+        reward = np.abs(np.asarray(targets, dtype=float) - entries)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = reward / risk
+        return (risk != 0) & (ratio >= min_ratio)
+
+    @staticmethod
+    def same_color_mask(opens: np.ndarray, closes: np.ndarray, bullish: bool) -> np.ndarray:
+        """
+        is_same_color_candle for many candles
+
+        Args:
+            opens: Open prices
+            closes: Close prices
+            bullish: True for bullish, False for bearish
+
+        Returns:
+            Boolean array, one entry per candle
+        """
+        opens = np.asarray(opens, dtype=float)
+        closes = np.asarray(closes, dtype=float)
+        if bullish:
+            return closes > opens
+        else:
+            return closes < opens
+
+    @staticmethod
+    def consecutive_candle_counts(df: BarData, starts: np.ndarray,
+                                  bullish: bool, max_count: int = 10) -> np.ndarray:
+        """
+        count_consecutive_candles for many start bars
+
+        Args:
+            df: DataFrame or BarArrays with OHLC data
+            starts: Starting indices (a start past the last bar counts 0)
+            bullish: True for bullish candles
+            max_count: Maximum candles to count
+
+        Returns:
+            int64 array of counts, one entry per start
+        """
+        bars = as_bars(df)
+        starts = np.minimum(np.asarray(starts, dtype=np.int64), len(bars))
+        same = EntryValidator.same_color_mask(bars.open, bars.close, bullish)
+        # Run of same-color candles starting at each bar (0 after the last bar)
+        runs = np.append(forward_run_lengths(same), 0)
+        return np.minimum(runs[starts], max(max_count, 0))
@@ -0,0 +1,219 @@
+"""
+Window scans - evaluate patterns on a slice of a series with carried indicators
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+import numpy as np
+from bar_arrays import BarArrays
+from fous_validators import FOUSFeatures, FOUSValidator
+from indicators import IndicatorContext
+from live_scanner import LiveScanner, ICI_DECISION_LAG, PATTERN_LABELS
+from streaming_indicators import EMAState, VWAPState
+from scan_pipeline import ScanPipeline
+from validators import EntryValidator
+
+
+# EMA spans carried as running state (ICI EMA/MACD and FOUS EMAs)
+EMA_SPANS = (9, 10, 12, 20, 21, 26)
+
+# Indicators that depend on the whole history (everything else has a bounded lookback)
+INDICATORS = ('ema9', 'ema10', 'ema20', 'ema21', 'macd_line', 'macd_signal', 'vwap')
+
+# Pivot window of WMScanner._find_pivots: a pivot is only known this many bars later
+PIVOT_WINDOW = 5
+
+
+def history_indicators(bars: BarArrays) -> Dict[str, np.ndarray]:
+    """
+    INDICATORS over a whole series, as the scanners compute them
+
+    Args:
+        bars: Bars of the series
+
+    Returns:
+        Dict of arrays aligned with bars
+    """
+    values = {f'ema{span}': EntryValidator.cached_ema(bars, span) for span in (9, 10, 20, 21)}
+    values['macd_line'], values['macd_signal'], _ = EntryValidator.cached_macd(bars)
+    values['vwap'] = FOUSValidator.calculate_vwap(bars).to_numpy()
+    return values
+
+
+@dataclass
+class IndicatorStates:
+    """Running state of INDICATORS at the end of a series"""
+    emas: Dict[int, EMAState]
+    macd_signal: EMAState
+    vwap: VWAPState
+
+    @classmethod
+    def from_history(cls, bars: BarArrays,
+                     values: Dict[str, np.ndarray]) -> 'IndicatorStates':
+        """
+        State after a series whose INDICATORS are already known
+
+        Args:
+            bars: Bars of the series
+            values: history_indicators(bars)
+
+        Returns:
+            IndicatorStates that continue exactly where values end
+        """
+        # MACD's EMAs are only needed as running state
+        emas = {span: EMAState.from_history(
+                    span, bars.close,
+                    values[f'ema{span}'] if f'ema{span}' in values
+                    else EntryValidator.cached_ema(bars, span))
+                for span in EMA_SPANS}
+        return cls(
+            emas=emas,
+            macd_signal=EMAState.from_history(9, values['macd_line'], values['macd_signal']),
+            vwap=VWAPState.from_history(bars.high, bars.low, bars.close, bars.volume),
+        )
+
+    def advance(self, bars: BarArrays) -> Dict[str, np.ndarray]:
+        """
+        Carry the state over bars that follow the series (in place)
+
+        Args:
+            bars: New bars
+
+        Returns:
+            INDICATORS over the new bars
+        """
+        ema = {span: state.advance(bars.close) for span, state in self.emas.items()}
+        macd_line = ema[12] - ema[26]
+        return {
+            'ema9': ema[9], 'ema10': ema[10], 'ema20': ema[20], 'ema21': ema[21],
+            'macd_line': macd_line,
+            'macd_signal': self.macd_signal.advance(macd_line),
+            'vwap': self.vwap.advance(bars.high, bars.low, bars.close, bars.volume),
+        }
+
+
+class WindowScanner:
+    """
+    Evaluate ScanPipeline patterns on a window of a longer series
+
+    A window holds the bars to evaluate plus `lookback` bars of history
+    before them and `lag` bars after them. With the history-dependent
+    INDICATORS passed in (from the whole series), every setup found in
+    the window is exactly the one a ScanPipeline scan of the whole series
+    finds on that bar, so a series can be scanned piecewise.
+    """
+
+    def __init__(self, patterns: Optional[List[str]] = None,
+                 scanners: Optional[Dict[str, object]] = None):
+        """
+        Initialize window scanner
+
+        Args:
+            patterns: Patterns to scan (default: all of PATTERNS)
+            scanners: Optional scanner instances by pattern name
+        """
+        self.pipeline = ScanPipeline(patterns, scanners)
+        self.patterns = self.pipeline.patterns
+        self.scanners = self.pipeline.scanners
+
+        # Bars after a bar that can still change its setups
+        self.lag = max(self.decision_lag(pattern) for pattern in self.patterns)
+        # Bars of history any rule reads (50-bar warm-up, W/M pivots, the
+        # 100-bar volatility percentile)
+        self.lookback = max([LiveScanner.MAX_LOOKBACK] + [
+            self.scanners[p].lookback_period + 2 * PIVOT_WINDOW
+            for p in ('WM', 'Harmonic') if p in self.patterns
+        ])
+
+    def decision_lag(self, pattern: str) -> int:
+        """Bars after a bar that can still change the setups found on it"""
+        if pattern == 'Gold':
+            return max(scanner.bars_ahead for scanner in self.pipeline.gold_components.values())
+        if pattern in ('Force', 'Survival', 'Revival'):
+            return self.scanners[pattern].bars_ahead
+        if pattern in ('WM', 'Harmonic'):
+            # Pivots up to the bar before are only confirmed PIVOT_WINDOW bars later
+            return max(PIVOT_WINDOW, ICI_DECISION_LAG)
+        return ICI_DECISION_LAG
+
+    def scan(self, window: BarArrays, start: int, stop: int, timeframe: str,
+             indicators: Dict[str, np.ndarray], offset: int = 0) -> Dict[str, list]:
+        """
+        Evaluate every enabled pattern on window bars start..stop
+
+        Bars after the window's end that a pattern would need are treated
+        as the end of the series, like a scan of a series ending there.
+
+        Args:
+            window: Bars of the window
+            start: First window bar to evaluate (at least lookback bars in,
+                unless the window starts the series)
+            stop: Window bar after the last one to evaluate
+            timeframe: Timeframe of the bars
+            indicators: INDICATORS over the window
+            offset: Position of the window's first bar in the series (bars
+                before the series' 50th are never evaluated)
+
+        Returns:
+            Setup lists by pattern, ordered like ScanPipeline.scan
+        """
+        n = len(window)
+        start = max(start, 50 - offset)
+        enabled = set(self.patterns)
+        found = {pattern: [] for pattern in self.patterns}
+
+        def bars_for(lag: int) -> np.ndarray:
+            return np.arange(start, min(stop, n - lag))
+
+        context = IndicatorContext.from_values(
+            indicators['ema10'], indicators['ema20'],
+            indicators['macd_line'], indicators['macd_signal'])
+
+        for pattern in ('ICI', 'Momentum'):
+            if pattern in enabled:
+                found[pattern] = self.scanners[pattern]._scan_indices(
+                    window, bars_for(ICI_DECISION_LAG), timeframe, context)
+
+        wm = [p for p in ('WM', 'Harmonic') if p in enabled]
+        if wm:
+            pivots = self.scanners[wm[0]]._find_pivots(window)
+            prices = self.scanners[wm[0]]._price_arrays(window)
+        for pattern in wm:
+            found[pattern] = self.scanners[pattern]._scan_indices(
+                window, bars_for(ICI_DECISION_LAG), timeframe, context, pivots, prices)
+
+        fous = self.pipeline.fous_scanners(enabled)
+        if fous:
+            features = FOUSFeatures(window, indicators={
+                name: indicators[name] for name in ('vwap', 'ema9', 'ema20', 'ema21')
+            })
+        for key, scanner in fous.items():
+            found[key] = scanner._scan_indices(
+                window, bars_for(scanner.bars_ahead), timeframe, features)
+        if 'Gold' in enabled:
+            found['Gold'] = self.scanners['Gold'].combine(
+                *self.pipeline.gold_inputs(found), timeframe, features)
+
+        for pattern, label in PATTERN_LABELS.items():
+            for setup in found.get(pattern, []):
+                setup.pattern_type = label
+        return {pattern: found[pattern] for pattern in self.patterns}
+
+    @staticmethod
+    def merge(parts: List[Dict[str, list]]) -> Dict[str, list]:
+        """
+        Join the setups of consecutive windows (oldest first)
+
+        Setups are ordered by bar within each window; Gold lists keep
+        GoldScanner.combine's order of all Force pairs before all
+        Survival pairs.
+        """
+        merged = {}
+        for pattern in (parts[0] if parts else {}):
+            setups = [setup for part in parts for setup in part.get(pattern, [])]
+            if pattern == 'Gold':
+                def force_pair(setup) -> bool:
+                    return setup.notes.startswith('Force+Revival')
+                setups = ([s for s in setups if force_pair(s)] +
+                          [s for s in setups if not force_pair(s)])
+            merged[pattern] = setups
+        return merged